@@ -1,9 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from config import settings
-from database.mongodb import connect_to_mongo, close_mongo_connection, create_indexes
+from database.mongodb import connect_to_mongo, close_mongo_connection
+from database.indexes import start_index_reconciler
+from utils.metrics import render_metrics, sample_event_loop_lag, mark_worker_dead
+from utils.loop_monitor import loop_watchdog, LoopWatchdogMiddleware
+from utils.readiness import check_readiness
+from utils.images import shutdown_image_pool
+from utils.static_files import UploadFiles
+from utils.compression import CompressionMiddleware
+from utils.conditional import ConditionalGetMiddleware
+from utils.middleware import QueryProfilerMiddleware, PrometheusMiddleware
 
 # Import routers
 from routers import auth, bookings, partners, customers, admin, payments, categories, services, cart, notifications, professionals, contact
@@ -17,14 +27,25 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting NoSo Company API...")
     connect_to_mongo()
-    create_indexes()
+    if settings.INDEX_RECONCILE_ON_STARTUP:
+        start_index_reconciler()
+    lag_task = None
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+    else:
+        lag_task = asyncio.create_task(sample_event_loop_lag())
     print("✅ Application startup complete")
 
     yield
 
     # Shutdown
     print("🛑 Shutting down NoSo Company API...")
+    loop_watchdog.stop()
+    if lag_task:
+        lag_task.cancel()
+    shutdown_image_pool()
     close_mongo_connection()
+    mark_worker_dead()
     print("✅ Application shutdown complete")
 
 
@@ -45,10 +66,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Slowest"] if settings.DEBUG else [],
 )
 
-# Mount static files for image uploads
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# ETag/304 for endpoints using the conditional_get dependency
+app.add_middleware(ConditionalGetMiddleware)
+
+# Per-request Mongo command counting (see /api/admin/diagnostics/queries)
+if settings.QUERY_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+
+# Attribute event-loop stalls to the request that caused them
+if settings.LOOP_WATCHDOG_ENABLED:
+    app.add_middleware(LoopWatchdogMiddleware)
+
+# gzip/brotli for larger JSON and text bodies (not images, SSE or streamed exports)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Request latency/status metrics (see /metrics), outermost so it times everything
+app.add_middleware(PrometheusMiddleware)
+
+# Mount static files for image uploads (content-addressed blobs first, they are cached as immutable)
+app.mount("/uploads/blobs", UploadFiles(directory=settings.BLOB_FOLDER, check_dir=False, immutable=True), name="blobs")
+app.mount("/uploads", UploadFiles(directory="uploads"), name="uploads")
 
 # Include routers
 app.include_router(auth.router, prefix="/api")
@@ -78,7 +119,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness check endpoint (no dependency checks, see /ready)"""
     return {
         "status": "healthy",
         "app": settings.APP_NAME,
@@ -86,6 +127,21 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check endpoint: MongoDB ping, connection pool and threadpool backlog"""
+    result = await check_readiness()
+    status_code = 200 if result["status"] == "ready" else 503
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, aggregated across all workers"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
 
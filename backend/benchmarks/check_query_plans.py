@@ -0,0 +1,108 @@
+"""
+Query Plan Check
+Explains the hot query shapes used by the routers and fails when one of them
+is not served by an index (COLLSCAN, or no IXSCAN in the winning plan)
+
+Usage (from backend/, against a local mongod):
+    python -m benchmarks.check_query_plans
+
+Indexes are reconciled first, so the check reflects database/indexes.py.
+Exits with status 1 if any query shape is not index-backed.
+"""
+
+import os
+import sys
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from database.indexes import reconcile_indexes, USER_LIST_SORT
+
+
+# (where the query is issued, collection, filter, sort)
+QUERY_SHAPES = [
+    ("payments.check_payment_status", "bookings",
+     {"stripe_checkout_session_id": "cs_test_plan_check"}, None),
+    ("payment_service.create_payment_intent", "transactions",
+     {"booking_id": ObjectId(), "status": "pending"}, None),
+    ("payments.stripe_webhook", "transactions",
+     {"stripe_payment_intent_id": "pi_plan_check"}, None),
+    ("payments.get_transactions (customer)", "transactions",
+     {"customer_id": ObjectId()}, None),
+    ("admin.get_all_bookings", "bookings",
+     {}, [("created_at", -1)]),
+    ("bookings.list_bookings (customer)", "bookings",
+     {"customer_id": ObjectId()}, None),
+    ("bookings.list_bookings (partner)", "bookings",
+     {"partner_id": ObjectId()}, None),
+    ("professionals.register_professional", "professional_registrations",
+     {"email": "plan-check@example.com"}, None),
+    ("professionals.list_registrations", "professional_registrations",
+     {}, [("created_at", -1)]),
+    ("professionals.list_registrations (status)", "professional_registrations",
+     {"status": "pending"}, [("created_at", -1)]),
+    ("contact.get_contact_submissions", "contact_submissions",
+     {}, [("created_at", -1)]),
+    ("contact.get_contact_submissions (status)", "contact_submissions",
+     {"status": "new"}, [("created_at", -1)]),
+    ("notifications.get_notifications", "notifications",
+     {"user_id": ObjectId()}, [("created_at", -1)]),
+    ("cart.get_cart", "cart_items",
+     {"user_id": ObjectId()}, None),
+    ("customers.list_customers", "users",
+     {"role": "customer"}, USER_LIST_SORT),
+    ("partners.list_partners (status)", "users",
+     {"role": "partner", "status": "active"}, USER_LIST_SORT),
+]
+
+
+def plan_stages(plan: dict) -> list:
+    """Flatten the stage names of an explain winningPlan (classic and SBE layouts)"""
+    stages = []
+    if "queryPlan" in plan:
+        plan = plan["queryPlan"]
+    if "stage" in plan:
+        stages.append(plan["stage"])
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+def explain_find(db, collection: str, query: dict, sort) -> list:
+    command = {"find": collection, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    explain = db.command("explain", command, verbosity="queryPlanner")
+    return plan_stages(explain["queryPlanner"]["winningPlan"])
+
+
+def main() -> int:
+    connect_to_mongo()
+    db = get_database()
+    try:
+        reconcile_indexes(db)
+
+        failures = 0
+        print(f"\n{'QUERY':<45} {'COLLECTION':<28} PLAN")
+        for name, collection, query, sort in QUERY_SHAPES:
+            stages = explain_find(db, collection, query, sort)
+            index_backed = "COLLSCAN" not in stages and any("IXSCAN" in stage for stage in stages)
+            if not index_backed:
+                failures += 1
+            marker = "✅" if index_backed else "❌"
+            print(f"{marker} {name:<43} {collection:<28} {' <- '.join(stages)}")
+
+        if failures:
+            print(f"\n❌ {failures} query shape(s) not served by an index")
+            return 1
+        print(f"\n✅ All {len(QUERY_SHAPES)} query shapes use an index")
+        return 0
+    finally:
+        close_mongo_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Compression Benchmark
+Compresses representative API responses (booking list with embedded services,
+admin user list, notification page) with gzip and brotli at several levels,
+and reports CPU time against bytes saved, plus the resulting time to deliver
+each body over a given link (CPU + transfer), next to sending it uncompressed
+
+Payloads are generated with the shapes the routers return, so no server or
+database is needed. The COMPRESSION_* settings pick the levels used in production.
+
+Usage (from backend/):
+    python -m benchmarks.compression_bench [--mbps 20] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from utils.compression import compress, brotli
+
+GZIP_LEVELS = [1, 6, 9]
+BROTLI_QUALITIES = [1, 4, 6, 11]
+
+CITIES = ["Austin", "Dallas", "Houston", "San Antonio", "El Paso"]
+SERVICE_NAMES = ["Deep Cleaning", "Move-out Cleaning", "Window Washing", "Carpet Shampoo", "Office Cleaning"]
+STATUSES = ["pending", "confirmed", "in_progress", "completed", "cancelled"]
+
+
+# ============================================================================
+# PAYLOADS
+# ============================================================================
+
+def _timestamp(rng: random.Random) -> str:
+    moment = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(500_000))
+    return moment.isoformat()
+
+
+def _service(rng: random.Random) -> dict:
+    name = rng.choice(SERVICE_NAMES)
+    return {
+        "id": str(ObjectId()),
+        "name": name,
+        "description": f"{name} for homes and offices, supplies included.",
+        "price": round(rng.uniform(40, 400), 2),
+        "duration_minutes": rng.choice([60, 90, 120, 180]),
+        "quantity": rng.randint(1, 3),
+        "image_url": f"/uploads/blobs/{os.urandom(1).hex()}/{os.urandom(1).hex()}/{os.urandom(32).hex()}.jpg",
+    }
+
+
+def booking_list(rng: random.Random, count: int = 200) -> list:
+    return [{
+        "id": str(ObjectId()),
+        "customer_id": str(ObjectId()),
+        "partner_id": str(ObjectId()) if rng.random() < 0.8 else None,
+        "services": [_service(rng) for _ in range(rng.randint(1, 4))],
+        "status": rng.choice(STATUSES),
+        "scheduled_date": _timestamp(rng),
+        "address": f"{rng.randint(100, 9999)} Main St, {rng.choice(CITIES)}, TX {rng.randint(73301, 79999)}",
+        "notes": "Gate code 1234, please bring eco-friendly products." if rng.random() < 0.3 else None,
+        "total_amount": round(rng.uniform(40, 1200), 2),
+        "payment_status": rng.choice(["pending", "paid", "refunded"]),
+        "created_at": _timestamp(rng),
+        "updated_at": _timestamp(rng),
+    } for _ in range(count)]
+
+
+def user_list(rng: random.Random, count: int = 500) -> list:
+    return [{
+        "id": str(ObjectId()),
+        "email": f"user{index}@example.com",
+        "full_name": f"User {index}",
+        "phone": f"+1512{rng.randint(1000000, 9999999)}",
+        "role": rng.choice(["customer", "partner", "admin"]),
+        "status": rng.choice(["active", "inactive", "suspended"]),
+        "availability": rng.choice([True, False]),
+        "city": rng.choice(CITIES),
+        "created_at": _timestamp(rng),
+    } for index in range(count)]
+
+
+def notification_page(rng: random.Random, count: int = 50) -> dict:
+    return {
+        "notifications": [{
+            "id": str(ObjectId()),
+            "type": rng.choice(["booking_created", "booking_confirmed", "payment_received"]),
+            "title": "Booking update",
+            "message": f"Your booking on {_timestamp(rng)[:10]} is now {rng.choice(STATUSES)}.",
+            "read": rng.random() < 0.5,
+            "created_at": _timestamp(rng),
+        } for _ in range(count)],
+        "unread_count": rng.randint(0, count),
+        "next_cursor": str(ObjectId()),
+    }
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def measure(body: bytes, encoding: str, level: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressed = compress(body, encoding, level)
+        timings.append(time.perf_counter() - start)
+    return {"encoding": f"{encoding}-{level}", "bytes": len(compressed), "cpu_ms": statistics.median(timings) * 1000}
+
+
+def report(name: str, body: bytes, mbps: float, repeat: int):
+    bytes_per_ms = mbps * 1_000_000 / 8 / 1000
+    rows = [{"encoding": "identity", "bytes": len(body), "cpu_ms": 0.0}]
+    rows += [measure(body, "gzip", level, repeat) for level in GZIP_LEVELS]
+    if brotli is not None:
+        rows += [measure(body, "br", quality, repeat) for quality in BROTLI_QUALITIES]
+
+    production = {f"gzip-{settings.COMPRESSION_GZIP_LEVEL}", f"br-{settings.COMPRESSION_BROTLI_QUALITY}"}
+    print(f"\n📄 {name}: {len(body) / 1024:.1f}KB uncompressed")
+    print(f"{'ENCODING':<10} {'BYTES':>9} {'RATIO':>6} {'CPU':>9} {'MB/S':>7} {'KB SAVED/CPU MS':>16} {'DELIVERY':>10}")
+    for row in rows:
+        saved_kb = (len(body) - row["bytes"]) / 1024
+        speed = len(body) / (1024 * 1024) / (row["cpu_ms"] / 1000) if row["cpu_ms"] else 0
+        efficiency = saved_kb / row["cpu_ms"] if row["cpu_ms"] else 0
+        delivery = row["cpu_ms"] + row["bytes"] / bytes_per_ms
+        marker = " ◀" if row["encoding"] in production else ""
+        print(f"{row['encoding']:<10} {row['bytes']:>9} {len(body) / row['bytes']:>5.1f}x {row['cpu_ms']:>7.2f}ms "
+              f"{speed:>7.0f} {efficiency:>16.1f} {delivery:>8.1f}ms{marker}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Response compression CPU vs bytes benchmark")
+    parser.add_argument("--mbps", type=float, default=20.0, help="client link speed for the delivery column")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per encoding (median reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    payloads = {
+        "GET /api/bookings (200 bookings with services)": booking_list(rng),
+        "GET /api/admin/users (500 users)": user_list(rng),
+        "GET /api/notifications (50 notifications)": notification_page(rng),
+    }
+    if brotli is None:
+        print("⚠️  brotli is not installed, only gzip is measured")
+    print(f"Delivery = CPU + transfer at {args.mbps:g} Mbit/s; ◀ marks the configured levels")
+    for name, content in payloads.items():
+        report(name, JSONResponse(content).body, args.mbps, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
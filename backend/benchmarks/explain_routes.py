@@ -0,0 +1,370 @@
+"""
+Explain-Plan Regression Harness
+Drives the app through a scripted scenario, captures every Mongo query each
+endpoint issues, re-runs them with explain("executionStats") and reports
+the plan per endpoint
+
+Usage (from backend/, against a seeded local mongod):
+    python database/create_demo_records.py        # demo users, categories, services
+    python -m benchmarks.explain_routes [--max-ratio 10] [--json report.json]
+
+A query fails when its winning plan contains a COLLSCAN, or when it examines
+more than --max-ratio documents per document returned. A COLLSCAN on a query
+without a filter (e.g. list everything) is reported as FULL, since no index
+can serve it. Exits with status 1 if any query fails, any explain errors, or
+any scenario request returns an error.
+
+Endpoints that call Stripe (book-and-pay, payment status, refunds) are not
+part of the scenario. Records created by the scenario are removed at the end.
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from bson import ObjectId, json_util
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from database.mongodb import get_database
+from database.indexes import reconcile_indexes
+from benchmarks.check_query_plans import plan_stages
+
+DEMO_USERS = {
+    "admin": ("admin@noso.com", "admin123"),
+    "partner": ("partner@noso.com", "partner123"),
+    "customer": ("customer@noso.com", "customer123"),
+}
+
+# Commands that support explain; anything else (insert, getMore, ping...) is skipped
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Driver/session fields that explain rejects or that don't belong to the query
+DRIVER_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "signature",
+                 "apiVersion", "apiStrict", "apiDeprecationErrors", "autocommit", "startTransaction"}
+
+DEFAULT_MAX_RATIO = 10.0
+
+
+# ============================================================================
+# QUERY CAPTURE
+# ============================================================================
+
+class QueryCapture(monitoring.CommandListener):
+    """Records explainable commands issued while an endpoint label is set"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoint: Optional[str] = None
+        self.queries: Dict[str, Dict[str, dict]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        endpoint = self.endpoint
+        if endpoint is None or event.command_name not in EXPLAINABLE:
+            return
+
+        command = {key: value for key, value in copy.deepcopy(dict(event.command)).items()
+                   if key not in DRIVER_FIELDS}
+        # update/delete explain only accepts a single statement
+        statements = command.pop("updates", None) or command.pop("deletes", None)
+        commands = [command]
+        if statements is not None:
+            field = "updates" if event.command_name == "update" else "deletes"
+            commands = [{**command, field: [statement]} for statement in statements]
+
+        with self._lock:
+            for single in commands:
+                query_filter = _query_filter(event.command_name, single)
+                key = f"{event.command_name} {single[event.command_name]} {json.dumps(_shape(query_filter), sort_keys=True)}"
+                entry = self.queries.setdefault(endpoint, {}).setdefault(key, {
+                    "command_name": event.command_name,
+                    "collection": single[event.command_name],
+                    "shape": _shape(query_filter),
+                    "command": single,
+                    "calls": 0
+                })
+                entry["calls"] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def _query_filter(command_name: str, command: dict) -> dict:
+    """The filter part of a captured command"""
+    if command_name == "find":
+        return command.get("filter", {})
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline", [])
+        if pipeline and "$match" in pipeline[0]:
+            return pipeline[0]["$match"]
+        if pipeline and "$geoNear" in pipeline[0]:
+            return {"$geoNear": pipeline[0]["$geoNear"].get("query", {})}
+        return {}
+    if command_name in ("update", "delete"):
+        return command[f"{command_name}s"][0].get("q", {})
+    return command.get("query", {}) or {}
+
+
+def _shape(value):
+    """Replace literal values with '?' so queries differing only by value group together"""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shape(value[0])] if value else []
+    return "?"
+
+
+# ============================================================================
+# SCENARIO
+# ============================================================================
+
+class Scenario:
+    """Runs labelled HTTP calls against the app and tracks what it created"""
+
+    def __init__(self, client, capture: QueryCapture):
+        self.client = client
+        self.capture = capture
+        self.tokens: Dict[str, str] = {}
+        self.errors: List[str] = []
+
+    def call(self, role: Optional[str], method: str, template: str, json_body=None, params=None, **path_params):
+        headers = {"Authorization": f"Bearer {self.tokens[role]}"} if role else {}
+        label = f"{method} {template}"
+        self.capture.endpoint = label
+        try:
+            response = self.client.request(method, template.format(**path_params), json=json_body,
+                                           params=params, headers=headers)
+        finally:
+            self.capture.endpoint = None
+        if response.status_code >= 400:
+            self.errors.append(f"{label} -> {response.status_code} {response.text[:200]}")
+        return response
+
+    def login(self, role: str) -> bool:
+        email, password = DEMO_USERS[role]
+        response = self.call(None, "POST", "/api/auth/login", {"email": email, "password": password})
+        if response.status_code != 200:
+            return False
+        self.tokens[role] = response.json()["access_token"]
+        return True
+
+
+def _id_of(document: dict) -> str:
+    return document.get("_id") or document.get("id")
+
+
+def run_scenario(scenario: Scenario) -> bool:
+    """Catalog browse, cart, partner workflow, admin dashboard. Returns False if demo data is missing."""
+    db = get_database()
+    stamp = int(time.time())
+
+    for role in DEMO_USERS:
+        if not scenario.login(role):
+            print(f"❌ Cannot log in as {role}, run database/create_demo_records.py first")
+            return False
+
+    # Public pages
+    scenario.call(None, "GET", "/api/categories/")
+    services = scenario.call(None, "GET", "/api/services/").json()
+    if not services:
+        print("❌ No services found, run database/create_demo_records.py first")
+        return False
+    service = services[0]
+    scenario.call(None, "GET", "/api/services/{service_id}", service_id=_id_of(service))
+    submission = scenario.call(None, "POST", "/api/contact/submit", {
+        "name": "Explain Harness", "email": f"explain-{stamp}@example.com", "message": "Plan check"
+    }).json()
+    registration = scenario.call(None, "POST", "/api/professionals/register", {
+        "fullName": "Explain Harness", "email": f"explain-{stamp}@example.com", "phone": "021000000",
+        "nationality": "NZ", "hasNZLicense": True, "location": "auckland", "locationName": "Auckland"
+    }).json()
+
+    # Customer
+    customer = scenario.call("customer", "GET", "/api/auth/me").json()
+    scenario.call("customer", "GET", "/api/customers/me")
+    cart_item = scenario.call("customer", "POST", "/api/cart/", {"service_id": _id_of(service), "quantity": 1}).json()
+    scenario.call("customer", "GET", "/api/cart/")
+    if cart_item.get("id"):
+        scenario.call("customer", "PUT", "/api/cart/{item_id}", {"quantity": 2}, item_id=cart_item["id"])
+    scenario.call("customer", "GET", "/api/bookings")
+    scenario.call("customer", "GET", "/api/payments/transactions")
+    scenario.call("customer", "GET", "/api/notifications/")
+    scenario.call("customer", "GET", "/api/notifications/unread-count")
+
+    # Booking seeded directly (creating one through the API requires Stripe)
+    partner = scenario.call("partner", "GET", "/api/partners/me").json()
+    booking_id = db.bookings.insert_one({
+        "customer_id": ObjectId(_id_of(customer)),
+        "customer_name": customer["name"],
+        "customer_location": {"type": "Point", "coordinates": [174.76, -36.85]},
+        "partner_id": ObjectId(_id_of(partner)),
+        "partner_name": partner["name"],
+        "service_address": "1 Explain Street",
+        "service_location": {"type": "Point", "coordinates": [174.76, -36.85]},
+        "service_type": service["title"],
+        "scheduled_date": datetime.utcnow() + timedelta(days=1),
+        "notes": "",
+        "status": "assigned",
+        "created_at": datetime.utcnow(),
+        "partner_assigned_at": datetime.utcnow(),
+        "price": service.get("price", 0),
+        "payment_status": "paid",
+        "stripe_checkout_session_id": f"cs_explain_{stamp}"
+    }).inserted_id
+
+    # Partner workflow
+    scenario.call("partner", "GET", "/api/bookings")
+    scenario.call("partner", "GET", "/api/bookings/{booking_id}", booking_id=booking_id)
+    scenario.call("partner", "PUT", "/api/bookings/{booking_id}/work-started", booking_id=booking_id)
+    scenario.call("partner", "PUT", "/api/bookings/{booking_id}/work-completed", booking_id=booking_id)
+    scenario.call("partner", "GET", "/api/notifications/")
+    scenario.call("customer", "PUT", "/api/bookings/{booking_id}/rate", {"rating": 5, "comment": ""}, booking_id=booking_id)
+
+    # Admin dashboard
+    scenario.call("admin", "GET", "/api/admin/stats")
+    scenario.call("admin", "GET", "/api/admin/users")
+    scenario.call("admin", "GET", "/api/admin/bookings")
+    scenario.call("admin", "GET", "/api/customers")
+    scenario.call("admin", "GET", "/api/partners")
+    scenario.call("admin", "GET", "/api/payments/transactions")
+    scenario.call("admin", "GET", "/api/professionals/registrations")
+    scenario.call("admin", "GET", "/api/professionals/registrations", params={"status": "pending"})
+    scenario.call("admin", "GET", "/api/professionals/stats")
+    scenario.call("admin", "GET", "/api/contact/submissions")
+    scenario.call("admin", "GET", "/api/contact/submissions", params={"status": "new"})
+    scenario.call("admin", "GET", "/api/contact/submissions/count")
+
+    # Cleanup (also exercises the delete paths)
+    scenario.call("customer", "DELETE", "/api/cart/")
+    scenario.call("admin", "DELETE", "/api/admin/bookings/{booking_id}", booking_id=booking_id)
+    if submission.get("submission_id"):
+        scenario.call("admin", "DELETE", "/api/contact/submissions/{submission_id}",
+                      submission_id=submission["submission_id"])
+    if registration.get("registration_id"):
+        scenario.call("admin", "DELETE", "/api/professionals/registrations/{registration_id}",
+                      registration_id=registration["registration_id"])
+    return True
+
+
+# ============================================================================
+# EXPLAIN AND REPORT
+# ============================================================================
+
+def explain_query(db, entry: dict, max_ratio: float) -> dict:
+    """Run explain("executionStats") on a captured command and grade it"""
+    try:
+        explain = db.command({"explain": entry["command"], "verbosity": "executionStats"})
+    except Exception as e:
+        return {"status": "ERROR", "error": str(e)[:200], "plan": "", "keys": 0, "docs": 0, "returned": 0, "ratio": 0}
+
+    # Aggregations that are not fully pushed down report the query under the first stage
+    if "stages" in explain:
+        first_stage = explain["stages"][0]
+        explain = first_stage.get("$cursor") or next(iter(first_stage.values()), {})
+
+    stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+    execution = explain.get("executionStats", {})
+    docs = execution.get("totalDocsExamined", 0)
+    returned = execution.get("nReturned", 0)
+    ratio = docs / max(returned, 1)
+
+    status = "PASS"
+    if "COLLSCAN" in stages:
+        status = "FULL" if not entry["shape"] else "FAIL"
+    elif ratio > max_ratio:
+        status = "FAIL"
+
+    return {
+        "status": status,
+        "plan": " <- ".join(stages),
+        "keys": execution.get("totalKeysExamined", 0),
+        "docs": docs,
+        "returned": returned,
+        "ratio": round(ratio, 2)
+    }
+
+
+def build_report(capture: QueryCapture, max_ratio: float) -> List[dict]:
+    db = get_database()
+    report = []
+    for endpoint, queries in capture.queries.items():
+        rows = []
+        for entry in queries.values():
+            rows.append({
+                "query": f"{entry['command_name']} {entry['collection']}",
+                "shape": json_util.dumps(entry["shape"]),
+                "calls": entry["calls"],
+                **explain_query(db, entry, max_ratio)
+            })
+        report.append({"endpoint": endpoint, "queries": rows})
+    return report
+
+
+def print_report(report: List[dict]):
+    for endpoint in report:
+        print(f"\n{endpoint['endpoint']}")
+        print(f"  {'STATUS':<6} {'QUERY':<38} {'CALLS':>5} {'KEYS':>7} {'DOCS':>7} {'RET':>6} {'RATIO':>7}  PLAN / SHAPE")
+        for row in endpoint["queries"]:
+            print(
+                f"  {row['status']:<6} {row['query']:<38} {row['calls']:>5} {row['keys']:>7} "
+                f"{row['docs']:>7} {row['returned']:>6} {row['ratio']:>7}  {row['plan'] or row.get('error', '')}"
+            )
+            print(f"  {'':<6} {'':<38} {'':>5} {'':>7} {'':>7} {'':>6} {'':>7}  {row['shape']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Explain every query issued by the API scenario")
+    parser.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO,
+                        help="max documents examined per document returned (default: %(default)s)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    capture = QueryCapture()
+    # Must be registered before the app creates its MongoClient
+    monitoring.register(capture)
+    # Indexes are reconciled synchronously below, keep the background build out of the capture
+    settings.INDEX_RECONCILE_ON_STARTUP = False
+
+    from fastapi.testclient import TestClient
+    from app import app
+
+    with TestClient(app) as client:
+        reconcile_indexes()
+        scenario = Scenario(client, capture)
+        if not run_scenario(scenario):
+            return 2
+        report = build_report(capture, args.max_ratio)
+
+    print_report(report)
+
+    statuses = [row["status"] for endpoint in report for row in endpoint["queries"]]
+    print(
+        f"\n{len(report)} endpoints, {len(statuses)} query shapes: "
+        f"{statuses.count('PASS')} pass, {statuses.count('FULL')} unfiltered full scans, "
+        f"{statuses.count('FAIL')} fail, {statuses.count('ERROR')} explain errors"
+    )
+    if scenario.errors:
+        print("\n⚠️  Endpoints that returned an error during the scenario:")
+        for error in scenario.errors:
+            print(f"   {error}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"generated_at": datetime.utcnow().isoformat(), "max_ratio": args.max_ratio,
+                       "endpoints": report, "scenario_errors": scenario.errors}, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+
+    return 1 if "FAIL" in statuses or "ERROR" in statuses or scenario.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
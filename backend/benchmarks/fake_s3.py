@@ -0,0 +1,181 @@
+"""
+Fake S3
+Minimal in-memory S3-compatible server (path-style addressing) covering what
+utils/storage.S3Storage uses: object PUT/GET/HEAD/DELETE, multipart uploads,
+ListObjectsV2, DeleteObjects and presigned PUTs with x-amz-checksum-sha256.
+Signatures are not checked. For a production-like setup use MinIO instead.
+
+Usage (from backend/):
+    python -m benchmarks.fake_s3 [--port 12112]
+    STORAGE_BACKEND=s3 S3_ENDPOINT_URL=http://127.0.0.1:12112 S3_ACCESS_KEY_ID=x \\
+        S3_SECRET_ACCESS_KEY=x S3_PUBLIC_URL=http://127.0.0.1:12112/noso-uploads uvicorn app:app ...
+"""
+
+import argparse
+import base64
+import hashlib
+import itertools
+import re
+from datetime import datetime, timezone
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+from fastapi import FastAPI, Request, Response
+
+app = FastAPI(title="Fake S3", docs_url=None, redoc_url=None)
+
+_objects: dict = {}    # (bucket, key) -> object
+_uploads: dict = {}    # upload id -> {bucket, key, parts, headers}
+_upload_ids = itertools.count(1)
+
+XML_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+def _xml(body: str, status_code: int = 200) -> Response:
+    return Response(f'<?xml version="1.0" encoding="UTF-8"?>\n{body}', status_code=status_code,
+                    media_type="application/xml")
+
+
+def _error(code: str, message: str, status_code: int) -> Response:
+    return _xml(f"<Error><Code>{code}</Code><Message>{escape(message)}</Message></Error>", status_code)
+
+
+def _object_headers(obj: dict, request: Request) -> dict:
+    headers = {
+        "ETag": obj["etag"],
+        "Content-Type": obj["content_type"],
+        "Last-Modified": formatdate(obj["modified"].timestamp(), usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if obj.get("cache_control"):
+        headers["Cache-Control"] = obj["cache_control"]
+    if obj.get("checksum_sha256") and request.headers.get("x-amz-checksum-mode") == "ENABLED":
+        headers["x-amz-checksum-sha256"] = obj["checksum_sha256"]
+    return headers
+
+
+def _store(bucket: str, key: str, data: bytes, headers, checksum_sha256=None, etag=None):
+    _objects[(bucket, key)] = {
+        "data": data,
+        "etag": etag or f'"{hashlib.md5(data).hexdigest()}"',
+        "content_type": headers.get("content-type", "binary/octet-stream"),
+        "cache_control": headers.get("cache-control"),
+        "checksum_sha256": checksum_sha256,
+        "modified": datetime.now(timezone.utc),
+    }
+    return _objects[(bucket, key)]
+
+
+@app.put("/{bucket}/{key:path}")
+async def put_object(bucket: str, key: str, request: Request):
+    data = await request.body()
+    params = request.query_params
+
+    if "uploadId" in params:
+        upload = _uploads.get(params["uploadId"])
+        if upload is None:
+            return _error("NoSuchUpload", "Upload does not exist", 404)
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        upload["parts"][int(params["partNumber"])] = (data, etag)
+        return Response(headers={"ETag": etag})
+
+    checksum = request.headers.get("x-amz-checksum-sha256")
+    if checksum and base64.b64encode(hashlib.sha256(data).digest()).decode() != checksum:
+        return _error("BadDigest", "The SHA256 you specified did not match the calculated checksum.", 400)
+
+    obj = _store(bucket, key, data, request.headers, checksum)
+    headers = {"ETag": obj["etag"]}
+    if checksum:
+        headers["x-amz-checksum-sha256"] = checksum
+    return Response(headers=headers)
+
+
+@app.get("/{bucket}/{key:path}")
+async def get_object(bucket: str, key: str, request: Request):
+    obj = _objects.get((bucket, key))
+    if obj is None:
+        return _error("NoSuchKey", "The specified key does not exist.", 404)
+
+    data, headers = obj["data"], _object_headers(obj, request)
+    match = re.match(r"bytes=(\d+)-(\d*)$", request.headers.get("range", ""))
+    if match:
+        start = int(match.group(1))
+        end = min(int(match.group(2)) if match.group(2) else len(data) - 1, len(data) - 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        return Response(data[start:end + 1], status_code=206, headers=headers)
+    return Response(data, headers=headers)
+
+
+@app.head("/{bucket}/{key:path}")
+async def head_object(bucket: str, key: str, request: Request):
+    obj = _objects.get((bucket, key))
+    if obj is None:
+        return Response(status_code=404)
+    return Response(headers={**_object_headers(obj, request), "Content-Length": str(len(obj["data"]))})
+
+
+@app.delete("/{bucket}/{key:path}")
+async def delete_object(bucket: str, key: str, request: Request):
+    if "uploadId" in request.query_params:
+        _uploads.pop(request.query_params["uploadId"], None)
+    else:
+        _objects.pop((bucket, key), None)
+    return Response(status_code=204)
+
+
+@app.post("/{bucket}/{key:path}")
+async def multipart_upload(bucket: str, key: str, request: Request):
+    params = request.query_params
+
+    if "uploads" in params:
+        upload_id = f"upload-{next(_upload_ids)}"
+        _uploads[upload_id] = {"bucket": bucket, "key": key, "parts": {}, "headers": dict(request.headers)}
+        return _xml(
+            f'<InitiateMultipartUploadResult xmlns="{XML_NS}"><Bucket>{bucket}</Bucket>'
+            f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+        )
+
+    upload = _uploads.pop(params.get("uploadId", ""), None)
+    if upload is None:
+        return _error("NoSuchUpload", "Upload does not exist", 404)
+    numbers = [int(n) for n in re.findall(r"<PartNumber>(\d+)</PartNumber>", (await request.body()).decode())]
+    parts = [upload["parts"][n] for n in numbers]
+    digest = hashlib.md5(b"".join(bytes.fromhex(etag.strip('"')) for _, etag in parts)).hexdigest()
+    obj = _store(bucket, key, b"".join(data for data, _ in parts), upload["headers"], etag=f'"{digest}-{len(parts)}"')
+    return _xml(
+        f'<CompleteMultipartUploadResult xmlns="{XML_NS}"><Bucket>{bucket}</Bucket>'
+        f"<Key>{escape(key)}</Key><ETag>{escape(obj['etag'])}</ETag></CompleteMultipartUploadResult>"
+    )
+
+
+@app.get("/{bucket}")
+async def list_objects(bucket: str, request: Request):
+    prefix = request.query_params.get("prefix", "")
+    keys = sorted(key for b, key in _objects if b == bucket and key.startswith(prefix))
+    contents = "".join(
+        f"<Contents><Key>{escape(key)}</Key><Size>{len(_objects[(bucket, key)]['data'])}</Size>"
+        f"<ETag>{escape(_objects[(bucket, key)]['etag'])}</ETag></Contents>"
+        for key in keys
+    )
+    return _xml(
+        f'<ListBucketResult xmlns="{XML_NS}"><Name>{bucket}</Name><Prefix>{escape(prefix)}</Prefix>'
+        f"<KeyCount>{len(keys)}</KeyCount><MaxKeys>1000</MaxKeys><IsTruncated>false</IsTruncated>"
+        f"{contents}</ListBucketResult>"
+    )
+
+
+@app.post("/{bucket}")
+async def delete_objects(bucket: str, request: Request):
+    keys = re.findall(r"<Key>(.*?)</Key>", (await request.body()).decode())
+    for key in keys:
+        _objects.pop((bucket, key), None)
+    return _xml(f'<DeleteResult xmlns="{XML_NS}"></DeleteResult>')
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the fake S3 API")
+    parser.add_argument("--port", type=int, default=12112)
+    args = parser.parse_args()
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,124 @@
+"""
+Fake Stripe API
+Minimal in-memory stand-in for the Stripe endpoints the backend calls, so load
+tests exercise the payment flow without network calls or a Stripe account
+
+Every checkout session and payment intent is immediately paid/succeeded.
+
+Usage (from backend/):
+    python -m benchmarks.fake_stripe [--port 12111] [--latency-ms 0]
+    STRIPE_API_BASE=http://127.0.0.1:12111 uvicorn app:app ...
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from urllib.parse import parse_qsl
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake Stripe", docs_url=None, redoc_url=None)
+
+_objects: dict = {}
+_ids = itertools.count(1)
+# Simulated Stripe round-trip, set from the command line
+_latency_seconds = 0.0
+
+
+async def _form(request: Request) -> dict:
+    """Decode Stripe's form encoding (metadata[key]=value) into a flat dict plus metadata"""
+    fields = dict(parse_qsl((await request.body()).decode()))
+    metadata = {key[len("metadata["):-1]: value for key, value in fields.items() if key.startswith("metadata[")}
+    return {"fields": fields, "metadata": metadata}
+
+
+async def _respond(body: dict) -> JSONResponse:
+    if _latency_seconds:
+        await asyncio.sleep(_latency_seconds)
+    return JSONResponse(body)
+
+
+def _not_found(object_id: str) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"type": "invalid_request_error", "message": f"No such object: '{object_id}'"}},
+        status_code=404
+    )
+
+
+@app.post("/v1/checkout/sessions")
+async def create_checkout_session(request: Request):
+    form = await _form(request)
+    number = next(_ids)
+    session = {
+        "id": f"cs_fake_{number}",
+        "object": "checkout.session",
+        "url": f"http://fake-stripe.local/pay/cs_fake_{number}",
+        "status": "complete",
+        "payment_status": "paid",
+        "payment_intent": f"pi_fake_{number}",
+        "customer_email": form["fields"].get("customer_email"),
+        "metadata": form["metadata"],
+        "created": int(time.time())
+    }
+    _objects[session["id"]] = session
+    return await _respond(session)
+
+
+@app.get("/v1/checkout/sessions/{session_id}")
+async def retrieve_checkout_session(session_id: str):
+    if session_id not in _objects:
+        return _not_found(session_id)
+    return await _respond(_objects[session_id])
+
+
+@app.post("/v1/payment_intents")
+async def create_payment_intent(request: Request):
+    form = await _form(request)
+    number = next(_ids)
+    intent = {
+        "id": f"pi_fake_{number}",
+        "object": "payment_intent",
+        "amount": int(form["fields"].get("amount", 0)),
+        "currency": form["fields"].get("currency", "usd"),
+        "client_secret": f"pi_fake_{number}_secret_fake",
+        "status": "succeeded",
+        "latest_charge": f"ch_fake_{number}",
+        "metadata": form["metadata"],
+        "created": int(time.time())
+    }
+    _objects[intent["id"]] = intent
+    return await _respond(intent)
+
+
+@app.get("/v1/payment_intents/{intent_id}")
+async def retrieve_payment_intent(intent_id: str):
+    if intent_id not in _objects:
+        return _not_found(intent_id)
+    return await _respond(_objects[intent_id])
+
+
+@app.post("/v1/refunds")
+async def create_refund(request: Request):
+    form = await _form(request)
+    number = next(_ids)
+    return await _respond({
+        "id": f"re_fake_{number}",
+        "object": "refund",
+        "status": "succeeded",
+        "payment_intent": form["fields"].get("payment_intent"),
+        "amount": int(form["fields"].get("amount", 0)),
+        "created": int(time.time())
+    })
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the fake Stripe API")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    args = parser.parse_args()
+
+    _latency_seconds = args.latency_ms / 1000
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,396 @@
+"""
+HTTP Load Test
+Runs scripted user journeys against the real app (uvicorn + local mongod +
+fake Stripe) and reports latency percentiles and throughput per endpoint
+
+Journeys (virtual users loop over theirs until the duration is over):
+    customer: browse catalog -> add to cart -> book-and-pay -> poll payment status -> bookings, notifications
+    partner:  profile -> bookings -> work started -> work completed -> status completed
+    admin:    dashboard stats, bookings, users, transactions, registrations
+
+Usage (from backend/, with demo data and ideally synthetic data loaded):
+    python -m benchmarks.load_test [--users 20] [--duration 60] [--workers 2]
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000    # app already running
+    python -m benchmarks.load_test --compare benchmarks/results/load-20260101-120000.json
+
+Synthetic accounts (customer{i}@synthetic.noso.test) are used when they
+exist, otherwise every virtual user shares the demo account of its role.
+Results are written to benchmarks/results/ as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+DEMO_ACCOUNTS = {
+    "customer": ("customer@noso.com", "customer123"),
+    "partner": ("partner@noso.com", "partner123"),
+    "admin": ("admin@noso.com", "admin123"),
+}
+SYNTHETIC_PASSWORD = "synthetic123"
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.noso.test"
+
+# Payment status polls per checkout before giving up
+MAX_STATUS_POLLS = 3
+
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+class Recorder:
+    """Latency samples and status codes per endpoint template"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, label: str, seconds: float, status: int):
+        self.samples[label].append(seconds)
+        self.statuses[label][str(status)] += 1
+
+    def record_error(self, label: str, error: Exception):
+        self.errors[label][type(error).__name__] += 1
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for label in sorted(set(recorder.samples) | set(recorder.errors)):
+        values = sorted(recorder.samples.get(label, []))
+        failed = sum(count for status, count in recorder.statuses[label].items() if int(status) >= 400)
+        endpoints[label] = {
+            "count": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+            "http_errors": failed,
+            "statuses": dict(recorder.statuses[label]),
+            "exceptions": dict(recorder.errors.get(label, {}))
+        }
+    total = sum(entry["count"] for entry in endpoints.values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "total_requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "endpoints": endpoints
+    }
+
+
+# ============================================================================
+# VIRTUAL USERS
+# ============================================================================
+
+class VirtualUser:
+    """One logged-in API client running the journey of its role"""
+
+    def __init__(self, role: str, email: str, password: str, client: httpx.AsyncClient,
+                 recorder: Recorder, think_seconds: float, rng: random.Random):
+        self.role = role
+        self.email = email
+        self.password = password
+        self.client = client
+        self.recorder = recorder
+        self.think_seconds = think_seconds
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, method: str, template: str, json_body=None, params=None, **path_params):
+        label = f"{method} {template}"
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, template.format(**path_params), json=json_body,
+                                                 params=params, headers=self.headers)
+        except httpx.HTTPError as e:
+            self.recorder.record_error(label, e)
+            return None
+        self.recorder.record(label, time.perf_counter() - start, response.status_code)
+        return response
+
+    async def think(self):
+        if self.think_seconds:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.think_seconds)
+
+    async def login(self) -> bool:
+        response = await self.request("POST", "/api/auth/login", {"email": self.email, "password": self.password})
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def run(self, deadline: float):
+        journey = getattr(self, f"{self.role}_journey")
+        while time.monotonic() < deadline:
+            await journey()
+
+    async def customer_journey(self):
+        await self.request("GET", "/api/categories/")
+        await self.think()
+        response = await self.request("GET", "/api/services/")
+        services = response.json() if response is not None and response.status_code == 200 else []
+        if not services:
+            return
+        service_id = self.rng.choice(services)["_id"]
+        await self.request("GET", "/api/services/{service_id}", service_id=service_id)
+        await self.think()
+
+        await self.request("POST", "/api/cart/", {"service_id": service_id, "quantity": 1})
+        await self.request("GET", "/api/cart/")
+        await self.think()
+
+        response = await self.request("POST", "/api/payments/book-and-pay", {
+            "scheduled_date": (datetime.utcnow() + timedelta(days=self.rng.randint(1, 14))).isoformat(),
+            "service_address": "1 Load Test Street, Auckland",
+            "latitude": -36.8485 + self.rng.gauss(0, 0.05),
+            "longitude": 174.7633 + self.rng.gauss(0, 0.05),
+            "notes": "load test"
+        })
+        if response is not None and response.status_code == 200:
+            session_id = response.json()["session_id"]
+            for _ in range(MAX_STATUS_POLLS):
+                status_response = await self.request("GET", "/api/payments/status/{session_id}", session_id=session_id)
+                if (status_response is None or status_response.status_code != 200
+                        or status_response.json().get("status") == "completed"):
+                    break
+                await asyncio.sleep(0.2)
+        await self.think()
+
+        await self.request("GET", "/api/bookings")
+        await self.request("GET", "/api/notifications/")
+        await self.request("GET", "/api/notifications/unread-count")
+        await self.think()
+
+    async def partner_journey(self):
+        await self.request("GET", "/api/partners/me")
+        response = await self.request("GET", "/api/bookings")
+        bookings = response.json() if response is not None and response.status_code == 200 else []
+        await self.think()
+
+        open_bookings = [b for b in bookings if b.get("status") == "assigned" and not b.get("work_started_at")]
+        if open_bookings:
+            booking_id = self.rng.choice(open_bookings)["_id"]
+            # These move the booking to in_progress and completed themselves
+            await self.request("PUT", "/api/bookings/{booking_id}/work-started", booking_id=booking_id)
+            await self.think()
+            await self.request("PUT", "/api/bookings/{booking_id}/work-completed", booking_id=booking_id)
+        await self.request("GET", "/api/notifications/")
+        await self.think()
+
+    async def admin_journey(self):
+        await self.request("GET", "/api/admin/stats")
+        await self.think()
+        await self.request("GET", "/api/admin/bookings")
+        await self.think()
+        await self.request("GET", "/api/admin/users")
+        await self.request("GET", "/api/payments/transactions")
+        await self.request("GET", "/api/professionals/registrations")
+        await self.request("GET", "/api/contact/submissions/count")
+        await self.think()
+
+
+# ============================================================================
+# SERVERS
+# ============================================================================
+
+def start_process(args: List[str], env: dict, health_url: str, timeout: float = 30.0) -> subprocess.Popen:
+    """Start a server process from backend/ and wait until health_url answers"""
+    process = subprocess.Popen(args, cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(args)} exited with {process.returncode}")
+        try:
+            if httpx.get(health_url, timeout=1.0).status_code < 500:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"{health_url} did not come up within {timeout:.0f}s")
+
+
+def stop_process(process: Optional[subprocess.Popen]):
+    if process is None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ============================================================================
+# RUN
+# ============================================================================
+
+async def detect_accounts(client: httpx.AsyncClient) -> str:
+    """Use synthetic accounts when the generator has been run"""
+    response = await client.post("/api/auth/login", json={
+        "email": f"customer0@{SYNTHETIC_EMAIL_DOMAIN}", "password": SYNTHETIC_PASSWORD
+    })
+    return "synthetic" if response.status_code == 200 else "demo"
+
+
+def account_for(role: str, index: int, accounts: str) -> tuple[str, str]:
+    if accounts == "synthetic" and role != "admin":
+        return f"{role}{index}@{SYNTHETIC_EMAIL_DOMAIN}", SYNTHETIC_PASSWORD
+    return DEMO_ACCOUNTS[role]
+
+
+async def run_load(args) -> dict:
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        accounts = args.accounts if args.accounts != "auto" else await detect_accounts(client)
+
+        customers, partners, admins = (int(part) for part in args.mix.split(","))
+        total_weight = customers + partners + admins
+        roles = (["customer"] * round(args.users * customers / total_weight)
+                 + ["partner"] * round(args.users * partners / total_weight))
+        roles += ["admin"] * max(args.users - len(roles), 0)
+
+        users = []
+        for index, role in enumerate(roles[:args.users]):
+            email, password = account_for(role, index, accounts)
+            users.append(VirtualUser(role, email, password, client, recorder, args.think_ms / 1000,
+                                     random.Random(rng.random())))
+
+        print(f"🔑 Logging in {len(users)} virtual users ({accounts} accounts, "
+              f"{Counter(user.role for user in users)})")
+        logged_in = await asyncio.gather(*(user.login() for user in users))
+        users = [user for user, ok in zip(users, logged_in) if ok]
+        if not users:
+            raise RuntimeError("No virtual user could log in, load demo data first")
+
+        print(f"🏃 Running for {args.duration}s...")
+        started = time.monotonic()
+        await asyncio.gather(*(user.run(started + args.duration) for user in users))
+        elapsed = time.monotonic() - started
+
+    summary = summarize(recorder, elapsed)
+    summary["accounts"] = accounts
+    summary["virtual_users"] = dict(Counter(user.role for user in users))
+    return summary
+
+
+def print_summary(summary: dict, previous: Optional[dict] = None):
+    print(f"\n{'ENDPOINT':<55} {'COUNT':>7} {'RPS':>7} {'P50':>9} {'P95':>9} {'P99':>9} {'ERR':>5}"
+          + (f" {'ΔP95':>8}" if previous else ""))
+    for label, entry in summary["endpoints"].items():
+        line = (f"{label:<55} {entry['count']:>7} {entry['rps']:>7} {entry['p50_ms']:>8.1f}ms "
+                f"{entry['p95_ms']:>7.1f}ms {entry['p99_ms']:>7.1f}ms {entry['http_errors']:>5}")
+        if previous:
+            old = previous["endpoints"].get(label)
+            if old and old["p95_ms"]:
+                line += f" {(entry['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:>+7.1f}%"
+            else:
+                line += f" {'new':>8}"
+        print(line)
+    print(f"\n{summary['total_requests']:,} requests in {summary['duration_s']}s = "
+          f"{summary['throughput_rps']} req/s")
+    if previous:
+        change = (summary["throughput_rps"] - previous["throughput_rps"]) / max(previous["throughput_rps"], 0.01) * 100
+        print(f"Throughput vs {previous.get('started_at', 'previous run')}: {change:+.1f}%")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end HTTP load test")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--mix", default="7,2,1", help="customer,partner,admin weights (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--think-ms", type=float, default=0, help="average pause between steps")
+    parser.add_argument("--accounts", choices=["auto", "synthetic", "demo"], default="auto")
+    parser.add_argument("--timeout", type=float, default=30, help="per request, seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", help="use an already running app instead of starting one")
+    parser.add_argument("--port", type=int, default=8077, help="port of the app started by the test")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers of the app started by the test")
+    parser.add_argument("--stripe-port", type=int, default=12111)
+    parser.add_argument("--stripe-latency-ms", type=float, default=0, help="simulated Stripe round-trip")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    stripe_process = app_process = None
+    started_at = datetime.now()
+    try:
+        if not args.base_url:
+            env = dict(os.environ)
+            stripe_url = f"http://127.0.0.1:{args.stripe_port}"
+            stripe_process = start_process(
+                [sys.executable, "-m", "benchmarks.fake_stripe", "--port", str(args.stripe_port),
+                 "--latency-ms", str(args.stripe_latency_ms)],
+                env, f"{stripe_url}/v1/checkout/sessions/health"
+            )
+            env["STRIPE_API_BASE"] = stripe_url
+            args.base_url = f"http://127.0.0.1:{args.port}"
+            app_process = start_process(
+                [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(args.port),
+                 "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+                env, f"{args.base_url}/health"
+            )
+
+        summary = asyncio.run(run_load(args))
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 2
+    finally:
+        stop_process(app_process)
+        stop_process(stripe_process)
+
+    results = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        **summary
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_summary(results, previous)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"📝 Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
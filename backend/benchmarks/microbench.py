@@ -0,0 +1,187 @@
+"""
+Microbenchmarks
+Times the backend's hot pure-Python functions on fixed datasets and compares
+them with the tracked baseline in benchmarks/microbench_baseline.json
+
+Usage (from backend/):
+    python -m benchmarks.microbench                   # compare with the baseline
+    python -m benchmarks.microbench --save-baseline   # record a new baseline
+    python -m benchmarks.microbench -k serialize      # only matching benchmarks
+
+Exits with status 1 when a benchmark is slower than the baseline by more
+than --tolerance. Baselines are machine specific: record them on the
+machine that runs the comparison.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.serializers import serialize_doc, serialize_list
+from utils.security import create_access_token, decode_token, verify_password, get_password_hash
+from utils.schemas import BookingResponse
+from services.booking_service import build_assignment_pipeline
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "microbench_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# Timing rounds per benchmark (each at least 0.2s, see timeit autorange),
+# the fastest round is the reported number
+REPEAT = 5
+
+
+# ============================================================================
+# FIXED DATASETS
+# ============================================================================
+
+def make_booking(rng: random.Random, index: int) -> dict:
+    """A completed booking document as stored in MongoDB"""
+    created_at = datetime(2026, 1, 1) + timedelta(minutes=index * 37)
+    scheduled = created_at + timedelta(days=rng.randint(1, 14))
+    return {
+        "_id": ObjectId(f"{index:024x}"),
+        "customer_id": ObjectId(f"{index + 1_000_000:024x}"),
+        "customer_name": "Sarah Johnson",
+        "customer_location": {"type": "Point", "coordinates": [174.76 + rng.random() / 10, -36.84]},
+        "partner_id": ObjectId(f"{index % 50 + 2_000_000:024x}"),
+        "partner_name": "John's Cleaning Services",
+        "service_address": f"{index} Queen Street, Auckland",
+        "service_location": {"type": "Point", "coordinates": [174.76 + rng.random() / 10, -36.84]},
+        "services": [
+            {"service_id": f"{n:024x}", "service_title": f"Service {n}", "service_price": 49.0 + n,
+             "service_image": None, "quantity": 1}
+            for n in range(rng.randint(1, 3))
+        ],
+        "service_type": "Bathroom Cleaning",
+        "scheduled_date": scheduled,
+        "notes": "",
+        "status": "completed",
+        "created_at": created_at,
+        "partner_assigned_at": created_at + timedelta(minutes=5),
+        "work_started_at": scheduled,
+        "work_completed_at": scheduled + timedelta(hours=2),
+        "price": 149.0,
+        "commission_percentage": 20.0,
+        "commission_amount": 29.8,
+        "partner_earnings": 119.2,
+        "payment_status": "paid",
+        "paid_at": created_at,
+        "stripe_checkout_session_id": f"cs_test_{index}",
+        "stripe_payment_intent_id": f"pi_test_{index}",
+        "customer_rating": {"rating": 5.0, "review_title": "Great job", "comment": "", "image": None,
+                            "rated_at": scheduled + timedelta(days=1)},
+    }
+
+
+def make_bookings(count: int) -> List[dict]:
+    rng = random.Random(1234)
+    return [make_booking(rng, index) for index in range(count)]
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def build_benchmarks() -> Dict[str, Callable[[], object]]:
+    """Name -> zero-argument callable, datasets are built once here"""
+    booking = make_bookings(1)[0]
+    bookings = make_bookings(100)
+    serialized = serialize_list(bookings)
+    booking_list = TypeAdapter(List[BookingResponse])
+
+    token_data = {"sub": "65f1c0ffee0000000000abcd", "email": "customer@noso.com", "role": "customer"}
+    token = create_access_token(token_data)
+    password_hash = get_password_hash("customer123")
+
+    location = {"type": "Point", "coordinates": [174.7633, -36.8485]}
+    scheduled = datetime(2026, 3, 1, 10, 0)
+
+    return {
+        "serialize_doc[booking]": lambda: serialize_doc(booking),
+        "serialize_list[100 bookings]": lambda: serialize_list(bookings),
+        "create_access_token": lambda: create_access_token(token_data),
+        "decode_token": lambda: decode_token(token),
+        "verify_password[bcrypt]": lambda: verify_password("customer123", password_hash),
+        "build_assignment_pipeline": lambda: build_assignment_pipeline(location, scheduled),
+        "validate List[BookingResponse][100]": lambda: booking_list.validate_python(serialized),
+    }
+
+
+def measure(func: Callable[[], object]) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    rounds = [elapsed / number for elapsed in timer.repeat(repeat=REPEAT, number=number)]
+    return {
+        "per_call_us": round(min(rounds) * 1e6, 3),
+        "median_us": round(statistics.median(rounds) * 1e6, 3),
+        "iterations": number * REPEAT
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backend microbenchmarks")
+    parser.add_argument("-k", dest="filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown vs baseline, 0.25 = 25%% (default: %(default)s)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'BENCHMARK':<40} {'PER CALL':>12} {'MEDIAN':>12} {'BASELINE':>12} {'CHANGE':>8}")
+    for name, func in build_benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        result = measure(func)
+        results[name] = result
+
+        line = f"{name:<40} {result['per_call_us']:>10.2f}us {result['median_us']:>10.2f}us"
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous:
+            change = result["per_call_us"] / previous["per_call_us"] - 1
+            line += f" {previous['per_call_us']:>10.2f}us {change:>+7.1%}"
+            if change > args.tolerance:
+                regressions.append(name)
+                line += "  ❌"
+        print(line)
+
+    if args.save_baseline:
+        benchmarks = {**baseline.get("benchmarks", {}), **results} if args.filter else results
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+                "benchmarks": benchmarks
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\n📝 Baseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}")
+        return 1
+    if baseline:
+        print(f"\n✅ No regression beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Upload Benchmark
+Writes concurrent large uploads to disk the old way (await image.read() plus a
+blocking write on the event loop) and through utils.uploads.save_upload, and
+reports wall time, Python heap peak and the longest event-loop stall
+
+Uploads are built the way Starlette's multipart parser hands them to the
+endpoints (a SpooledTemporaryFile that has rolled over to disk), so no server
+or database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.upload_bench [--uploads 8] [--size-mb 20]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from tempfile import SpooledTemporaryFile
+from fastapi import UploadFile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.uploads import save_upload
+
+# Starlette's spool threshold for multipart file parts
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def make_uploads(count: int, size: int) -> list:
+    payload = os.urandom(1024 * 1024) * (size // (1024 * 1024))
+    uploads = []
+    for index in range(count):
+        spool = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        spool.write(payload)
+        spool.seek(0)
+        uploads.append(UploadFile(file=spool, size=len(payload), filename=f"photo_{index}.jpg"))
+    return uploads
+
+
+async def buffered_write(upload: UploadFile, destination: str, max_size: int) -> int:
+    """What the booking image endpoints did before save_upload"""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    with open(destination, "wb") as buffer:
+        content = await upload.read()
+        buffer.write(content)
+    return len(content)
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Longest gap between scheduled wakeups, i.e. how long the loop was blocked"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_strategy(name: str, writer, uploads: list, directory: str, max_size: int) -> dict:
+    for upload in uploads:
+        await upload.seek(0)
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    written = await asyncio.gather(*[
+        writer(upload, os.path.join(directory, name, upload.filename), max_size)
+        for upload in uploads
+    ])
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop.set()
+    stall = await watcher
+
+    return {
+        "strategy": name,
+        "seconds": elapsed,
+        "mb_per_second": sum(written) / (1024 * 1024) / elapsed,
+        "heap_peak_mb": peak / (1024 * 1024),
+        "max_loop_stall_ms": stall * 1000
+    }
+
+
+async def check_limit(directory: str) -> bool:
+    """An upload over the limit is rejected and leaves nothing behind"""
+    upload = make_uploads(1, 2 * 1024 * 1024)[0]
+    destination = os.path.join(directory, "limit", "too_big.jpg")
+    try:
+        await save_upload(upload, destination, max_size=1024 * 1024)
+    except Exception as e:
+        rejected = getattr(e, "status_code", None) == 413
+    else:
+        rejected = False
+    leftovers = os.listdir(os.path.dirname(destination)) if os.path.isdir(os.path.dirname(destination)) else []
+    return rejected and not leftovers
+
+
+async def main_async(args) -> int:
+    size = args.size_mb * 1024 * 1024
+    print(f"📦 Preparing {args.uploads} uploads of {args.size_mb}MB...")
+    uploads = make_uploads(args.uploads, size)
+    directory = tempfile.mkdtemp(prefix="upload-bench-")
+
+    try:
+        results = [
+            await run_strategy("buffered", buffered_write, uploads, directory, size),
+            await run_strategy("streamed", save_upload, uploads, directory, size),
+        ]
+
+        print(f"\n{'STRATEGY':<10} {'SECONDS':>8} {'MB/S':>8} {'HEAP PEAK':>11} {'LOOP STALL':>11}")
+        for r in results:
+            print(f"{r['strategy']:<10} {r['seconds']:>8.2f} {r['mb_per_second']:>8.0f} "
+                  f"{r['heap_peak_mb']:>9.1f}MB {r['max_loop_stall_ms']:>9.1f}ms")
+
+        limit_ok = await check_limit(directory)
+        print(f"\n{'✅' if limit_ok else '❌'} Oversized upload rejected with 413 and no partial file")
+        return 0 if limit_ok else 1
+    finally:
+        for upload in uploads:
+            await upload.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent upload write benchmark")
+    parser.add_argument("--uploads", type=int, default=8, help="concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=20, help="size of each upload")
+    return asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,14 +20,96 @@ class Settings(BaseSettings):
     MONGO_URI: str = "mongodb://localhost:27017/"
     DB_NAME: str = "noso_company"
 
+    # MongoDB client (per uvicorn worker, so the server sees N workers x pool size)
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = 5 * 60 * 1000  # 5 minutes
+    MONGO_MAX_CONNECTING: int = 2
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = 30000
+    MONGO_COMPRESSORS: str = "zstd,snappy,zlib"  # In preference order; zstd/snappy need zstandard/python-snappy
+    MONGO_ZLIB_COMPRESSION_LEVEL: int = 6
+    MONGO_RETRY_READS: bool = True
+    MONGO_RETRY_WRITES: bool = True
+
+    # Response compression (utils/compression.py); br needs the brotli package, else gzip only
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller bodies already fit in a packet or two
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; above ~5 the CPU cost climbs much faster than the savings
+    COMPRESSION_CONTENT_TYPES: list = ["application/json", "text/plain", "text/html", "text/csv", "application/xml"]
+
+    # Streaming admin exports: documents fetched per cursor batch
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Index reconciliation (database/indexes.py), runs in the background at startup
+    INDEX_RECONCILE_ON_STARTUP: bool = True
+    INDEX_LOCK_TTL_SECONDS: int = 600  # Lock is taken over after this if a worker dies mid-build
+
+    # Stale-tolerant reads (admin lists/analytics) go to secondaryPreferred
+    MONGO_STALE_READS_ENABLED: bool = True
+    MONGO_MAX_STALENESS_SECONDS: int = 120  # MongoDB requires at least 90
+
+    # Query profiling
+    QUERY_PROFILER_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 100.0
+    QUERY_COUNT_WARN_THRESHOLD: int = 25  # Log requests issuing at least this many commands
+
+    # Event loop watchdog
+    LOOP_WATCHDOG_ENABLED: bool = True
+    LOOP_WATCHDOG_INTERVAL_MS: float = 50.0
+    LOOP_LAG_THRESHOLD_MS: float = 100.0
+
+    # Readiness probe (/ready)
+    READINESS_PING_TIMEOUT_MS: int = 1000
+    READINESS_CACHE_SECONDS: float = 2.0
+    READINESS_MAX_POOL_WAITERS: int = 10
+    READINESS_MAX_THREADPOOL_BACKLOG: int = 20
+
     # Stripe
     STRIPE_SECRET_KEY: str
     STRIPE_PUBLISHABLE_KEY: str
+    STRIPE_API_BASE: Optional[str] = None  # Override for a fake Stripe (benchmarks/fake_stripe.py)
     CURRENCY: str = "usd"
 
     # File Upload
     UPLOAD_FOLDER: str = "uploads/images/bookings"
     MAX_FILE_SIZE: int = 16 * 1024 * 1024  # 16MB
+    # Content-addressed uploads (utils/blobs.py), served at /uploads/blobs
+    BLOB_FOLDER: str = "uploads/blobs"
+    BLOB_GC_GRACE_SECONDS: int = 60 * 60  # unreferenced blobs are kept this long before GC
+    BLOB_GC_CLAIM_TIMEOUT_SECONDS: int = 10 * 60  # a GC claim older than this was abandoned
+
+    # Blob storage backend (utils/storage.py): "filesystem" (BLOB_FOLDER) or "s3"
+    STORAGE_BACKEND: str = "filesystem"  # or "s3", needs the s3 extra (uv sync --extra s3)
+    S3_ENDPOINT_URL: Optional[str] = None  # MinIO/stand-in URL, None for AWS
+    S3_REGION: str = "us-east-1"
+    S3_BUCKET: str = "noso-uploads"
+    S3_KEY_PREFIX: str = "blobs/"
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_PUBLIC_URL: str = ""  # Base URL objects are publicly readable at (bucket or CDN)
+    S3_PRESIGN_EXPIRES_SECONDS: int = 15 * 60
+    S3_IMMUTABLE_CACHE_CONTROL: bool = True
+    # /uploads serving (utils/static_files.py): cache lifetime of non-blob files, and
+    # whether the proxy sends the bytes (X-Accel-Redirect: UPLOAD_ACCEL_PREFIX/uploads/...)
+    UPLOAD_CACHE_MAX_AGE_SECONDS: int = 60 * 60
+    UPLOAD_ACCEL_REDIRECT: bool = False
+    UPLOAD_ACCEL_PREFIX: str = ""
+    # Resized WebP/AVIF copies of uploaded images, rendered in a process pool
+    IMAGE_VARIANTS_ENABLED: bool = True
+    IMAGE_VARIANT_WIDTHS: list = [320, 640, 1280]
+    IMAGE_VARIANT_FORMATS: list = ["webp", "avif"]
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_WORKERS: int = 2
+
+    # Notifications
+    NOTIFICATION_COALESCE_WINDOW_SECONDS: int = 15 * 60  # 15 minutes, 0 disables coalescing
+    NOTIFICATION_DIGEST_ENABLED: bool = False
+    NOTIFICATION_DIGEST_INTERVAL_SECONDS: int = 24 * 60 * 60  # 1 day
+    NOTIFICATION_DIGEST_EVENTS: list = ["login"]
 
     # Frontend URL (for Stripe redirects)
     FRONTEND_URL: str = "http://localhost:5173"
@@ -14,8 +14,14 @@ Demo Users Created:
 3. Customer User
    - Email: customer@noso.com
    - Password: customer123
+
+Synthetic mode (production-sized data for load and performance testing,
+see database/synthetic_data.py):
+   python database/create_demo_records.py --synthetic [--customers N] [--partners N]
+       [--bookings N] [--seed N] [--batch-size N] [--workers N]
 """
 
+import argparse
 import sys
 import os
 from datetime import datetime, timezone
@@ -525,9 +531,41 @@ def create_demo_data():
     print("\n✅ Database connection closed")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create demo data, optionally with production-sized synthetic data")
+    parser.add_argument("--synthetic", action="store_true", help="also generate synthetic data")
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--partners", type=int, default=10_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--notification-rate", type=float, default=1.0,
+                        help="fraction of booking events that produce a notification (0-1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730, help="period covered by signups and bookings")
+    parser.add_argument("--until", type=datetime.fromisoformat,
+                        help="end of the period, ISO date (default: today); fix it for reproducible runs")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, default=4)
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
         create_demo_data()
+        if args.synthetic:
+            from database.synthetic_data import generate_synthetic_data
+            until = args.until.replace(tzinfo=timezone.utc) if args.until else None
+            generate_synthetic_data(
+                customers=args.customers,
+                partners=args.partners,
+                bookings=args.bookings,
+                notification_rate=args.notification_rate,
+                seed=args.seed,
+                days=args.days,
+                until=until,
+                batch_size=args.batch_size,
+                workers=args.workers
+            )
     except Exception as e:
         print(f"\n❌ Error creating demo data: {e}")
         import traceback
@@ -0,0 +1,280 @@
+"""
+MongoDB Index Registry
+Declarative index definitions per collection, a reconciler that brings the
+database in line with them, and an $indexStats based drift report
+
+Run manually:  python -m database.indexes [--report]
+"""
+
+import os
+import socket
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from database.mongodb import get_database
+
+
+# ============================================================================
+# INDEX DEFINITIONS
+# Every index must have an explicit name, the reconciler matches on it.
+# Changing a definition here rebuilds that index on the next startup.
+# ============================================================================
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+        # Trailing _id keeps paginated user lists (sorted on the full key) free of in-memory sorts
+        IndexModel([("role", ASCENDING), ("status", ASCENDING), ("availability", ASCENDING), ("_id", ASCENDING)],
+                   name="role_status_availability"),
+    ],
+    "bookings": [
+        IndexModel([("service_location", GEOSPHERE)], name="service_location_2dsphere"),
+        IndexModel([("customer_location", GEOSPHERE)], name="customer_location_2dsphere"),
+        IndexModel([("status", ASCENDING), ("customer_id", ASCENDING)], name="status_customer_id"),
+        IndexModel([("partner_id", ASCENDING), ("status", ASCENDING)], name="partner_id_status"),
+        # status_customer_id can't serve list_bookings, which filters on customer_id alone
+        IndexModel([("customer_id", ASCENDING)], name="booking_customer_id"),
+        IndexModel([("created_at", DESCENDING)], name="booking_created_at"),
+        # Stripe return/poll lookups (check_payment_status, webhook dedup)
+        IndexModel([("stripe_checkout_session_id", ASCENDING)], sparse=True, name="booking_checkout_session"),
+    ],
+    "transactions": [
+        # Names are the driver defaults these indexes were originally created with
+        IndexModel([("stripe_payment_intent_id", ASCENDING)], unique=True, sparse=True,
+                   name="stripe_payment_intent_id_1"),
+        IndexModel([("stripe_checkout_session_id", ASCENDING)], unique=True, sparse=True,
+                   name="stripe_checkout_session_id_1"),
+        IndexModel([("customer_id", ASCENDING), ("status", ASCENDING)], name="customer_id_status"),
+        IndexModel([("booking_id", ASCENDING), ("status", ASCENDING)], name="booking_id_status"),
+    ],
+    "categories": [
+        IndexModel([("name", ASCENDING)], unique=True, name="category_name_unique"),
+        IndexModel([("is_active", ASCENDING)], name="category_is_active"),
+    ],
+    "services": [
+        IndexModel([("category_id", ASCENDING)], name="service_category_id"),
+        IndexModel([("is_active", ASCENDING)], name="service_is_active"),
+        IndexModel([("title", TEXT), ("description", TEXT), ("tags", TEXT)], name="service_text_search"),
+    ],
+    "cart_items": [
+        IndexModel([("user_id", ASCENDING), ("service_id", ASCENDING)], unique=True, name="user_service_unique"),
+        IndexModel([("user_id", ASCENDING)], name="cart_user_id"),
+    ],
+    "notifications": [
+        IndexModel([("user_id", ASCENDING), ("is_read", ASCENDING), ("created_at", DESCENDING)],
+                   name="user_read_created"),
+        IndexModel([("user_id", ASCENDING)], name="notification_user_id"),
+        IndexModel([("type", ASCENDING), ("created_at", DESCENDING)], name="type_created"),
+        IndexModel([("user_id", ASCENDING), ("event", ASCENDING), ("related_id", ASCENDING),
+                    ("is_read", ASCENDING), ("first_occurred_at", DESCENDING)],
+                   name="user_event_related_window"),
+    ],
+    "professional_registrations": [
+        IndexModel([("email", ASCENDING)], name="registration_email"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="registration_status_created"),
+        IndexModel([("created_at", DESCENDING)], name="registration_created"),
+    ],
+    "contact_submissions": [
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="contact_status_created"),
+        IndexModel([("created_at", DESCENDING)], name="contact_created"),
+    ],
+    "blobs": [
+        # Garbage collection scan: refcount <= 0 released before the grace cutoff
+        IndexModel([("refcount", ASCENDING), ("released_at", ASCENDING)], name="blob_refcount_released"),
+    ],
+}
+
+# Sort for paginated user lists, the key order of role_status_availability
+USER_LIST_SORT = [("role", ASCENDING), ("status", ASCENDING), ("availability", ASCENDING), ("_id", ASCENDING)]
+
+
+# ============================================================================
+# DEFINITION COMPARISON
+# ============================================================================
+
+# Options the server adds or fills in that are not part of our definitions
+SERVER_OPTIONS = {"v", "ns", "background", "2dsphereIndexVersion", "textIndexVersion",
+                  "default_language", "language_override"}
+
+
+def _definition(index: dict) -> dict:
+    """Normalize an index document (spec or list_indexes output) for comparison"""
+    definition = {key: value for key, value in index.items() if key not in SERVER_OPTIONS and key != "name"}
+    key = [(field, direction) for field, direction in dict(definition.pop("key")).items()]
+
+    # The server stores text indexes as _fts/_ftsx with the indexed fields in weights
+    if any(direction == TEXT for _, direction in key) or "weights" in definition:
+        weights = definition.pop("weights", None) or {field: 1 for field, direction in key if direction == TEXT}
+        definition["weights"] = dict(sorted(dict(weights).items()))
+        key = [(field, direction) for field, direction in key
+               if direction != TEXT and field not in ("_fts", "_ftsx")]
+        key += [("_fts", TEXT), ("_ftsx", 1)]
+
+    definition["key"] = [(field, int(direction) if isinstance(direction, float) else direction)
+                         for field, direction in key]
+    for option in ("unique", "sparse"):
+        if not definition.get(option):
+            definition.pop(option, None)
+    return definition
+
+
+# ============================================================================
+# RECONCILER
+# ============================================================================
+
+LOCK_ID = "index_reconciler"
+
+
+def _acquire_lock(db: Database, owner: str) -> bool:
+    """Take the cross-worker reconciler lock, unless another live holder has it"""
+    now = datetime.now(timezone.utc)
+    try:
+        db.locks.find_one_and_update(
+            {"_id": LOCK_ID, "expires_at": {"$lt": now}},
+            {"$set": {
+                "owner": owner,
+                "acquired_at": now,
+                "expires_at": now + timedelta(seconds=settings.INDEX_LOCK_TTL_SECONDS)
+            }},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # Lock document exists and has not expired
+        return False
+
+
+def _release_lock(db: Database, owner: str):
+    db.locks.delete_one({"_id": LOCK_ID, "owner": owner})
+
+
+def reconcile_indexes(db: Optional[Database] = None) -> Optional[dict]:
+    """
+    Diff INDEXES against list_indexes() and create missing or changed indexes.
+    Only one worker reconciles at a time; the others skip and return None.
+    Indexes that exist but are not declared are reported, never dropped.
+    """
+    db = db if db is not None else get_database()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    if not _acquire_lock(db, owner):
+        print("📝 Index reconciliation already running in another worker, skipping")
+        return None
+
+    result = {"created": [], "rebuilt": [], "undeclared": [], "errors": []}
+    try:
+        for collection, models in INDEXES.items():
+            existing = {index["name"]: index for index in db[collection].list_indexes()}
+
+            for model in models:
+                spec = model.document
+                name = f"{collection}.{spec['name']}"
+                wanted = _definition(spec)
+                try:
+                    current = existing.pop(spec["name"], None)
+                    if current is None:
+                        # Same keys under another name would make create_index fail, replace it
+                        for other_name, other in list(existing.items()):
+                            if _definition(other)["key"] == wanted["key"]:
+                                db[collection].drop_index(other_name)
+                                existing.pop(other_name)
+                                result["rebuilt"].append(f"{collection}.{other_name} -> {spec['name']}")
+                                break
+                        else:
+                            result["created"].append(name)
+                        db[collection].create_indexes([model])
+                    elif _definition(current) != wanted:
+                        db[collection].drop_index(spec["name"])
+                        db[collection].create_indexes([model])
+                        result["rebuilt"].append(name)
+                except Exception as e:
+                    result["errors"].append(f"{name}: {e}")
+                    print(f"⚠️  Error reconciling index {name}: {e}")
+
+            result["undeclared"] += [f"{collection}.{name}" for name in existing if name != "_id_"]
+    finally:
+        _release_lock(db, owner)
+
+    print(
+        f"✅ Indexes reconciled: {len(result['created'])} created, {len(result['rebuilt'])} rebuilt, "
+        f"{len(result['errors'])} errors"
+    )
+    if result["undeclared"]:
+        print(f"   Undeclared indexes (not dropped): {', '.join(result['undeclared'])}")
+    return result
+
+
+def start_index_reconciler():
+    """Reconcile indexes on a background thread so worker startup does not wait on builds"""
+    def run():
+        try:
+            reconcile_indexes()
+        except Exception as e:
+            print(f"⚠️  Index reconciliation failed: {e}")
+
+    threading.Thread(target=run, name="index-reconciler", daemon=True).start()
+
+
+# ============================================================================
+# DRIFT REPORT
+# ============================================================================
+
+def get_index_report(db: Optional[Database] = None) -> dict:
+    """
+    Compare declared indexes with $indexStats.
+    Usage counters are per mongod and reset on restart, so 'unused' means
+    unused on the server that answered since it started.
+    """
+    db = db if db is not None else get_database()
+    report = {}
+
+    for collection, models in INDEXES.items():
+        declared = {model.document["name"] for model in models}
+        stats = {stat["name"]: stat for stat in db[collection].aggregate([{"$indexStats": {}}])}
+
+        indexes = [
+            {
+                "name": name,
+                "ops": stat["accesses"]["ops"],
+                "since": stat["accesses"]["since"],
+                "declared": name in declared or name == "_id_"
+            }
+            for name, stat in sorted(stats.items())
+        ]
+        report[collection] = {
+            "missing": sorted(declared - stats.keys()),
+            "unused": sorted(name for name, stat in stats.items()
+                             if name != "_id_" and stat["accesses"]["ops"] == 0),
+            "undeclared": sorted(name for name in stats if name not in declared and name != "_id_"),
+            "indexes": indexes
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    from database.mongodb import connect_to_mongo, close_mongo_connection
+
+    connect_to_mongo()
+    try:
+        if "--report" not in sys.argv:
+            reconcile_indexes()
+        for collection, entry in get_index_report().items():
+            print(f"\n{collection}")
+            for index in entry["indexes"]:
+                flag = "" if index["declared"] else "  (undeclared)"
+                print(f"  {index['name']:<32} ops={index['ops']:<10} since={index['since']:%Y-%m-%d %H:%M}{flag}")
+            for name in entry["missing"]:
+                print(f"  {name:<32} MISSING")
+    finally:
+        close_mongo_connection()
@@ -1,13 +1,16 @@
 """
 MongoDB Database Management
-Handles MongoDB connection, indexes, and document schemas
+Handles MongoDB connection and document schemas (indexes: database/indexes.py)
 """
 
+import importlib.util
 from pymongo import MongoClient
 from pymongo.database import Database
+from pymongo.read_preferences import SecondaryPreferred
 from typing import TypedDict, Optional, List
 from datetime import datetime
 from config import settings
+from database.monitoring import QueryProfiler, pool_monitor
 
 
 # ============================================================================
@@ -17,15 +20,102 @@ from config import settings
 # Global MongoDB client
 mongo_client: MongoClient = None
 db: Database = None
+# Same database, reading from secondaries when available (see get_stale_tolerant_database)
+stale_tolerant_db: Database = None
+
+
+# Python module each wire compressor depends on
+COMPRESSOR_MODULES = {
+    "zstd": "zstandard",
+    "snappy": "snappy",
+    "zlib": "zlib"
+}
+
+
+def get_compressors() -> List[str]:
+    """Configured wire compressors whose library is installed, in preference order"""
+    requested = [name.strip() for name in settings.MONGO_COMPRESSORS.split(",") if name.strip()]
+    return [
+        name for name in requested
+        if name in COMPRESSOR_MODULES and importlib.util.find_spec(COMPRESSOR_MODULES[name])
+    ]
+
+
+def get_client_options() -> dict:
+    """MongoClient keyword arguments built from settings (unset values keep driver defaults)"""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "maxConnecting": settings.MONGO_MAX_CONNECTING,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+        "retryReads": settings.MONGO_RETRY_READS,
+        "retryWrites": settings.MONGO_RETRY_WRITES
+    }
+
+    compressors = get_compressors()
+    if compressors:
+        options["compressors"] = compressors
+        if "zlib" in compressors:
+            options["zlibCompressionLevel"] = settings.MONGO_ZLIB_COMPRESSION_LEVEL
+
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def get_pool_config() -> dict:
+    """Effective client configuration as resolved by the driver (URI options included)"""
+    if mongo_client is None:
+        return {}
+
+    options = mongo_client.options
+    pool_options = options.pool_options
+    return {
+        "max_pool_size": pool_options.max_pool_size,
+        "min_pool_size": pool_options.min_pool_size,
+        "max_idle_time_seconds": pool_options.max_idle_time_seconds,
+        "max_connecting": pool_options.max_connecting,
+        "wait_queue_timeout_seconds": pool_options.wait_queue_timeout,
+        "server_selection_timeout_seconds": options.server_selection_timeout,
+        "connect_timeout_seconds": pool_options.connect_timeout,
+        "socket_timeout_seconds": pool_options.socket_timeout,
+        "compressors": get_compressors(),
+        "retry_reads": options.retry_reads,
+        "retry_writes": options.retry_writes
+    }
 
 
 def connect_to_mongo():
     """Initialize MongoDB connection"""
-    global mongo_client, db
-    mongo_client = MongoClient(settings.MONGO_URI)
+    global mongo_client, db, stale_tolerant_db
+    event_listeners = [pool_monitor]
+    if settings.QUERY_PROFILER_ENABLED:
+        event_listeners.append(QueryProfiler())
+    mongo_client = MongoClient(settings.MONGO_URI, event_listeners=event_listeners, **get_client_options())
     db = mongo_client[settings.DB_NAME]
+    stale_tolerant_db = db
+    if settings.MONGO_STALE_READS_ENABLED:
+        stale_tolerant_db = mongo_client.get_database(
+            settings.DB_NAME,
+            read_preference=SecondaryPreferred(max_staleness=settings.MONGO_MAX_STALENESS_SECONDS)
+        )
     print(f"✅ Connected to MongoDB database: {settings.DB_NAME}")
 
+    config = get_pool_config()
+    print(
+        f"   Pool: max={config['max_pool_size']} min={config['min_pool_size']} "
+        f"maxIdle={config['max_idle_time_seconds']}s maxConnecting={config['max_connecting']} "
+        f"waitQueue={config['wait_queue_timeout_seconds']}s"
+    )
+    print(
+        f"   Timeouts: serverSelection={config['server_selection_timeout_seconds']}s "
+        f"connect={config['connect_timeout_seconds']}s socket={config['socket_timeout_seconds']}s | "
+        f"compressors={','.join(config['compressors']) or 'none'} | "
+        f"retryReads={config['retry_reads']} retryWrites={config['retry_writes']}"
+    )
+
 
 def close_mongo_connection():
     """Close MongoDB connection"""
@@ -40,171 +130,20 @@ def get_database() -> Database:
     return db
 
 
-# ============================================================================
-# DATABASE INDEXES
-# ============================================================================
+def get_stale_tolerant_database() -> Database:
+    """
+    Get database instance for reads that tolerate replication lag.
+    Reads prefer secondaries no more than MONGO_MAX_STALENESS_SECONDS behind the
+    primary, falling back to the primary (and to plain reads on a standalone server).
+    Use for admin lists and analytics, never for read-your-own-write flows.
+    Usage: db = get_stale_tolerant_database() or db=Depends(get_stale_tolerant_database)
+    """
+    return stale_tolerant_db
 
-def create_indexes():
-    """Create all MongoDB indexes"""
-    db = get_database()
-
-    print("📝 Creating database indexes...")
-
-    try:
-        # Users collection indexes
-        db.users.create_index("email", unique=True, name="email_unique")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating users.email index: {e}")
-
-    try:
-        db.users.create_index([("location", "2dsphere")], name="location_2dsphere")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating users.location index: {e}")
-
-    try:
-        db.users.create_index([
-            ("role", 1),
-            ("status", 1),
-            ("availability", 1)
-        ], name="role_status_availability")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating users compound index: {e}")
-
-    # Bookings collection indexes
-    try:
-        db.bookings.create_index([("service_location", "2dsphere")], name="service_location_2dsphere")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating bookings.service_location index: {e}")
-
-    try:
-        db.bookings.create_index([("customer_location", "2dsphere")], name="customer_location_2dsphere")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating bookings.customer_location index: {e}")
-
-    try:
-        db.bookings.create_index([
-            ("status", 1),
-            ("customer_id", 1)
-        ], name="status_customer_id")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating bookings status/customer index: {e}")
-
-    try:
-        db.bookings.create_index([
-            ("partner_id", 1),
-            ("status", 1)
-        ], name="partner_id_status")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating bookings partner/status index: {e}")
-
-    # Transactions collection indexes
-    try:
-        db.transactions.create_index("stripe_payment_intent_id", unique=True, sparse=True)
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating transactions.stripe_payment_intent_id index: {e}")
-
-    try:
-        db.transactions.create_index("stripe_checkout_session_id", unique=True, sparse=True)
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating transactions.stripe_checkout_session_id index: {e}")
-
-    try:
-        db.transactions.create_index([
-            ("customer_id", 1),
-            ("status", 1)
-        ], name="customer_id_status")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating transactions customer/status index: {e}")
-
-    # Categories collection indexes
-    try:
-        db.categories.create_index("name", unique=True, name="category_name_unique")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating categories.name index: {e}")
-
-    try:
-        db.categories.create_index("is_active", name="category_is_active")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating categories.is_active index: {e}")
-
-    # Services collection indexes
-    try:
-        db.services.create_index("category_id", name="service_category_id")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating services.category_id index: {e}")
-
-    try:
-        db.services.create_index("is_active", name="service_is_active")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating services.is_active index: {e}")
-
-    try:
-        db.services.create_index([
-            ("title", "text"),
-            ("description", "text"),
-            ("tags", "text")
-        ], name="service_text_search")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating services text search index: {e}")
-
-    # Cart items collection indexes
-    try:
-        db.cart_items.create_index([
-            ("user_id", 1),
-            ("service_id", 1)
-        ], unique=True, name="user_service_unique")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating cart_items compound index: {e}")
-
-    try:
-        db.cart_items.create_index("user_id", name="cart_user_id")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating cart_items.user_id index: {e}")
-
-    # Notifications collection indexes
-    try:
-        db.notifications.create_index([
-            ("user_id", 1),
-            ("is_read", 1),
-            ("created_at", -1)
-        ], name="user_read_created")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating notifications compound index: {e}")
-
-    try:
-        db.notifications.create_index("user_id", name="notification_user_id")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating notifications.user_id index: {e}")
-
-    try:
-        db.notifications.create_index([
-            ("type", 1),
-            ("created_at", -1)
-        ], name="type_created")
-    except Exception as e:
-        if "already exists" not in str(e):
-            print(f"⚠️  Error creating notifications type/created index: {e}")
-
-    print("✅ Database indexes created successfully")
+
+def get_mongo_client() -> MongoClient:
+    """Get MongoDB client instance"""
+    return mongo_client
 
 
 # ============================================================================
@@ -258,6 +197,8 @@ class BookingDocument(TypedDict, total=False):
     partner_assigned_at: Optional[datetime]
     work_started_at: Optional[datetime]
     work_completed_at: Optional[datetime]
+    cancelled_at: Optional[datetime]
+    last_transition: Optional[dict]  # {id, to, at, by} of the latest status change, see services/booking_service.py
 
     # Pricing and commission
     total_price: float
@@ -279,6 +220,11 @@ class BookingDocument(TypedDict, total=False):
     # Work images
     before_cleaning_image: Optional[str]
     after_cleaning_image: Optional[str]
+    before_cleaning_image_variants: Optional[List[dict]]  # [{width, format, url}], see utils/images.py
+    after_cleaning_image_variants: Optional[List[dict]]
+
+    # Optimistic concurrency: incremented by every write (missing on older documents = 0)
+    version: int
 
 
 class TransactionDocument(TypedDict, total=False):
@@ -349,3 +295,8 @@ class NotificationDocument(TypedDict, total=False):
     read_at: Optional[datetime]
     related_id: Optional[str]  # e.g., booking_id, user_id
     metadata: Optional[dict]  # Additional data
+    event: Optional[str]  # e.g., "login", "booking_status_change"
+    count: int  # Number of coalesced occurrences
+    first_occurred_at: datetime  # Start of the coalescing window
+    is_digest: bool  # Periodic summary of low-priority events
+    digest_period_start: Optional[datetime]
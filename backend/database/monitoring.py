@@ -0,0 +1,211 @@
+"""
+MongoDB Command Monitoring
+Per-request query counting and slow-query profiling via pymongo's CommandListener,
+plus connection pool usage via ConnectionPoolListener
+"""
+
+import os
+import threading
+from contextvars import ContextVar, Token
+from typing import Dict, Optional
+from pymongo import monitoring
+from utils.metrics import DB_POOL_CONNECTIONS, DB_POOL_CHECKOUT_FAILURES
+
+
+# ============================================================================
+# REQUEST-SCOPED STATS
+# ============================================================================
+
+class RequestQueryStats:
+    """Mongo commands issued while handling a single request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_command: Optional[str] = None
+        self._pending: Dict[int, str] = {}
+
+    def record(self, command: str, duration_ms: float):
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms >= self.slowest_ms:
+            self.slowest_ms = duration_ms
+            self.slowest_command = command
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def start_request_stats() -> tuple[RequestQueryStats, Token]:
+    """Attach a fresh stats collector to the current request context"""
+    stats = RequestQueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request_stats(token: Token):
+    """Detach the stats collector from the current request context"""
+    _request_stats.reset(token)
+
+
+def get_request_stats() -> Optional[RequestQueryStats]:
+    """Get the stats collector of the current request, if any"""
+    return _request_stats.get()
+
+
+# ============================================================================
+# COMMAND LISTENER
+# ============================================================================
+
+def _command_label(event: monitoring.CommandStartedEvent) -> str:
+    """Build a 'command collection' label, e.g. 'find bookings'"""
+    target = event.command.get(event.command_name)
+    if event.command_name == "getMore":
+        target = event.command.get("collection")
+    if isinstance(target, str):
+        return f"{event.command_name} {target}"
+    return event.command_name
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """
+    Records every command into the stats collector of the request that issued it.
+    Commands issued outside of a request (startup, scripts) are ignored.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats._pending[event.request_id] = _command_label(event)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event)
+
+    def _finish(self, event):
+        stats = _request_stats.get()
+        if stats is None:
+            return
+        command = stats._pending.pop(event.request_id, event.command_name)
+        stats.record(command, event.duration_micros / 1000)
+
+
+# ============================================================================
+# CONNECTION POOL
+# ============================================================================
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks open, checked-out and waited-for connections across all pools of the client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+
+    def _adjust(self, field: str, delta: int):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+        DB_POOL_CONNECTIONS.labels(state=field).inc(delta)
+
+    def connection_created(self, event):
+        self._adjust("open", 1)
+
+    def connection_closed(self, event):
+        self._adjust("open", -1)
+
+    def connection_check_out_started(self, event):
+        self._adjust("waiting", 1)
+
+    def connection_checked_out(self, event):
+        self._adjust("waiting", -1)
+        self._adjust("checked_out", 1)
+
+    def connection_checked_in(self, event):
+        self._adjust("checked_out", -1)
+
+    def connection_check_out_failed(self, event):
+        self._adjust("waiting", -1)
+        with self._lock:
+            self.checkout_failures += 1
+        DB_POOL_CHECKOUT_FAILURES.labels(reason=str(event.reason)).inc()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "checkout_failures": self.checkout_failures
+            }
+
+
+pool_monitor = PoolMonitor()
+
+
+# ============================================================================
+# PER-ROUTE SUMMARY
+# ============================================================================
+
+_route_stats: Dict[str, dict] = {}
+_route_stats_lock = threading.Lock()
+
+
+def record_route_stats(route: str, stats: RequestQueryStats):
+    """Fold a finished request into the per-route summary of this worker"""
+    with _route_stats_lock:
+        entry = _route_stats.setdefault(route, {
+            "requests": 0,
+            "commands": 0,
+            "max_commands": 0,
+            "db_ms": 0.0,
+            "slowest_ms": 0.0,
+            "slowest_command": None
+        })
+        entry["requests"] += 1
+        entry["commands"] += stats.count
+        entry["max_commands"] = max(entry["max_commands"], stats.count)
+        entry["db_ms"] += stats.total_ms
+        if stats.slowest_ms > entry["slowest_ms"]:
+            entry["slowest_ms"] = stats.slowest_ms
+            entry["slowest_command"] = stats.slowest_command
+
+
+def get_route_summary() -> dict:
+    """Get the per-route query summary of this worker, busiest routes first"""
+    with _route_stats_lock:
+        routes = {route: dict(entry) for route, entry in _route_stats.items()}
+
+    summary = []
+    for route, entry in routes.items():
+        summary.append({
+            "route": route,
+            "requests": entry["requests"],
+            "avg_commands": round(entry["commands"] / entry["requests"], 2),
+            "max_commands": entry["max_commands"],
+            "avg_db_ms": round(entry["db_ms"] / entry["requests"], 3),
+            "total_db_ms": round(entry["db_ms"], 3),
+            "slowest_ms": round(entry["slowest_ms"], 3),
+            "slowest_command": entry["slowest_command"]
+        })
+    summary.sort(key=lambda item: item["total_db_ms"], reverse=True)
+
+    return {"pid": os.getpid(), "routes": summary}
@@ -0,0 +1,476 @@
+"""
+Synthetic Data Generator
+Production-sized data for performance work: customers, geo-distributed
+partners, bookings with statuses and ratings, transactions and notifications
+
+Usage (from backend/, the catalog comes from the demo data):
+    python database/create_demo_records.py --synthetic
+    python database/create_demo_records.py --synthetic --customers 1000 --partners 100 --bookings 10000
+
+Output is deterministic for a given seed, shape and --until date: every
+document (ids included) is derived from (seed, kind, index), so it does not
+depend on how batches are spread over the worker processes. All synthetic
+documents carry synthetic=True and are removed at the start of each run.
+"""
+
+import os
+import random
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from bson import ObjectId
+from pymongo import MongoClient
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from utils.security import get_password_hash
+
+# Password of every synthetic user (hashed once, bcrypt is too slow per user)
+SYNTHETIC_PASSWORD = "synthetic123"
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.noso.test"
+
+# (city, longitude, latitude, share of customers and partners)
+CITIES = [
+    ("Auckland", 174.7633, -36.8485, 34),
+    ("Wellington", 174.7762, -41.2865, 11),
+    ("Christchurch", 172.6362, -43.5321, 8),
+    ("Hamilton", 175.2793, -37.7870, 4),
+    ("Tauranga", 176.1651, -37.6878, 3),
+    ("Dunedin", 170.5028, -45.8788, 3),
+    ("Palmerston North", 175.6082, -40.3523, 2),
+    ("Napier", 176.9120, -39.4928, 2),
+    ("Nelson", 173.2840, -41.2706, 1),
+    ("Queenstown", 168.6626, -45.0312, 1),
+]
+# Standard deviation of the scatter around a city centre, in degrees (~9 km)
+CITY_SPREAD_DEGREES = 0.08
+
+FIRST_NAMES = ["Aroha", "Liam", "Olivia", "Noah", "Isla", "Jack", "Amelia", "Oliver", "Charlotte", "Leo",
+               "Mia", "Hunter", "Harper", "Mason", "Ava", "Nikau", "Ella", "Lucas", "Sophie", "Tama"]
+LAST_NAMES = ["Smith", "Wilson", "Williams", "Brown", "Taylor", "Jones", "Ngata", "Singh", "Walker", "Thompson",
+              "White", "Anderson", "Clark", "Harris", "Martin", "Patel", "Young", "King", "Wright", "Parata"]
+STREETS = ["Queen Street", "High Street", "Victoria Street", "Great North Road", "Main Road", "Church Street",
+           "Beach Road", "Park Avenue", "Hill Street", "Station Road"]
+BUSINESS_SUFFIXES = ["Cleaning Co", "Home Services", "Property Care", "Maintenance", "Garden & Clean"]
+
+BOOKING_STATUSES = ["completed", "cancelled", "assigned", "in_progress", "pending", "unassigned"]
+BOOKING_STATUS_WEIGHTS = [60, 8, 10, 4, 12, 6]
+REVIEW_TITLES = ["Great job", "Very thorough", "On time and friendly", "Good value", "Would book again", "Okay"]
+
+# Kind byte embedded in synthetic ObjectIds, keeps ids unique across collections
+KIND_IDS = {"customer": 1, "partner": 2, "booking": 3, "transaction": 4, "notification": 5}
+# Notification slots per booking (slot number is part of the notification id)
+MAX_NOTIFICATIONS_PER_BOOKING = 5
+
+# Collections touched by the generator
+SYNTHETIC_COLLECTIONS = ["users", "bookings", "transactions", "notifications"]
+
+
+# ============================================================================
+# DETERMINISTIC HELPERS
+# ============================================================================
+
+def _rng(seed: int, kind: str, index: int) -> random.Random:
+    """Per-document random generator (string seeds are stable across processes)"""
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def synthetic_id(kind: str, index: int, created_at: datetime) -> ObjectId:
+    """ObjectId with the document's creation time, so _id order follows created_at"""
+    return ObjectId(
+        struct.pack(">IB", int(created_at.timestamp()), KIND_IDS[kind]) + index.to_bytes(7, "big")
+    )
+
+
+def _pick_city(rng: random.Random) -> int:
+    return rng.choices(range(len(CITIES)), weights=[city[3] for city in CITIES])[0]
+
+
+def _location(rng: random.Random, city_index: int) -> dict:
+    _, longitude, latitude, _ = CITIES[city_index]
+    return {
+        "type": "Point",
+        "coordinates": [
+            round(longitude + rng.gauss(0, CITY_SPREAD_DEGREES), 6),
+            round(latitude + rng.gauss(0, CITY_SPREAD_DEGREES), 6)
+        ]
+    }
+
+
+def _signup_time(ctx: dict, index: int, total: int) -> datetime:
+    """Signups spread evenly over the generated period"""
+    return ctx["start"] + (ctx["end"] - ctx["start"]) * (index / max(total, 1))
+
+
+def customer_profile(ctx: dict, index: int) -> dict:
+    """Everything bookings need to know about customer #index"""
+    rng = _rng(ctx["seed"], "customer", index)
+    city_index = _pick_city(rng)
+    created_at = _signup_time(ctx, index, ctx["customers"])
+    return {
+        "_id": synthetic_id("customer", index, created_at),
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "city_index": city_index,
+        "address": f"{rng.randint(1, 400)} {rng.choice(STREETS)}, {CITIES[city_index][0]}, New Zealand",
+        "location": _location(rng, city_index),
+        "created_at": created_at
+    }
+
+
+def partner_profile(ctx: dict, index: int) -> dict:
+    rng = _rng(ctx["seed"], "partner", index)
+    city_index = _pick_city(rng)
+    created_at = _signup_time(ctx, index, ctx["partners"])
+    last_name = rng.choice(LAST_NAMES)
+    return {
+        "_id": synthetic_id("partner", index, created_at),
+        "name": f"{last_name} {rng.choice(BUSINESS_SUFFIXES)}",
+        "city_index": city_index,
+        "address": f"{rng.randint(1, 400)} {rng.choice(STREETS)}, {CITIES[city_index][0]}, New Zealand",
+        "location": _location(rng, city_index),
+        "status": "active" if rng.random() < 0.95 else "pending",
+        "availability": rng.random() < 0.8,
+        "commission_percentage": rng.choice([15.0, 20.0, 20.0, 25.0]),
+        "created_at": created_at
+    }
+
+
+# ============================================================================
+# DOCUMENT BUILDERS
+# ============================================================================
+
+def build_customer(ctx: dict, index: int) -> dict:
+    profile = customer_profile(ctx, index)
+    return {
+        "_id": profile["_id"],
+        "email": f"customer{index}@{SYNTHETIC_EMAIL_DOMAIN}",
+        "password": ctx["password_hash"],
+        "role": "customer",
+        "name": profile["name"],
+        "phone": f"+64 21 {index % 1000:03d} {index // 1000 % 10000:04d}",
+        "address": profile["address"],
+        "location": profile["location"],
+        "status": "active",
+        "created_at": profile["created_at"],
+        "synthetic": True
+    }
+
+
+def build_partner(ctx: dict, index: int) -> dict:
+    profile = partner_profile(ctx, index)
+    return {
+        "_id": profile["_id"],
+        "email": f"partner{index}@{SYNTHETIC_EMAIL_DOMAIN}",
+        "password": ctx["password_hash"],
+        "role": "partner",
+        "name": profile["name"],
+        "phone": f"+64 22 {index % 1000:03d} {index // 1000 % 10000:04d}",
+        "address": profile["address"],
+        "location": profile["location"],
+        "status": profile["status"],
+        "availability": profile["availability"],
+        "business_type": "Independent Contractor",
+        "service_area": f"{CITIES[profile['city_index']][0]} Region",
+        "commission_percentage": profile["commission_percentage"],
+        "created_at": profile["created_at"],
+        "synthetic": True
+    }
+
+
+def _notification(ctx: dict, booking_index: int, slot: int, user_id: ObjectId, booking_id: ObjectId,
+                  event: str, notification_type: str, title: str, description: str, at: datetime,
+                  rng: random.Random) -> dict:
+    # Older notifications are read, recent ones about half the time
+    is_read = at < ctx["end"] - timedelta(days=30) or rng.random() < 0.5
+    return {
+        "_id": synthetic_id("notification", booking_index * MAX_NOTIFICATIONS_PER_BOOKING + slot, at),
+        "user_id": str(user_id),
+        "title": title,
+        "description": description,
+        "type": notification_type,
+        "event": event,
+        "is_read": is_read,
+        "is_digest": False,
+        "count": 1,
+        "created_at": at,
+        "first_occurred_at": at,
+        "read_at": at + timedelta(hours=rng.randint(1, 72)) if is_read else None,
+        "related_id": str(booking_id),
+        "metadata": {},
+        "synthetic": True
+    }
+
+
+def build_booking(ctx: dict, index: int) -> tuple[dict, dict, List[dict]]:
+    """Booking #index with its transaction and notifications"""
+    rng = _rng(ctx["seed"], "booking", index)
+
+    # Squaring skews bookings towards long-standing customers
+    customer = customer_profile(ctx, int(ctx["customers"] * rng.random() ** 2))
+    created_at = customer["created_at"] + (ctx["end"] - customer["created_at"]) * rng.random()
+    booking_id = synthetic_id("booking", index, created_at)
+
+    services = [
+        {
+            "service_id": service["id"],
+            "service_title": service["title"],
+            "service_price": service["price"],
+            "service_image": service["image"],
+            "quantity": rng.choice([1, 1, 1, 2])
+        }
+        for service in rng.sample(ctx["services"], k=min(len(ctx["services"]), rng.choice([1, 1, 1, 2, 3])))
+    ]
+    price = round(sum(item["service_price"] * item["quantity"] for item in services), 2)
+    status = rng.choices(BOOKING_STATUSES, weights=BOOKING_STATUS_WEIGHTS)[0]
+    scheduled_date = created_at + timedelta(days=rng.randint(1, 14), hours=rng.randint(8, 16))
+    session_id = f"cs_synthetic_{ctx['seed']}_{index}"
+    payment_intent_id = f"pi_synthetic_{ctx['seed']}_{index}"
+
+    booking = {
+        "_id": booking_id,
+        "customer_id": customer["_id"],
+        "customer_name": customer["name"],
+        "customer_location": customer["location"],
+        "service_address": customer["address"],
+        "service_location": customer["location"],
+        "service_type": services[0]["service_title"] if len(services) == 1 else f"{len(services)} Services",
+        "services": services,
+        "scheduled_date": scheduled_date,
+        "notes": "",
+        "status": status,
+        "created_at": created_at,
+        "price": price,
+        "payment_status": "paid",
+        "paid_at": created_at,
+        "stripe_checkout_session_id": session_id,
+        "stripe_payment_intent_id": payment_intent_id,
+        "synthetic": True
+    }
+
+    notifications = [
+        _notification(ctx, index, 0, customer["_id"], booking_id, "booking_created", "booking",
+                      "Booking Created", f"Your booking for {booking['service_type']} has been created.",
+                      created_at, rng),
+        _notification(ctx, index, 1, customer["_id"], booking_id, "payment_received", "payment",
+                      "Payment Received", f"We received your payment of ${price:.2f}.", created_at, rng),
+    ]
+
+    # Partner from the customer's city when there is one
+    partner_pool = ctx["partners_by_city"].get(customer["city_index"]) or ctx["active_partners"]
+    if status in ("assigned", "in_progress", "completed") or (status == "cancelled" and rng.random() < 0.5):
+        partner = ctx["partner_profiles"][rng.choice(partner_pool)]
+        assigned_at = created_at + timedelta(minutes=rng.randint(1, 240))
+        commission_amount = round(price * partner["commission_percentage"] / 100, 2)
+        booking.update({
+            "partner_id": partner["_id"],
+            "partner_name": partner["name"],
+            "partner_assigned_at": assigned_at,
+            "commission_percentage": partner["commission_percentage"],
+            "commission_amount": commission_amount,
+            "partner_earnings": round(price - commission_amount, 2)
+        })
+        notifications += [
+            _notification(ctx, index, 2, customer["_id"], booking_id, "booking_assigned", "booking",
+                          "Partner Assigned", f"{partner['name']} has been assigned to your booking.",
+                          assigned_at, rng),
+            _notification(ctx, index, 3, partner["_id"], booking_id, "partner_new_booking", "booking",
+                          "New Booking Assigned", f"You have a new booking from {customer['name']}.",
+                          assigned_at, rng),
+        ]
+
+    if status in ("in_progress", "completed"):
+        booking["work_started_at"] = scheduled_date
+    if status == "completed":
+        completed_at = scheduled_date + timedelta(hours=rng.randint(1, 4))
+        booking["work_completed_at"] = completed_at
+        if rng.random() < 0.7:
+            booking["customer_rating"] = {
+                "rating": float(rng.choices([5, 4, 3, 2, 1], weights=[55, 28, 10, 4, 3])[0]),
+                "review_title": rng.choice(REVIEW_TITLES),
+                "comment": "",
+                "image": None,
+                "rated_at": completed_at + timedelta(hours=rng.randint(1, 96))
+            }
+        if rng.random() < 0.5:
+            booking["partner_rating"] = {
+                "rating": float(rng.choices([5, 4, 3], weights=[70, 25, 5])[0]),
+                "review_title": None,
+                "comment": "",
+                "rated_at": completed_at + timedelta(hours=rng.randint(1, 48))
+            }
+        notifications.append(
+            _notification(ctx, index, 4, customer["_id"], booking_id, "booking_status_change", "booking",
+                          "Booking Completed", "Your booking has been completed.", completed_at, rng)
+        )
+    if status == "cancelled":
+        booking["payment_status"] = "refunded"
+        booking["refunded_at"] = created_at + timedelta(hours=rng.randint(1, 48))
+
+    transaction = {
+        "_id": synthetic_id("transaction", index, created_at),
+        "booking_id": booking_id,
+        "customer_id": customer["_id"],
+        "stripe_checkout_session_id": session_id,
+        "stripe_payment_intent_id": payment_intent_id,
+        "amount": price,
+        "currency": settings.CURRENCY,
+        "status": "refunded" if status == "cancelled" else "completed",
+        "service_type": booking["service_type"],
+        "payment_method": "stripe_checkout",
+        "completed_at": created_at,
+        "synthetic": True
+    }
+    if status == "cancelled":
+        transaction["refund_amount"] = price
+        transaction["refund_reason"] = "requested_by_customer"
+
+    notifications = [item for item in notifications if rng.random() < ctx["notification_rate"]]
+    return booking, transaction, notifications
+
+
+# ============================================================================
+# PARALLEL BATCHES
+# ============================================================================
+
+_worker_ctx: Optional[dict] = None
+_worker_db = None
+
+
+def _init_worker(ctx: dict):
+    """Runs once per worker process: own MongoClient (clients are not fork-safe)"""
+    global _worker_ctx, _worker_db
+    _worker_ctx = ctx
+    _worker_db = MongoClient(settings.MONGO_URI)[settings.DB_NAME]
+
+
+def _insert_batch(kind: str, start: int, stop: int) -> Dict[str, int]:
+    """Build and insert documents [start, stop) of one kind, returns inserted counts"""
+    ctx, db = _worker_ctx, _worker_db
+
+    if kind == "customer":
+        db.users.insert_many([build_customer(ctx, i) for i in range(start, stop)], ordered=False)
+        return {"customers": stop - start}
+    if kind == "partner":
+        db.users.insert_many([build_partner(ctx, i) for i in range(start, stop)], ordered=False)
+        return {"partners": stop - start}
+
+    bookings, transactions, notifications = [], [], []
+    for i in range(start, stop):
+        booking, transaction, booking_notifications = build_booking(ctx, i)
+        bookings.append(booking)
+        transactions.append(transaction)
+        notifications += booking_notifications
+    db.bookings.insert_many(bookings, ordered=False)
+    db.transactions.insert_many(transactions, ordered=False)
+    if notifications:
+        db.notifications.insert_many(notifications, ordered=False)
+    return {"bookings": len(bookings), "transactions": len(transactions), "notifications": len(notifications)}
+
+
+def _batches(kind: str, total: int, batch_size: int) -> List[tuple]:
+    return [(kind, start, min(start + batch_size, total)) for start in range(0, total, batch_size)]
+
+
+def clear_synthetic_data(db):
+    """Remove every document created by a previous run"""
+    for collection in SYNTHETIC_COLLECTIONS:
+        result = db[collection].delete_many({"synthetic": True})
+        if result.deleted_count:
+            print(f"   Removed {result.deleted_count:,} synthetic {collection}")
+
+
+def generate_synthetic_data(
+    customers: int = 100_000,
+    partners: int = 10_000,
+    bookings: int = 1_000_000,
+    notification_rate: float = 1.0,
+    seed: int = 42,
+    days: int = 730,
+    until: Optional[datetime] = None,
+    batch_size: int = 5_000,
+    workers: int = 4
+):
+    """
+    Generate synthetic users, bookings, transactions and notifications.
+
+    Args:
+        customers / partners / bookings: Number of documents to create
+        notification_rate: Fraction of booking events that produce a notification (0-1)
+        seed: Random seed, same seed and shape give the same data
+        days: Length of the period covered by signups and bookings
+        until: End of that period (default: today 00:00 UTC)
+        batch_size: Documents per insert_many
+        workers: Parallel worker processes
+    """
+    client = MongoClient(settings.MONGO_URI)
+    db = client[settings.DB_NAME]
+
+    catalog = list(db.services.find({"is_active": True}, {"title": 1, "price": 1, "image": 1}))
+    if not catalog:
+        client.close()
+        raise RuntimeError("No active services found, create the demo catalog first")
+
+    end = until or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    ctx = {
+        "seed": seed,
+        "customers": customers,
+        "partners": partners,
+        "notification_rate": notification_rate,
+        "start": end - timedelta(days=days),
+        "end": end,
+        "password_hash": get_password_hash(SYNTHETIC_PASSWORD),
+        "services": sorted(
+            ({"id": str(s["_id"]), "title": s["title"], "price": float(s["price"]), "image": s.get("image")}
+             for s in catalog),
+            key=lambda service: service["title"]
+        )
+    }
+
+    # Partner profiles are shared with every worker to assign bookings within a city
+    ctx["partner_profiles"] = [partner_profile(ctx, i) for i in range(partners)]
+    ctx["active_partners"] = [i for i, p in enumerate(ctx["partner_profiles"]) if p["status"] == "active"]
+    ctx["partners_by_city"] = {}
+    for i in ctx["active_partners"]:
+        ctx["partners_by_city"].setdefault(ctx["partner_profiles"][i]["city_index"], []).append(i)
+    if bookings and not customers:
+        client.close()
+        raise RuntimeError("Bookings need customers, increase --customers")
+    if bookings and not ctx["active_partners"]:
+        client.close()
+        raise RuntimeError("Bookings need at least one active partner, increase --partners")
+
+    print("\n🧹 Clearing previous synthetic data...")
+    clear_synthetic_data(db)
+    client.close()
+
+    tasks = (_batches("customer", customers, batch_size)
+             + _batches("partner", partners, batch_size)
+             + _batches("booking", bookings, batch_size))
+    totals = {"customers": 0, "partners": 0, "bookings": 0, "transactions": 0, "notifications": 0}
+
+    print(
+        f"\n🏭 Generating {customers:,} customers, {partners:,} partners, {bookings:,} bookings "
+        f"(seed={seed}, batch={batch_size:,}, workers={workers})"
+    )
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ctx,)) as pool:
+        futures = [pool.submit(_insert_batch, *task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            for key, count in future.result().items():
+                totals[key] += count
+            if done % max(len(futures) // 20, 1) == 0 or done == len(futures):
+                elapsed = time.perf_counter() - started
+                inserted = sum(totals.values())
+                print(f"   {done}/{len(futures)} batches | {inserted:,} documents | {inserted / elapsed:,.0f} docs/s")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Synthetic data created in {elapsed:.1f}s")
+    for key, count in totals.items():
+        print(f"   • {count:,} {key}")
+    print(f"   Login as any synthetic user, e.g. customer0@{SYNTHETIC_EMAIL_DOMAIN} / {SYNTHETIC_PASSWORD}")
+    return totals
@@ -1,19 +1,25 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+import os
 from datetime import datetime, timezone
 from bson import ObjectId
-from database.mongodb import get_database
-from utils.schemas import UserCreate, UserResponse, UserUpdate, BookingCreate, BookingUpdate, BookingResponse, AssignBookingRequest
+from database.mongodb import get_database, get_stale_tolerant_database, get_pool_config
+from database.monitoring import pool_monitor, get_route_summary
+from database.indexes import get_index_report, USER_LIST_SORT
+from utils.schemas import UserCreate, UserResponse, UserRole, UserStatus, UserUpdate, BookingCreate, BookingUpdate, BookingResponse, AssignBookingRequest, BookingBulkTransition
 from utils.security import get_password_hash
 from utils.dependencies import require_role
-from utils.serializers import serialize_list, serialize_doc
-from services.booking_service import assign_booking_to_partner
+from utils.conditional import expected_version
+from utils.serializers import serialize_list, serialize_doc, projection_for
+from services.booking_service import assign_booking_to_partner, update_booking_checked, transition_booking, transition_bookings, is_transition
+from utils.loop_monitor import loop_watchdog
+from utils.exports import CONTENT_TYPES, export_filename, iter_export
+from utils.blobs import release, collect_garbage
 from utils.notifications import (
     notify_partner_approved,
     notify_partner_rejected,
-    notify_booking_created,
-    notify_booking_assigned,
-    notify_partner_new_booking
+    notify_booking_created
 )
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -21,15 +27,31 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 
 # User Management
 @router.get("/users", response_model=List[UserResponse])
-async def get_all_users(current_user: dict = Depends(require_role("admin"))):
-    """Get all users"""
-    db = get_database()
-    users = list(db.users.find({}))
-
-    # Remove password field for security
-    for user in users:
-        if 'password' in user:
-            del user['password']
+async def get_all_users(
+    role: Optional[UserRole] = None,
+    status_filter: Optional[UserStatus] = Query(None, alias="status"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    current_user: dict = Depends(require_role("admin"))
+):
+    """Get all users, optionally filtered by role/status and paginated"""
+    db = get_stale_tolerant_database()
+
+    query = {}
+    if role:
+        query['role'] = role.value
+    if status_filter:
+        query['status'] = status_filter.value
+
+    # Only UserResponse fields leave the server (no password hashes); the sort
+    # follows the role_status_availability index
+    users = list(
+        db.users
+        .find(query, projection_for(UserResponse))
+        .sort(USER_LIST_SORT)
+        .skip(skip)
+        .limit(limit or 0)
+    )
 
     return serialize_list(users)
 
@@ -233,7 +255,8 @@ async def create_booking(
         'status': booking_data.status.value if booking_data.status else 'pending',
         'created_at': datetime.utcnow(),
         'price': booking_data.price,
-        'payment_status': booking_data.payment_status.value if booking_data.payment_status else 'pending'
+        'payment_status': booking_data.payment_status.value if booking_data.payment_status else 'pending',
+        'version': 1
     }
 
     result = db.bookings.insert_one(booking_doc)
@@ -256,26 +279,18 @@ async def create_booking(
 async def update_booking(
     booking_id: str,
     update_data: BookingUpdate,
-    current_user: dict = Depends(require_role("admin"))
+    current_user: dict = Depends(require_role("admin")),
+    version: Optional[int] = Depends(expected_version)
 ):
-    """Update a booking (admin only)"""
+    """Update a booking (admin only, send If-Match to only update the version you saw)"""
     db = get_database()
 
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found"
-        )
-
     update_fields = {}
 
-    if update_data.service_type:
-        update_fields['service_type'] = update_data.service_type.value
     if update_data.scheduled_date:
         update_fields['scheduled_date'] = update_data.scheduled_date
-    if update_data.price is not None:
-        update_fields['price'] = update_data.price
+    if update_data.total_price is not None:
+        update_fields['total_price'] = update_data.total_price
     if update_data.notes is not None:
         update_fields['notes'] = update_data.notes
     if update_data.status:
@@ -285,11 +300,6 @@ async def update_booking(
     if update_data.service_address:
         update_fields['service_address'] = update_data.service_address
 
-    # Handle rating
-    if update_data.rating is not None:
-        update_fields['rating'] = update_data.rating
-        update_fields['rated_at'] = datetime.utcnow()
-
     # Handle service location coordinates
     if update_data.service_latitude is not None and update_data.service_longitude is not None:
         update_fields['service_location'] = {
@@ -300,7 +310,7 @@ async def update_booking(
     # Handle partner assignment
     if update_data.partner_id is not None:
         if update_data.partner_id:
-            partner = db.users.find_one({'_id': ObjectId(update_data.partner_id), 'role': 'partner'})
+            partner = db.users.find_one({'_id': ObjectId(update_data.partner_id), 'role': 'partner'}, {'name': 1})
             if not partner:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -308,25 +318,48 @@ async def update_booking(
                 )
             update_fields['partner_id'] = ObjectId(update_data.partner_id)
             update_fields['partner_name'] = partner['name']
-            if booking['status'] in ['pending', 'unassigned']:
-                update_fields['status'] = 'assigned'
-                update_fields['partner_assigned_at'] = datetime.utcnow()
         else:
             # Unassign partner
             update_fields['partner_id'] = None
             update_fields['partner_name'] = None
-            if booking['status'] == 'assigned':
-                update_fields['status'] = 'unassigned'
 
-    if update_fields:
-        result = db.bookings.update_one(
-            {'_id': ObjectId(booking_id)},
-            {'$set': update_fields}
+    if not update_fields:
+        return {"message": "No changes made"}
+
+    target = update_fields.pop('status', None)
+    if target is not None or update_data.partner_id is not None:
+        # The status change depends on the current one: write only if the booking is still as read
+        booking = db.bookings.find_one({'_id': ObjectId(booking_id)}, {'status': 1, 'version': 1})
+        if not booking:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Booking not found"
+            )
+        if version is None:
+            version = booking.get('version', 0)
+        if target is None:
+            if update_data.partner_id and booking['status'] in ['pending', 'unassigned', 'assigned']:
+                target = 'assigned'
+            elif not update_data.partner_id and booking['status'] == 'assigned':
+                target = 'unassigned'
+        elif target == booking['status'] and not (update_data.partner_id and is_transition(target, target)):
+            # Edit forms send the status back unchanged; only a new partner makes it a reassignment
+            target = None
+            if not update_fields:
+                return {"message": "No changes made"}
+
+    if target:
+        # Validated against the transition table, with its timestamp and notification
+        booking = transition_booking(db, booking_id, target, current_user, version, extra_set=update_fields)
+    else:
+        booking = update_booking_checked(
+            db, booking_id,
+            {'$set': update_fields},
+            expected_version=version,
+            projection={'version': 1}
         )
-        if result.modified_count == 0:
-            return {"message": "No changes made or failed to update booking"}
 
-    return {"message": "Booking updated successfully"}
+    return {"message": "Booking updated successfully", "version": booking['version']}
 
 
 @router.delete("/bookings/{booking_id}")
@@ -348,6 +381,9 @@ async def delete_booking(booking_id: str, current_user: dict = Depends(require_r
             detail="Failed to delete booking"
         )
 
+    for field in ('before_cleaning_image', 'after_cleaning_image'):
+        release(db, booking.get(field))
+
     return {"message": "Booking deleted successfully"}
 
 
@@ -355,61 +391,44 @@ async def delete_booking(booking_id: str, current_user: dict = Depends(require_r
 async def assign_booking(
     booking_id: str,
     assignment_data: AssignBookingRequest,
-    current_user: dict = Depends(require_role("admin"))
+    current_user: dict = Depends(require_role("admin")),
+    version: Optional[int] = Depends(expected_version)
 ):
     """Manually assign a booking to a partner (admin only)"""
     db = get_database()
 
-    # Verify booking exists
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found"
-        )
-
     # Verify partner exists and is available
     partner = db.users.find_one({
         '_id': ObjectId(assignment_data.partner_id),
         'role': 'partner',
         'status': 'active'
-    })
+    }, {'name': 1})
     if not partner:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Partner not found or not active"
         )
 
-    # Update booking with partner assignment
-    result = db.bookings.update_one(
-        {'_id': ObjectId(booking_id)},
-        {
-            '$set': {
-                'partner_id': ObjectId(assignment_data.partner_id),
-                'partner_name': partner['name'],
-                'status': 'assigned',
-                'partner_assigned_at': datetime.utcnow()
-            }
-        }
+    # Assign (sets partner_assigned_at and notifies customer and partner)
+    booking = transition_booking(
+        db, booking_id, 'assigned', current_user, version,
+        extra_set={'partner_id': partner['_id'], 'partner_name': partner['name']}
     )
 
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to assign booking"
-        )
+    return {"message": "Booking assigned successfully", "version": booking['version']}
 
-    # Send notifications
-    try:
-        # Notify customer that partner was assigned
-        notify_booking_assigned(str(booking['customer_id']), booking_id, partner['name'])
-
-        # Notify partner of new booking
-        notify_partner_new_booking(assignment_data.partner_id, booking_id, booking['customer_name'])
-    except Exception as e:
-        print(f"Failed to send booking assignment notifications: {e}")
 
-    return {"message": "Booking assigned successfully"}
+@router.post("/bookings/transitions")
+async def bulk_transition_bookings(
+    transition: BookingBulkTransition,
+    current_user: dict = Depends(require_role("admin"))
+):
+    """
+    Move many bookings to one status (admin only). Bookings whose current
+    status doesn't allow it are reported in conflicts and left unchanged.
+    """
+    db = get_database()
+    return transition_bookings(db, transition.booking_ids, transition.status.value, current_user)
 
 
 @router.post("/bookings/assign-pending")
@@ -434,7 +453,7 @@ async def assign_pending_bookings(current_user: dict = Depends(require_role("adm
 @router.get("/stats")
 async def get_stats(current_user: dict = Depends(require_role("admin"))):
     """Get system statistics (admin only)"""
-    db = get_database()
+    db = get_stale_tolerant_database()
 
     stats = {
         'total_users': db.users.count_documents({}),
@@ -446,3 +465,65 @@ async def get_stats(current_user: dict = Depends(require_role("admin"))):
     }
 
     return stats
+
+
+# Exports
+@router.get("/export/{collection}")
+async def export_collection(
+    collection: Literal["users", "bookings", "transactions"],
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    role: Optional[str] = None,
+    current_user: dict = Depends(require_role("admin"))
+):
+    """
+    Stream users, bookings or transactions as CSV or NDJSON (admin only).
+    Optional filters: status, and role for users.
+    """
+    query = {}
+    if status_filter:
+        query['status'] = status_filter
+    if role and collection == 'users':
+        query['role'] = role
+
+    return StreamingResponse(
+        iter_export(get_stale_tolerant_database(), collection, export_format, query),
+        media_type=CONTENT_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(collection, export_format)}"'}
+    )
+
+
+# Blob store
+@router.post("/blobs/gc")
+async def collect_blob_garbage(current_user: dict = Depends(require_role("admin"))):
+    """Delete uploaded files no document references any more (admin only)"""
+    return collect_garbage()
+
+
+# Diagnostics
+@router.get("/diagnostics/event-loop")
+async def get_event_loop_diagnostics(current_user: dict = Depends(require_role("admin"))):
+    """Event-loop stalls per route with captured stacks, for the worker serving this request (admin only)"""
+    return loop_watchdog.report()
+
+
+@router.get("/diagnostics/mongo-pool")
+async def get_mongo_pool_stats(current_user: dict = Depends(require_role("admin"))):
+    """MongoDB pool configuration and live usage for the worker serving this request (admin only)"""
+    return {
+        "pid": os.getpid(),
+        "config": get_pool_config(),
+        "usage": pool_monitor.snapshot()
+    }
+
+
+@router.get("/diagnostics/queries")
+async def get_query_diagnostics(current_user: dict = Depends(require_role("admin"))):
+    """Mongo commands and DB time per route, for the worker serving this request (admin only)"""
+    return get_route_summary()
+
+
+@router.get("/diagnostics/indexes")
+async def get_index_diagnostics(current_user: dict = Depends(require_role("admin"))):
+    """Declared vs existing indexes with $indexStats usage: missing, unused and undeclared (admin only)"""
+    return get_index_report()
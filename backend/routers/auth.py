@@ -5,6 +5,7 @@ from database.mongodb import get_database
 from utils.schemas import LoginRequest, Token, RefreshTokenRequest, CustomerCreate, PartnerCreate, UserResponse
 from utils.security import verify_password, get_password_hash, create_access_token, create_refresh_token, decode_token
 from utils.dependencies import get_current_user
+from utils.conditional import conditional_get
 from utils.serializers import serialize_doc
 from utils.notifications import notify_account_created, notify_login, notify_partner_registration
 
@@ -179,7 +180,7 @@ async def refresh_token(request: RefreshTokenRequest):
     }
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(conditional_get)])
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current authenticated user information"""
     return serialize_doc(current_user)
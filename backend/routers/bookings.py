@@ -1,15 +1,16 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, BackgroundTasks, Query, Request
+from fastapi.responses import RedirectResponse, Response
+from typing import List, Literal, Optional
 from datetime import datetime
 from bson import ObjectId
-import os
-from werkzeug.utils import secure_filename
 from database.mongodb import get_database
-from utils.schemas import BookingResponse, BookingStatusUpdate, BookingRating
+from utils.schemas import BookingResponse, BookingStatusUpdate, BookingRating, DirectUploadRequest, DirectUploadComplete
 from utils.dependencies import get_current_user, require_role
+from utils.conditional import conditional_get, not_modified, version_etag, expected_version
 from utils.serializers import serialize_list, serialize_doc
-from config import settings
-from utils.notifications import notify_booking_status_change
+from utils.images import pick_variant
+from utils.blobs import store_upload, attach_blob, presign_upload, claim_direct_upload
+from services.booking_service import transition_booking, booking_write_failure, with_version_bump
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
@@ -81,9 +82,9 @@ async def list_bookings(current_user: dict = Depends(get_current_user)):
     return serialize_list(bookings)
 
 
-@router.get("/{booking_id}", response_model=BookingResponse)
-async def get_booking(booking_id: str, current_user: dict = Depends(get_current_user)):
-    """Get booking details"""
+@router.get("/{booking_id}", response_model=BookingResponse, dependencies=[Depends(conditional_get)])
+async def get_booking(booking_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Get booking details (ETag is the booking version, send it back as If-Match when updating)"""
     db = get_database()
     booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
 
@@ -108,6 +109,9 @@ async def get_booking(booking_id: str, current_user: dict = Depends(get_current_
             detail="Not authorized"
         )
 
+    if not_modified(request, version_etag(booking.get('version'))):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+
     # Handle legacy rating fields
     if 'rating' in booking and not booking.get('customer_rating'):
         booking['customer_rating'] = {
@@ -123,120 +127,43 @@ async def get_booking(booking_id: str, current_user: dict = Depends(get_current_
 async def update_booking_status(
     booking_id: str,
     status_update: BookingStatusUpdate,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    version: Optional[int] = Depends(expected_version)
 ):
-    """Update booking status"""
+    """
+    Change booking status along the allowed transitions (see TRANSITIONS in
+    services/booking_service.py); send If-Match to only update the version you saw
+    """
     db = get_database()
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
+    booking = transition_booking(db, booking_id, status_update.status.value, current_user, version)
 
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found"
-        )
-
-    # Check authorization
-    role = current_user.get('role')
-    user_id = current_user.get('_id')
-
-    if role == 'partner' and booking.get('partner_id') != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
-
-    result = db.bookings.update_one(
-        {'_id': ObjectId(booking_id)},
-        {'$set': {'status': status_update.status.value}}
-    )
-
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update booking status"
-        )
-
-    # Send status update notification to customer
-    try:
-        notify_booking_status_change(
-            str(booking['customer_id']),
-            booking_id,
-            status_update.status.value
-        )
-    except Exception as e:
-        print(f"Failed to send booking status notification: {e}")
-
-    return {"message": "Status updated successfully"}
+    return {"message": "Status updated successfully", "version": booking['version']}
 
 
 @router.put("/{booking_id}/work-started")
 async def mark_work_started(
     booking_id: str,
-    current_user: dict = Depends(require_role("partner"))
+    current_user: dict = Depends(require_role("partner")),
+    version: Optional[int] = Depends(expected_version)
 ):
-    """Mark work as started (partner only)"""
+    """Mark work as started (partner only): assigned -> in_progress, sets work_started_at"""
     db = get_database()
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
-
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found"
-        )
-
-    if booking.get('partner_id') != current_user.get('_id'):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
+    booking = transition_booking(db, booking_id, 'in_progress', current_user, version)
 
-    result = db.bookings.update_one(
-        {'_id': ObjectId(booking_id)},
-        {'$set': {'work_started_at': datetime.utcnow()}}
-    )
-
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update work started timestamp"
-        )
-
-    return {"message": "Work started timestamp updated successfully"}
+    return {"message": "Work started timestamp updated successfully", "version": booking['version']}
 
 
 @router.put("/{booking_id}/work-completed")
 async def mark_work_completed(
     booking_id: str,
-    current_user: dict = Depends(require_role("partner"))
+    current_user: dict = Depends(require_role("partner")),
+    version: Optional[int] = Depends(expected_version)
 ):
-    """Mark work as completed (partner only)"""
+    """Mark work as completed (partner only): in_progress -> completed, sets work_completed_at"""
     db = get_database()
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
+    booking = transition_booking(db, booking_id, 'completed', current_user, version)
 
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found"
-        )
-
-    if booking.get('partner_id') != current_user.get('_id'):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
-
-    result = db.bookings.update_one(
-        {'_id': ObjectId(booking_id)},
-        {'$set': {'work_completed_at': datetime.utcnow()}}
-    )
-
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update work completed timestamp"
-        )
-
-    return {"message": "Work completed timestamp updated successfully"}
+    return {"message": "Work completed timestamp updated successfully", "version": booking['version']}
 
 
 @router.put("/{booking_id}/rate")
@@ -277,7 +204,7 @@ async def rate_booking(
 
     result = db.bookings.update_one(
         {'_id': ObjectId(booking_id)},
-        {'$set': update_fields}
+        with_version_bump({'$set': update_fields})
     )
 
     if result.modified_count == 0:
@@ -289,24 +216,14 @@ async def rate_booking(
 @router.post("/{booking_id}/before-image")
 async def upload_before_cleaning_image(
     booking_id: str,
+    background_tasks: BackgroundTasks,
     image: UploadFile = File(...),
     current_user: dict = Depends(require_role("partner"))
 ):
     """Upload before cleaning image (partner only)"""
     db = get_database()
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
-
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found"
-        )
-
-    if booking.get('partner_id') != current_user.get('_id'):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
+    # Cheap indexed lookup before streaming the whole file into the blob store
+    _check_assigned_partner(db, booking_id, current_user)
 
     if not allowed_file(image.filename):
         raise HTTPException(
@@ -314,31 +231,15 @@ async def upload_before_cleaning_image(
             detail="Invalid file type. Only PNG, JPG, JPEG, and GIF files are allowed."
         )
 
-    # Create booking directory
-    booking_dir = os.path.join(settings.UPLOAD_FOLDER, booking_id)
-    os.makedirs(booking_dir, exist_ok=True)
-
-    # Save file
-    filename = f"before_cleaning_{secure_filename(image.filename)}"
-    filepath = os.path.join(booking_dir, filename)
-
-    with open(filepath, "wb") as buffer:
-        content = await image.read()
-        buffer.write(content)
+    # Content-addressed: identical photos are stored once
+    ext = image.filename.rsplit('.', 1)[1]
+    blob = await store_upload(image, ext, db)
 
-    # Store relative path in database
-    image_path = f"/uploads/images/bookings/{booking_id}/{filename}"
-
-    result = db.bookings.update_one(
-        {'_id': ObjectId(booking_id)},
-        {'$set': {'before_cleaning_image': image_path}}
-    )
-
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update booking with image path"
-        )
+    # Checked again by the write itself in case the booking was reassigned meanwhile
+    owner = {'partner_id': current_user.get('_id')}
+    if not attach_blob(db, "bookings", booking_id, "before_cleaning_image", blob, background_tasks, conditions=owner):
+        raise booking_write_failure(db, booking_id, owner)
+    image_path = blob['url']
 
     return {
         "message": "Before cleaning image uploaded successfully",
@@ -349,58 +250,127 @@ async def upload_before_cleaning_image(
 @router.post("/{booking_id}/after-image")
 async def upload_after_cleaning_image(
     booking_id: str,
+    background_tasks: BackgroundTasks,
     image: UploadFile = File(...),
     current_user: dict = Depends(require_role("partner"))
 ):
     """Upload after cleaning image (partner only)"""
     db = get_database()
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
+    # Cheap indexed lookup before streaming the whole file into the blob store
+    _check_assigned_partner(db, booking_id, current_user)
 
-    if not booking:
+    if not allowed_file(image.filename):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Booking not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only PNG, JPG, JPEG, and GIF files are allowed."
         )
 
-    if booking.get('partner_id') != current_user.get('_id'):
+    # Content-addressed: identical photos are stored once
+    ext = image.filename.rsplit('.', 1)[1]
+    blob = await store_upload(image, ext, db)
+
+    # Checked again by the write itself in case the booking was reassigned meanwhile
+    owner = {'partner_id': current_user.get('_id')}
+    if not attach_blob(db, "bookings", booking_id, "after_cleaning_image", blob, background_tasks, conditions=owner):
+        raise booking_write_failure(db, booking_id, owner)
+    image_path = blob['url']
+
+    return {
+        "message": "After cleaning image uploaded successfully",
+        "image_path": image_path
+    }
+
+
+def _check_assigned_partner(db, booking_id: str, current_user: dict):
+    """404/403 unless the booking exists and is assigned to the current partner"""
+    owner = {'partner_id': current_user.get('_id')}
+    if db.bookings.find_one({'_id': ObjectId(booking_id), **owner}, {'_id': 1}) is None:
+        raise booking_write_failure(db, booking_id, owner)
+
+
+@router.post("/{booking_id}/images/{kind}/presign")
+async def presign_cleaning_image(
+    booking_id: str,
+    kind: Literal["before", "after"],
+    upload: DirectUploadRequest,
+    current_user: dict = Depends(require_role("partner"))
+):
+    """
+    Start a direct-to-storage upload of a before/after image (partner only).
+    PUT the file to upload.url with upload.headers (skip when exists is true),
+    then call /complete.
+    """
+    db = get_database()
+    _check_assigned_partner(db, booking_id, current_user)
+
+    if not allowed_file(upload.filename):
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only PNG, JPG, JPEG, and GIF files are allowed."
         )
 
-    if not allowed_file(image.filename):
+    ext = upload.filename.rsplit('.', 1)[1]
+    return presign_upload(db, upload.sha256, ext, upload.size, upload.content_type)
+
+
+@router.post("/{booking_id}/images/{kind}/complete")
+async def complete_cleaning_image(
+    booking_id: str,
+    kind: Literal["before", "after"],
+    upload: DirectUploadComplete,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_role("partner"))
+):
+    """Attach a directly uploaded before/after image to the booking (partner only)"""
+    db = get_database()
+
+    if not allowed_file(upload.filename):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file type. Only PNG, JPG, JPEG, and GIF files are allowed."
         )
 
-    # Create booking directory
-    booking_dir = os.path.join(settings.UPLOAD_FOLDER, booking_id)
-    os.makedirs(booking_dir, exist_ok=True)
-
-    # Save file
-    filename = f"after_cleaning_{secure_filename(image.filename)}"
-    filepath = os.path.join(booking_dir, filename)
+    blob = await claim_direct_upload(db, upload.sha256, upload.filename.rsplit('.', 1)[1])
+    owner = {'partner_id': current_user.get('_id')}
+    if not attach_blob(db, "bookings", booking_id, f"{kind}_cleaning_image", blob, background_tasks, conditions=owner):
+        raise booking_write_failure(db, booking_id, owner)
 
-    with open(filepath, "wb") as buffer:
-        content = await image.read()
-        buffer.write(content)
+    return {
+        "message": f"{kind.capitalize()} cleaning image uploaded successfully",
+        "image_path": blob['url']
+    }
 
-    # Store relative path in database
-    image_path = f"/uploads/images/bookings/{booking_id}/{filename}"
 
-    result = db.bookings.update_one(
+@router.get("/{booking_id}/images/{kind}")
+async def get_cleaning_image(
+    booking_id: str,
+    kind: Literal["before", "after"],
+    request: Request,
+    width: Optional[int] = Query(None, ge=1),
+    current_user: dict = Depends(get_current_user)
+):
+    """Redirect to the best before/after image variant for the requested display width"""
+    db = get_database()
+    field = f'{kind}_cleaning_image'
+    booking = db.bookings.find_one(
         {'_id': ObjectId(booking_id)},
-        {'$set': {'after_cleaning_image': image_path}}
+        {'customer_id': 1, 'partner_id': 1, field: 1, f'{field}_variants': 1}
     )
 
-    if result.modified_count == 0:
+    if not booking or not booking.get(field):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update booking with image path"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
         )
 
-    return {
-        "message": "After cleaning image uploaded successfully",
-        "image_path": image_path
-    }
+    role = current_user.get('role')
+    user_id = current_user.get('_id')
+    if (role == 'customer' and booking.get('customer_id') != user_id) or \
+            (role == 'partner' and booking.get('partner_id') != user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized"
+        )
+
+    url = pick_variant(booking.get(f'{field}_variants'), width, request.headers.get('accept', ''))
+    return RedirectResponse(url or booking[field], headers={"Vary": "Accept"})
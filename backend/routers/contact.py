@@ -6,7 +6,7 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime, timezone
 from bson import ObjectId
-from database.mongodb import db
+from database.mongodb import get_database
 from utils.dependencies import get_current_user, require_admin
 
 router = APIRouter(prefix="/contact", tags=["Contact"])
@@ -34,6 +34,7 @@ class ContactSubmissionResponse(BaseModel):
 @router.post("/submit")
 async def submit_contact_form(submission: ContactFormSubmission):
     """Submit a contact form (public endpoint)"""
+    db = get_database()
     try:
         contact_data = {
             "_id": ObjectId(),
@@ -65,6 +66,7 @@ async def get_contact_submissions(
     current_user: dict = Depends(require_admin)
 ):
     """Get all contact form submissions (admin only)"""
+    db = get_database()
     try:
         query = {}
         if status:
@@ -94,6 +96,7 @@ async def get_contact_submissions(
 @router.get("/submissions/count")
 async def get_new_submissions_count(current_user: dict = Depends(require_admin)):
     """Get count of new/unread contact submissions (admin only)"""
+    db = get_database()
     try:
         count = db.contact_submissions.count_documents({"status": "new"})
         return {"new_count": count}
@@ -109,6 +112,7 @@ async def update_submission_status(
     current_user: dict = Depends(require_admin)
 ):
     """Update contact submission status (admin only)"""
+    db = get_database()
     try:
         if status not in ["new", "read", "responded", "archived"]:
             raise HTTPException(status_code=400, detail="Invalid status")
@@ -145,6 +149,7 @@ async def delete_submission(
     current_user: dict = Depends(require_admin)
 ):
     """Delete a contact submission (admin only)"""
+    db = get_database()
     try:
         result = db.contact_submissions.delete_one({"_id": ObjectId(submission_id)})
         
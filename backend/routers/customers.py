@@ -1,29 +1,42 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
 from bson import ObjectId
-from database.mongodb import get_database
-from utils.schemas import UserResponse, UserUpdate
+from database.mongodb import get_database, get_stale_tolerant_database
+from database.indexes import USER_LIST_SORT
+from utils.schemas import UserResponse, UserUpdate, UserStatus
 from utils.dependencies import get_current_user, require_role
-from utils.serializers import serialize_list, serialize_doc
+from utils.conditional import conditional_get
+from utils.serializers import serialize_list, serialize_doc, projection_for
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
 
 @router.get("", response_model=List[UserResponse])
-async def list_customers(current_user: dict = Depends(require_role("admin"))):
-    """List all customers (admin only)"""
-    db = get_database()
-    customers = list(db.users.find({'role': 'customer'}))
+async def list_customers(
+    status_filter: Optional[UserStatus] = Query(None, alias="status"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    current_user: dict = Depends(require_role("admin"))
+):
+    """List all customers (admin only), optionally filtered and paginated"""
+    db = get_stale_tolerant_database()
+
+    query = {'role': 'customer'}
+    if status_filter:
+        query['status'] = status_filter.value
 
-    # Remove password field for security
-    for customer in customers:
-        if 'password' in customer:
-            del customer['password']
+    customers = list(
+        db.users
+        .find(query, projection_for(UserResponse))
+        .sort(USER_LIST_SORT)
+        .skip(skip)
+        .limit(limit or 0)
+    )
 
     return serialize_list(customers)
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(conditional_get)])
 async def get_customer_profile(current_user: dict = Depends(require_role("customer"))):
     """Get current customer's profile"""
     # Remove password field
@@ -9,13 +9,14 @@ from bson import ObjectId
 from database.mongodb import get_database
 from utils.schemas import NotificationResponse, NotificationUpdate
 from utils.dependencies import get_current_user
+from utils.conditional import conditional_get
 from utils.serializers import serialize_doc
 from utils.notifications import mark_notification_read, mark_all_read, get_unread_count, delete_notification
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
-@router.get("/", response_model=List[NotificationResponse])
+@router.get("/", response_model=List[NotificationResponse], dependencies=[Depends(conditional_get)])
 async def get_notifications(
     current_user: dict = Depends(get_current_user),
     skip: int = Query(0, ge=0),
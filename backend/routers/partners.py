@@ -1,29 +1,45 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
 from bson import ObjectId
-from database.mongodb import get_database
-from utils.schemas import UserResponse, PartnerUpdate
+from database.mongodb import get_database, get_stale_tolerant_database
+from database.indexes import USER_LIST_SORT
+from utils.schemas import UserResponse, PartnerResponse, PartnerUpdate, UserStatus
 from utils.dependencies import get_current_user, require_role
-from utils.serializers import serialize_list, serialize_doc
+from utils.conditional import conditional_get
+from utils.serializers import serialize_list, serialize_doc, projection_for
 
 router = APIRouter(prefix="/partners", tags=["Partners"])
 
 
-@router.get("", response_model=List[UserResponse])
-async def list_partners(current_user: dict = Depends(require_role("admin"))):
-    """List all partners (admin only)"""
-    db = get_database()
-    partners = list(db.users.find({'role': 'partner'}))
-
-    # Remove password field for security
-    for partner in partners:
-        if 'password' in partner:
-            del partner['password']
+@router.get("", response_model=List[PartnerResponse])
+async def list_partners(
+    status_filter: Optional[UserStatus] = Query(None, alias="status"),
+    available: Optional[bool] = None,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    current_user: dict = Depends(require_role("admin"))
+):
+    """List all partners (admin only), optionally filtered and paginated"""
+    db = get_stale_tolerant_database()
+
+    query = {'role': 'partner'}
+    if status_filter:
+        query['status'] = status_filter.value
+    if available is not None:
+        query['availability'] = available
+
+    partners = list(
+        db.users
+        .find(query, projection_for(PartnerResponse))
+        .sort(USER_LIST_SORT)
+        .skip(skip)
+        .limit(limit or 0)
+    )
 
     return serialize_list(partners)
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(conditional_get)])
 async def get_partner_profile(current_user: dict = Depends(require_role("partner"))):
     """Get current partner's profile"""
     # Remove password field
@@ -3,7 +3,7 @@ from typing import List
 from datetime import datetime
 from bson import ObjectId
 import stripe
-from database.mongodb import get_database
+from database.mongodb import get_database, get_stale_tolerant_database
 from utils.schemas import (
     BookAndPayRequest, TransactionResponse, RefundRequest,
     CheckoutSessionResponse, PaymentStatusResponse, PaymentIntentResponse
@@ -11,7 +11,7 @@ from utils.schemas import (
 from utils.dependencies import get_current_user, require_role
 from utils.serializers import serialize_list
 from services.payment_service import create_checkout_session_for_booking, create_payment_intent, process_refund
-from services.booking_service import assign_booking_to_partner
+from services.booking_service import assign_booking_to_partner, VERSION_BUMP
 from config import settings
 from utils.notifications import notify_booking_created, notify_payment_received
 
@@ -172,7 +172,8 @@ async def check_payment_status(
                     'payment_status': 'paid',
                     'paid_at': datetime.utcnow(),
                     'stripe_checkout_session_id': session_id,
-                    'stripe_payment_intent_id': checkout_session.payment_intent
+                    'stripe_payment_intent_id': checkout_session.payment_intent,
+                    'version': 1
                 }
 
                 result = db.bookings.insert_one(booking_data)
@@ -295,7 +296,7 @@ async def confirm_payment(
             # Update booking payment status
             db.bookings.update_one(
                 {'_id': transaction['booking_id']},
-                {'$set': {'payment_status': 'paid', 'paid_at': datetime.utcnow()}}
+                {'$set': {'payment_status': 'paid', 'paid_at': datetime.utcnow()}, '$inc': VERSION_BUMP}
             )
 
             return {
@@ -353,7 +354,8 @@ async def get_transactions(current_user: dict = Depends(get_current_user)):
     user_id = current_user.get('_id')
 
     if role == 'admin':
-        transactions = list(db.transactions.find({}))
+        # Full scan for the admin dashboard, fine to serve from a secondary
+        transactions = list(get_stale_tolerant_database().transactions.find({}))
     elif role == 'customer':
         transactions = list(db.transactions.find({'customer_id': user_id}))
     else:
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from datetime import datetime
-from database.mongodb import get_database
+from database.mongodb import get_database, get_stale_tolerant_database
 from bson import ObjectId
 
 router = APIRouter(prefix="/professionals", tags=["professionals"])
@@ -233,7 +233,7 @@ async def delete_registration(registration_id: str):
 @router.get("/stats")
 async def get_registration_stats():
     """Get statistics about professional registrations"""
-    db = get_database()
+    db = get_stale_tolerant_database()
     
     pipeline = [
         {
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, BackgroundTasks, Query, Request
+from fastapi.responses import RedirectResponse
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
 import os
-import shutil
 from pathlib import Path
 
 from database.mongodb import get_database
-from utils.schemas import ServiceCreate, ServiceUpdate, ServiceResponse, UserResponse
+from utils.schemas import ServiceCreate, ServiceUpdate, ServiceResponse, UserResponse, DirectUploadRequest, DirectUploadComplete
 from utils.dependencies import get_current_user
+from utils.images import pick_variant
+from utils.blobs import (
+    store_upload, attach_blob, add_reference, release, replace_reference, presign_upload, claim_direct_upload
+)
 from config import settings
 
 router = APIRouter(prefix="/services", tags=["Services"])
@@ -103,6 +107,7 @@ async def create_service(
     service_dict["updated_at"] = None
 
     result = db.services.insert_one(service_dict)
+    add_reference(db, service_dict.get("image"))
 
     created_service = db.services.find_one({"_id": result.inserted_id})
     created_service["_id"] = str(created_service["_id"])
@@ -151,6 +156,8 @@ async def update_service(
         {"_id": ObjectId(service_id)},
         {"$set": update_data}
     )
+    if "image" in update_data:
+        replace_reference(db, service.get("image"), update_data["image"])
 
     updated_service = db.services.find_one({"_id": ObjectId(service_id)})
     updated_service["_id"] = str(updated_service["_id"])
@@ -189,13 +196,28 @@ async def delete_service(
     #     )
 
     db.services.delete_one({"_id": ObjectId(service_id)})
+    release(db, service.get("image"))
 
     return None
 
 
+ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+
+def _image_extension(filename: str) -> str:
+    file_ext = Path(filename).suffix.lower()
+    if file_ext not in ALLOWED_IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}"
+        )
+    return file_ext.lstrip(".")
+
+
 @router.post("/{service_id}/upload-image")
 async def upload_service_image(
     service_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database)
@@ -213,35 +235,77 @@ async def upload_service_image(
         raise HTTPException(status_code=404, detail="Service not found")
 
     # Validate file type
-    allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-    file_ext = Path(file.filename).suffix.lower()
+    ext = _image_extension(file.filename)
 
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed types: {', '.join(allowed_extensions)}"
-        )
+    # Content-addressed: the same image uploaded twice is stored once
+    blob = await store_upload(file, ext, db)
+    if not attach_blob(db, "services", service_id, "image", blob, background_tasks,
+                       extra_fields={"updated_at": datetime.utcnow()}):
+        raise HTTPException(status_code=404, detail="Service not found")
+    image_url = blob["url"]
 
-    # Create upload directory if it doesn't exist
-    # settings.UPLOAD_FOLDER is typically 'uploads/images/bookings', so we want 'uploads/services'
-    # We'll explicitly set it to 'uploads/services' to match the URL generation
-    upload_dir = Path("uploads/services")
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    return {"image_url": image_url}
 
-    # Generate unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"service_{service_id}_{timestamp}{file_ext}"
-    file_path = upload_dir / filename
 
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+@router.post("/{service_id}/image/presign")
+async def presign_service_image(
+    service_id: str,
+    upload: DirectUploadRequest,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """
+    Start a direct-to-storage upload of a service image (Admin only).
+    PUT the file to upload.url with upload.headers (skip when exists is true),
+    then call /complete.
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can upload service images")
 
-    # Update service with image path
-    image_url = f"/uploads/services/{filename}"
-    db.services.update_one(
-        {"_id": ObjectId(service_id)},
-        {"$set": {"image": image_url, "updated_at": datetime.utcnow()}}
-    )
+    if not ObjectId.is_valid(service_id):
+        raise HTTPException(status_code=400, detail="Invalid service ID")
 
-    return {"image_url": image_url}
+    ext = _image_extension(upload.filename)
+    return presign_upload(db, upload.sha256, ext, upload.size, upload.content_type)
+
+
+@router.post("/{service_id}/image/complete")
+async def complete_service_image(
+    service_id: str,
+    upload: DirectUploadComplete,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database)
+):
+    """Attach a directly uploaded service image (Admin only)"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can upload service images")
+
+    if not ObjectId.is_valid(service_id):
+        raise HTTPException(status_code=400, detail="Invalid service ID")
+
+    blob = await claim_direct_upload(db, upload.sha256, _image_extension(upload.filename))
+    if not attach_blob(db, "services", service_id, "image", blob, background_tasks,
+                       extra_fields={"updated_at": datetime.utcnow()}):
+        raise HTTPException(status_code=404, detail="Service not found")
+
+    return {"image_url": blob["url"]}
+
+
+@router.get("/{service_id}/image")
+async def get_service_image(
+    service_id: str,
+    request: Request,
+    width: Optional[int] = Query(None, ge=1),
+    db=Depends(get_database)
+):
+    """Redirect to the best image variant for the requested display width"""
+    if not ObjectId.is_valid(service_id):
+        raise HTTPException(status_code=400, detail="Invalid service ID")
+
+    service = db.services.find_one({"_id": ObjectId(service_id)}, {"image": 1, "image_variants": 1})
+    if not service or not service.get("image"):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    url = pick_variant(service.get("image_variants"), width, request.headers.get("accept", ""))
+    return RedirectResponse(url or service["image"], headers={"Vary": "Accept"})
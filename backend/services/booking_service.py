@@ -1,43 +1,319 @@
 from datetime import datetime, timedelta
+from typing import List, Optional
 from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.database import Database
 from database.mongodb import get_database
-from utils.notifications import notify_booking_assigned, notify_partner_new_booking
+from utils.conditional import version_etag
+from utils.notifications import notify_booking_assigned, notify_partner_new_booking, notify_booking_status_change
 
+# Every write to a booking includes this, so its version (and ETag) changes
+VERSION_BUMP = {'version': 1}
 
-def assign_booking_to_partner(booking_id: str):
+
+# ============================================================================
+# VERSIONED UPDATES
+# ============================================================================
+
+def with_version_bump(update: dict) -> dict:
+    """An update document that also increments the booking's version"""
+    return {**update, '$inc': {**update.get('$inc', {}), **VERSION_BUMP}}
+
+
+def version_condition(version: int):
+    """Filter value for an expected version (documents written before versioning have none)"""
+    return version if version else {'$in': [0, None]}
+
+
+def update_booking_checked(
+    db: Database,
+    booking_id: str,
+    update: dict,
+    owner: Optional[dict] = None,
+    conditions: Optional[dict] = None,
+    expected_version: Optional[int] = None,
+    projection: Optional[dict] = None
+) -> dict:
     """
-    Auto-assign a booking to the nearest available partner
-    Uses geospatial queries and time conflict checking
+    Check-and-set in one round trip: apply update (and a version bump) only
+    if the booking matches owner (e.g. {'partner_id': ...}), conditions and,
+    when given, expected_version. Returns the updated booking.
+
+    Only a failed write costs a second read, to tell why: 404 when the
+    booking doesn't exist, 403 when it belongs to someone else, otherwise
+    409 (it changed meanwhile) with its current version as the ETag.
     """
-    db = get_database()
-    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
+    query = {'_id': ObjectId(booking_id), **(owner or {}), **(conditions or {})}
+    if expected_version is not None:
+        query['version'] = version_condition(expected_version)
 
-    if not booking:
-        print(f"[ASSIGNMENT] Booking {booking_id} not found.")
-        return
+    booking = db.bookings.find_one_and_update(
+        query,
+        with_version_bump(update),
+        projection=projection,
+        return_document=ReturnDocument.AFTER
+    )
+    if booking is None:
+        raise booking_write_failure(db, booking_id, owner)
+    return booking
 
-    service_location = booking.get('service_location')
-    scheduled_date = booking.get('scheduled_date')
 
-    if not service_location or not scheduled_date:
-        print(f"[ASSIGNMENT] Booking {booking_id} missing service_location or scheduled_date. Cannot assign.")
+def booking_write_failure(
+    db: Database,
+    booking_id: str,
+    owner: Optional[dict] = None,
+    allowed_from: Optional[List[str]] = None,
+    target: Optional[str] = None
+) -> HTTPException:
+    """
+    Why a filtered booking write matched nothing (call only after it failed):
+    404 missing, 403 owner mismatch, 409 when its status is not one of
+    allowed_from (a status change to target), else 409 with the current
+    version as ETag
+    """
+    current = db.bookings.find_one(
+        {'_id': ObjectId(booking_id)},
+        {**{field: 1 for field in owner or {}}, 'status': 1, 'version': 1}
+    )
+    if current is None:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+    if any(current.get(field) != value for field, value in (owner or {}).items()):
+        return HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized"
+        )
+    if allowed_from is not None and current.get('status') not in allowed_from:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot change booking status from {current.get('status')} to {target}",
+            headers={"ETag": version_etag(current.get('version'))}
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Booking was modified by another request, reload it and retry",
+        headers={"ETag": version_etag(current.get('version'))}
+    )
+
+
+# ============================================================================
+# STATUS TRANSITIONS
+# ============================================================================
+
+# (from, to) -> roles that may make the change; "system" is auto-assignment
+TRANSITIONS = {
+    ('pending', 'assigned'): {'admin', 'system'},
+    ('unassigned', 'assigned'): {'admin', 'system'},
+    ('assigned', 'assigned'): {'admin'},  # reassignment to another partner
+    ('pending', 'unassigned'): {'admin', 'system'},
+    ('assigned', 'unassigned'): {'admin'},
+    ('unassigned', 'pending'): {'admin'},
+    ('assigned', 'in_progress'): {'admin', 'partner'},
+    ('in_progress', 'completed'): {'admin', 'partner'},
+    ('pending', 'cancelled'): {'admin', 'customer'},
+    ('unassigned', 'cancelled'): {'admin', 'customer'},
+    ('assigned', 'cancelled'): {'admin', 'customer', 'partner'},  # partner drops a job before starting it
+    ('in_progress', 'cancelled'): {'admin'},
+}
+
+# Written together with the status when a booking enters it
+STATUS_TIMESTAMPS = {
+    'assigned': 'partner_assigned_at',
+    'in_progress': 'work_started_at',
+    'completed': 'work_completed_at',
+    'cancelled': 'cancelled_at',
+}
+STATUS_CLEARS = {
+    'unassigned': ['partner_id', 'partner_name'],
+}
+
+# Whose bookings each role may change
+OWNER_FIELDS = {'partner': 'partner_id', 'customer': 'customer_id'}
+
+# Booking fields the notifications need
+NOTIFY_PROJECTION = {'customer_id': 1, 'customer_name': 1, 'partner_id': 1, 'partner_name': 1, 'status': 1, 'version': 1}
+
+
+def _compile_transitions(transitions: dict) -> dict:
+    """(role, to) -> sorted source statuses, the $in filter of a status change"""
+    compiled = {}
+    for (source, target), roles in transitions.items():
+        for role in roles:
+            compiled.setdefault((role, target), []).append(source)
+    return {key: sorted(sources) for key, sources in compiled.items()}
+
+
+ALLOWED_SOURCES = _compile_transitions(TRANSITIONS)
+
+
+def _notify_assigned(booking: dict):
+    notify_booking_assigned(str(booking['customer_id']), str(booking['_id']), booking.get('partner_name'))
+    notify_partner_new_booking(str(booking['partner_id']), str(booking['_id']), booking.get('customer_name', 'Customer'))
+
+
+def _notify_customer(booking: dict):
+    notify_booking_status_change(str(booking['customer_id']), str(booking['_id']), booking['status'])
+
+
+STATUS_NOTIFICATIONS = {
+    'assigned': _notify_assigned,
+    'in_progress': _notify_customer,
+    'completed': _notify_customer,
+    'cancelled': _notify_customer,
+}
+
+
+def is_transition(source: str, target: str) -> bool:
+    """Whether the table has an edge from source to target (for any role)"""
+    return (source, target) in TRANSITIONS
+
+
+def _actor(user: Optional[dict]) -> tuple:
+    """(role, id) of whoever changes the status, None user = the system"""
+    if user is None:
+        return 'system', 'system'
+    return user.get('role'), str(user.get('_id'))
+
+
+def _allowed_sources(role: str, target: str, extra_set: Optional[dict]) -> List[str]:
+    sources = ALLOWED_SOURCES.get((role, target))
+    if not sources:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not allowed to set booking status to {target}"
+        )
+    if target == 'assigned' and not (extra_set or {}).get('partner_id'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Assigning a booking needs a partner, use the assign endpoint"
+        )
+    return sources
+
+
+def _transition_update(target: str, actor_id: str, transition_id: ObjectId, extra_set: Optional[dict]) -> dict:
+    now = datetime.utcnow()
+    fields = {field: None for field in STATUS_CLEARS.get(target, [])}
+    fields.update(extra_set or {})
+    fields['status'] = target
+    if target in STATUS_TIMESTAMPS:
+        fields[STATUS_TIMESTAMPS[target]] = now
+    fields['last_transition'] = {'id': transition_id, 'to': target, 'at': now, 'by': actor_id}
+    return with_version_bump({'$set': fields})
+
+
+def _send_notifications(booking: dict):
+    notify = STATUS_NOTIFICATIONS.get(booking['status'])
+    if notify is None:
         return
+    try:
+        notify(booking)
+    except Exception as e:
+        print(f"Failed to send booking status notification: {e}")
 
-    print(f"[ASSIGNMENT] Attempting to assign booking {booking_id} (Service Type: {booking.get('service_type')}, Scheduled: {scheduled_date.isoformat()})")
-    print(f"[ASSIGNMENT] Service Location: {service_location.get('coordinates')}")
 
-    # Define search parameters
-    max_distance_meters = 50000  # 50 km
-    job_duration_hours = 1  # Assume a job takes 1 hour for conflict checking
+def transition_booking(
+    db: Database,
+    booking_id: str,
+    target: str,
+    user: Optional[dict] = None,
+    expected_version: Optional[int] = None,
+    extra_set: Optional[dict] = None
+) -> dict:
+    """
+    Change a booking's status in one conditional write: the current status
+    must be a valid source for target (per TRANSITIONS and the user's role),
+    partners/customers only change their own bookings, and the entry
+    timestamp, extra_set and last_transition are written with it. The
+    matching notification is sent once the write succeeded. Returns the
+    updated booking (NOTIFY_PROJECTION fields); 404/403/409 like
+    update_booking_checked.
+    """
+    role, actor_id = _actor(user)
+    sources = _allowed_sources(role, target, extra_set)
+    owner = {OWNER_FIELDS[role]: user.get('_id')} if role in OWNER_FIELDS else None
 
-    # Calculate the time window for the new booking
+    query = {'_id': ObjectId(booking_id), 'status': {'$in': sources}, **(owner or {})}
+    if expected_version is not None:
+        query['version'] = version_condition(expected_version)
+
+    booking = db.bookings.find_one_and_update(
+        query,
+        _transition_update(target, actor_id, ObjectId(), extra_set),
+        projection=NOTIFY_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if booking is None:
+        raise booking_write_failure(db, booking_id, owner, allowed_from=sources, target=target)
+
+    _send_notifications(booking)
+    return booking
+
+
+def transition_bookings(db: Database, booking_ids: List[str], target: str, user: Optional[dict] = None) -> dict:
+    """
+    Bulk status change (admin batch operations) in a fixed number of round
+    trips whatever the batch size: one update_many over the bookings whose
+    status allows it, one read of the ones it changed (tagged with this
+    transition's id) and one read explaining the rest.
+    Returns {status, updated, conflicts: [{booking_id, status}], not_found}.
+    """
+    role, actor_id = _actor(user)
+    sources = _allowed_sources(role, target, None)
+    owner = {OWNER_FIELDS[role]: user.get('_id')} if role in OWNER_FIELDS else {}
+
+    ids = list(dict.fromkeys(ObjectId(booking_id) for booking_id in booking_ids if ObjectId.is_valid(booking_id)))
+    invalid = [booking_id for booking_id in booking_ids if not ObjectId.is_valid(booking_id)]
+    transition_id = ObjectId()
+
+    db.bookings.update_many(
+        {'_id': {'$in': ids}, 'status': {'$in': sources}, **owner},
+        _transition_update(target, actor_id, transition_id, None)
+    )
+    updated = list(db.bookings.find({'_id': {'$in': ids}, 'last_transition.id': transition_id}, NOTIFY_PROJECTION))
+
+    updated_ids = {booking['_id'] for booking in updated}
+    remaining = [booking_id for booking_id in ids if booking_id not in updated_ids]
+    current = {
+        booking['_id']: booking.get('status')
+        for booking in db.bookings.find({'_id': {'$in': remaining}, **owner}, {'status': 1})
+    } if remaining else {}
+
+    for booking in updated:
+        _send_notifications(booking)
+
+    return {
+        "status": target,
+        "updated": [str(booking_id) for booking_id in ids if booking_id in updated_ids],
+        "conflicts": [{"booking_id": str(booking_id), "status": current[booking_id]}
+                      for booking_id in remaining if booking_id in current],
+        "not_found": invalid + [str(booking_id) for booking_id in remaining if booking_id not in current],
+    }
+
+
+# ============================================================================
+# PARTNER ASSIGNMENT
+# ============================================================================
+
+
+def build_assignment_pipeline(
+    service_location: dict,
+    scheduled_date: datetime,
+    max_distance_meters: int = 50000,
+    job_duration_hours: int = 1
+) -> list:
+    """
+    Aggregation pipeline on users returning active, available partners near
+    service_location without a booking overlapping the new one, closest first
+    """
     new_booking_start = scheduled_date
     new_booking_end = scheduled_date + timedelta(hours=job_duration_hours)
-    print(f"[ASSIGNMENT] New booking time window: {new_booking_start.isoformat()} to {new_booking_end.isoformat()}")
 
     # Find active and available partners, sorted by proximity to service_location
     # and filter out those with time conflicts
-    pipeline = [
+    return [
         {
             '$geoNear': {
                 'near': service_location,
@@ -82,6 +358,40 @@ def assign_booking_to_partner(booking_id: str):
         {'$sort': {'distance': 1}}  # Sort by closest first
     ]
 
+
+def assign_booking_to_partner(booking_id: str):
+    """
+    Auto-assign a booking to the nearest available partner
+    Uses geospatial queries and time conflict checking
+    """
+    db = get_database()
+    booking = db.bookings.find_one({'_id': ObjectId(booking_id)})
+
+    if not booking:
+        print(f"[ASSIGNMENT] Booking {booking_id} not found.")
+        return
+
+    service_location = booking.get('service_location')
+    scheduled_date = booking.get('scheduled_date')
+
+    if not service_location or not scheduled_date:
+        print(f"[ASSIGNMENT] Booking {booking_id} missing service_location or scheduled_date. Cannot assign.")
+        return
+
+    print(f"[ASSIGNMENT] Attempting to assign booking {booking_id} (Service Type: {booking.get('service_type')}, Scheduled: {scheduled_date.isoformat()})")
+    print(f"[ASSIGNMENT] Service Location: {service_location.get('coordinates')}")
+
+    # Define search parameters
+    max_distance_meters = 50000  # 50 km
+    job_duration_hours = 1  # Assume a job takes 1 hour for conflict checking
+
+    # Calculate the time window for the new booking
+    new_booking_start = scheduled_date
+    new_booking_end = scheduled_date + timedelta(hours=job_duration_hours)
+    print(f"[ASSIGNMENT] New booking time window: {new_booking_start.isoformat()} to {new_booking_end.isoformat()}")
+
+    pipeline = build_assignment_pipeline(service_location, scheduled_date, max_distance_meters, job_duration_hours)
+
     # Execute the pipeline and get initial candidates
     initial_candidates = list(db.users.aggregate([
         {
@@ -105,52 +415,28 @@ def assign_booking_to_partner(booking_id: str):
         for p in nearby_partners:
             print(f"  - Suitable Partner: {p.get('name')} (ID: {p.get('_id')}), Distance: {p.get('distance'):.2f}m")
 
-    assigned = False
     if nearby_partners:
         partner = nearby_partners[0]  # Get the closest non-conflicting partner
         partner_id = partner['_id']
         partner_name = partner['name']
-
-        result = db.bookings.update_one(
-            {'_id': ObjectId(booking_id)},
-            {
-                '$set': {
-                    'partner_id': partner_id,
-                    'partner_name': partner_name,
-                    'status': 'assigned',
-                    'partner_assigned_at': datetime.utcnow()
-                }
-            }
-        )
-        if result.modified_count > 0:
-            print(f"[ASSIGNMENT] Successfully assigned booking {booking_id} to partner {partner_name} (ID: {partner_id}).")
-            assigned = True
-
-            # Send notifications
-            try:
-                # Notify customer that partner was assigned
-                notify_booking_assigned(
-                    str(booking['customer_id']),
-                    booking_id,
-                    partner_name
-                )
-
-                # Notify partner of new booking
-                notify_partner_new_booking(
-                    str(partner_id),
-                    booking_id,
-                    booking.get('customer_name', 'Customer')
-                )
-            except Exception as e:
-                print(f"[ASSIGNMENT] Failed to send assignment notifications: {e}")
-        else:
-            print(f"[ASSIGNMENT] Failed to update booking {booking_id} with partner {partner_name} (ID: {partner_id}).")
-
-    if not assigned:
+        target = 'assigned'
+        extra_set = {'partner_id': partner_id, 'partner_name': partner_name}
+    else:
         print(f"[ASSIGNMENT] No suitable partner found for booking {booking_id} based on criteria (distance <= {max_distance_meters / 1000}km, active, available, no time conflicts).")
-        # Update booking status to 'unassigned'
-        db.bookings.update_one(
-            {'_id': ObjectId(booking_id)},
-            {'$set': {'status': 'unassigned'}}
-        )
+        if booking.get('status') == 'unassigned':
+            return
+        target = 'unassigned'
+        extra_set = None
+
+    # Only if nothing changed since the booking was read (e.g. an admin assigned it meanwhile);
+    # the transition also sends the assignment notifications
+    try:
+        transition_booking(db, booking_id, target, expected_version=booking.get('version', 0), extra_set=extra_set)
+    except HTTPException as e:
+        print(f"[ASSIGNMENT] Booking {booking_id} not updated: {e.detail}")
+        return
+
+    if target == 'assigned':
+        print(f"[ASSIGNMENT] Successfully assigned booking {booking_id} to partner {partner_name} (ID: {partner_id}).")
+    else:
         print(f"[ASSIGNMENT] Booking {booking_id} status set to 'unassigned'.")
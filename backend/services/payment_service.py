@@ -2,10 +2,13 @@ import stripe
 from datetime import datetime
 from bson import ObjectId
 from database.mongodb import get_database
+from services.booking_service import VERSION_BUMP
 from config import settings
 
 # Initialize Stripe
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE
 
 
 def create_checkout_session_for_booking(
@@ -159,7 +162,8 @@ def process_refund(transaction_id: str, reason: str = "requested_by_customer") -
                 '$set': {
                     'payment_status': 'refunded',
                     'refunded_at': datetime.utcnow()
-                }
+                },
+                '$inc': VERSION_BUMP
             }
         )
 
@@ -0,0 +1,344 @@
+"""
+Content-Addressed Blob Store
+Uploaded files are stored once per distinct content under the key
+ab/cd/<sha256>.<ext> of the storage backend (utils/storage.py), so a blob URL
+always means the same bytes and can be cached as immutable. The blobs
+collection counts the document fields that reference each blob; blobs nobody
+references are garbage-collected.
+
+Usage (from backend/):
+    python -m utils.blobs --gc      # delete unreferenced blobs past the grace period
+"""
+
+import asyncio
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from bson import ObjectId
+from fastapi import BackgroundTasks, HTTPException, UploadFile, status
+from pymongo import ReturnDocument
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from database.mongodb import get_database
+from utils.uploads import stage_upload, discard_temp
+from utils.images import create_variants, FORMAT_MIME_TYPES
+from utils.storage import get_storage, DirectUploadUnsupported
+
+BLOB_KEY_PATTERN = re.compile(r"([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})\.([a-z0-9]+)$")
+
+# A blob being garbage-collected can't be referenced; uploads of the same
+# content wait this long for the collector to finish
+ACQUIRE_ATTEMPTS = 5
+ACQUIRE_RETRY_SECONDS = 0.2
+
+# Collections whose documents carry a version every write bumps (see services/booking_service.py)
+VERSIONED_COLLECTIONS = {"bookings"}
+
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def blob_key(blob_id: str, ext: str) -> str:
+    return f"{blob_id[:2]}/{blob_id[2:4]}/{blob_id}.{ext}"
+
+
+def blob_id_from_url(url: Optional[str]) -> Optional[str]:
+    """The blob a URL points at, None for anything else (e.g. legacy upload paths)"""
+    if not url or not url.startswith(get_storage().url("")):
+        return None
+    match = BLOB_KEY_PATTERN.search(url)
+    return match.group(3) if match else None
+
+
+def _staging_dir() -> str:
+    # Same filesystem as the filesystem backend, so staged files are renamed into place
+    return os.path.join(settings.BLOB_FOLDER, ".staging")
+
+
+# ============================================================================
+# STORING AND REFERENCE COUNTING
+# ============================================================================
+
+async def _acquire(db: Database, blob_id: str, ext: str, size: int, content_type: Optional[str]) -> dict:
+    """Take one reference, creating the blob document if needed"""
+    for _ in range(ACQUIRE_ATTEMPTS):
+        try:
+            return db.blobs.find_one_and_update(
+                {'_id': blob_id, 'gc_started_at': {'$exists': False}},
+                {
+                    '$inc': {'refcount': 1},
+                    '$setOnInsert': {
+                        'ext': ext.lower(),
+                        'size': size,
+                        'content_type': content_type,
+                        'created_at': datetime.now(timezone.utc)
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Being garbage-collected (or created concurrently), retry shortly
+            await asyncio.sleep(ACQUIRE_RETRY_SECONDS)
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Upload conflicted with storage cleanup, please retry"
+    )
+
+
+def _stored(blob: dict, deduplicated: bool) -> dict:
+    key = blob_key(blob['_id'], blob['ext'])
+    return {**blob, 'key': key, 'url': get_storage().url(key), 'deduplicated': deduplicated}
+
+
+async def store_upload(upload: UploadFile, ext: str, db: Optional[Database] = None) -> dict:
+    """
+    Stream an upload into the store and take one reference on it.
+    Returns the blob document plus 'key', 'url' and 'deduplicated'
+    (True when identical content was already stored).
+    """
+    db = db if db is not None else get_database()
+    storage = get_storage()
+    temp_path, size, blob_id = await stage_upload(upload, _staging_dir())
+
+    blob = None
+    try:
+        # Reference first, file second: a referenced blob is never collected
+        blob = await _acquire(db, blob_id, ext, size, upload.content_type)
+        key = blob_key(blob_id, blob['ext'])
+        deduplicated = await run_in_threadpool(storage.exists, key)
+        if deduplicated:
+            discard_temp(temp_path)
+        else:
+            await run_in_threadpool(storage.put_file, key, temp_path, upload.content_type)
+    except BaseException:
+        discard_temp(temp_path)
+        if blob is not None:
+            # Nothing owns this reference, leaving it would keep the blob from ever being collected
+            _drop_reference(db, blob_id)
+        raise
+
+    return _stored(blob, deduplicated)
+
+
+def presign_upload(db: Database, sha256: str, ext: str, size: int, content_type: str) -> dict:
+    """
+    Direct-to-storage upload of a blob the client has hashed. Nothing to
+    upload when the content is already stored; otherwise a presigned request
+    that only accepts bytes with this SHA-256. Follow with claim_direct_upload.
+    """
+    if size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE // (1024 * 1024)}MB."
+        )
+    storage = get_storage()
+    existing = db.blobs.find_one({'_id': sha256}, {'ext': 1})
+    key = blob_key(sha256, existing['ext'] if existing else ext.lower())
+    if existing and storage.exists(key):
+        return {"exists": True, "upload": None}
+    try:
+        return {"exists": False, "upload": storage.presigned_upload(key, content_type, sha256)}
+    except DirectUploadUnsupported as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+
+
+async def claim_direct_upload(db: Database, sha256: str, ext: str) -> dict:
+    """
+    Take a reference on a blob the client uploaded directly (or that already
+    existed), after checking the object's size and, where the backend
+    verified it, its checksum. Same result shape as store_upload.
+    """
+    storage = get_storage()
+    existing = db.blobs.find_one({'_id': sha256}, {'ext': 1})
+    key = blob_key(sha256, existing['ext'] if existing else ext.lower())
+
+    head = await run_in_threadpool(storage.head, key)
+    if head is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found in storage")
+    if head["size"] > settings.MAX_FILE_SIZE or (head["sha256"] and head["sha256"] != sha256):
+        if not existing:
+            await run_in_threadpool(storage.delete, key)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file failed verification")
+
+    blob = await _acquire(db, sha256, ext, head["size"], None)
+    return _stored(blob, existing is not None)
+
+
+def add_reference(db: Database, url: Optional[str]) -> bool:
+    """Take a reference on an existing blob URL, False when the URL is not a known blob"""
+    blob_id = blob_id_from_url(url)
+    if not blob_id:
+        return False
+    result = db.blobs.update_one({'_id': blob_id, 'gc_started_at': {'$exists': False}}, {'$inc': {'refcount': 1}})
+    return result.matched_count > 0
+
+
+def _drop_reference(db: Database, blob_id: str):
+    db.blobs.update_one(
+        {'_id': blob_id},
+        {'$inc': {'refcount': -1}, '$set': {'released_at': datetime.now(timezone.utc)}}
+    )
+
+
+def release(db: Database, url: Optional[str]):
+    """Drop a reference taken by store_upload/add_reference (no-op for non-blob URLs)"""
+    blob_id = blob_id_from_url(url)
+    if blob_id:
+        _drop_reference(db, blob_id)
+
+
+def replace_reference(db: Database, old_url: Optional[str], new_url: Optional[str]):
+    """Move a field's reference from old_url to new_url"""
+    if old_url == new_url:
+        return
+    add_reference(db, new_url)
+    release(db, old_url)
+
+
+def attach_blob(db: Database, collection: str, document_id: str, field: str, blob: dict,
+                background_tasks: BackgroundTasks, extra_fields: Optional[dict] = None,
+                conditions: Optional[dict] = None) -> bool:
+    """
+    Point a document field at a blob from store_upload in one write, releasing
+    the blob it replaces. Variants come from the blob when an identical upload
+    already has them, otherwise they are rendered in the background.
+    Returns False (and drops the new reference) when the document is missing
+    or doesn't match conditions (e.g. an ownership predicate).
+    """
+    update = {'$set': {field: blob['url'], **(extra_fields or {})}}
+    if blob.get('variants'):
+        update['$set'][f'{field}_variants'] = blob['variants']
+    else:
+        update['$unset'] = {f'{field}_variants': ""}
+    if collection in VERSIONED_COLLECTIONS:
+        update['$inc'] = {'version': 1}
+
+    previous = db[collection].find_one_and_update(
+        {'_id': ObjectId(document_id), **(conditions or {})}, update, projection={field: 1}
+    )
+    if previous is None:
+        release(db, blob['url'])
+        return False
+
+    release(db, previous.get(field))
+    if not blob.get('variants'):
+        background_tasks.add_task(render_blob_variants, collection, document_id, field, blob)
+    return True
+
+
+# ============================================================================
+# IMAGE VARIANTS
+# ============================================================================
+
+async def render_blob_variants(collection: str, document_id: str, field: str, blob: dict):
+    """
+    Background task run after an upload: render the blob's variants (see
+    utils/images.py), store them next to it, and record them on the blob and
+    in {field}_variants unless the document has moved on to a different image
+    """
+    if not settings.IMAGE_VARIANTS_ENABLED:
+        return
+    storage = get_storage()
+    directory = blob['key'].rsplit("/", 1)[0]
+
+    try:
+        os.makedirs(_staging_dir(), exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=_staging_dir()) as work_dir:
+            source_path = storage.local_path(blob['key'])
+            if source_path is None:
+                source_path = os.path.join(work_dir, blob['key'].rsplit("/", 1)[1])
+                await run_in_threadpool(storage.download, blob['key'], source_path)
+
+            variants = []
+            for rendered in await create_variants(source_path, work_dir):
+                key = f"{directory}/{rendered['filename']}"
+                await run_in_threadpool(storage.put_file, key, rendered['path'], FORMAT_MIME_TYPES[rendered['format']])
+                variants.append({"width": rendered['width'], "format": rendered['format'], "url": storage.url(key)})
+    except Exception as e:
+        print(f"⚠️  Image variants failed for {blob['url']}: {e}")
+        return
+
+    db = get_database()
+    update = {'$set': {f'{field}_variants': variants}}
+    if collection in VERSIONED_COLLECTIONS:
+        update['$inc'] = {'version': 1}
+    db[collection].update_one({'_id': ObjectId(document_id), field: blob['url']}, update)
+    db.blobs.update_one({'_id': blob['_id']}, {'$set': {'variants': variants}})
+    print(f"🖼️  {len(variants)} variant(s) created for {blob['url']}")
+
+
+# ============================================================================
+# GARBAGE COLLECTION
+# ============================================================================
+
+def collect_garbage(db: Optional[Database] = None, grace_seconds: Optional[int] = None) -> dict:
+    """
+    Delete blobs (and their image variants) whose count has been zero since
+    before the grace period. Each blob is claimed first (gc_started_at), which
+    blocks new references, so its files are never deleted while in use.
+    Claims older than BLOB_GC_CLAIM_TIMEOUT_SECONDS (a crashed collector) are retaken.
+    """
+    db = db if db is not None else get_database()
+    storage = get_storage()
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=settings.BLOB_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds)
+    stale_claim = now - timedelta(seconds=settings.BLOB_GC_CLAIM_TIMEOUT_SECONDS)
+    result = {"deleted": 0, "bytes": 0, "errors": 0}
+
+    for candidate in db.blobs.find({'refcount': {'$lte': 0}, 'released_at': {'$lt': cutoff}}, {'_id': 1}):
+        # Millisecond precision, as stored, so the final delete can match on it
+        claimed_at = datetime.now(timezone.utc)
+        claimed_at = claimed_at.replace(microsecond=claimed_at.microsecond // 1000 * 1000)
+        blob = db.blobs.find_one_and_update(
+            {
+                '_id': candidate['_id'],
+                'refcount': {'$lte': 0},
+                '$or': [{'gc_started_at': {'$exists': False}}, {'gc_started_at': {'$lt': stale_claim}}]
+            },
+            {'$set': {'gc_started_at': claimed_at}},
+            return_document=ReturnDocument.AFTER
+        )
+        if blob is None:
+            continue
+
+        key = blob_key(blob['_id'], blob['ext'])
+        try:
+            storage.delete(key)
+            storage.delete_prefix(f"{key.rsplit('/', 1)[0]}/{blob['_id']}_")
+        except Exception as e:
+            # Leave the claim; a later run retakes it once it is stale
+            print(f"⚠️  Blob GC could not delete {key}: {e}")
+            result["errors"] += 1
+            continue
+
+        db.blobs.delete_one({'_id': blob['_id'], 'gc_started_at': claimed_at})
+        result["deleted"] += 1
+        result["bytes"] += blob.get('size', 0)
+
+    print(f"🧹 Blob GC: {result['deleted']} deleted ({result['bytes'] / (1024 * 1024):.1f}MB), "
+          f"{result['errors']} errors")
+    return result
+
+
+if __name__ == "__main__":
+    from database.mongodb import connect_to_mongo, close_mongo_connection
+
+    if "--gc" not in sys.argv:
+        print(__doc__)
+        sys.exit(1)
+    connect_to_mongo()
+    try:
+        collect_garbage()
+    finally:
+        close_mongo_connection()
@@ -0,0 +1,149 @@
+"""
+Response Compression
+gzip/brotli for API responses, negotiated from Accept-Encoding
+
+Only complete bodies of at least COMPRESSION_MIN_SIZE bytes whose type is in
+COMPRESSION_CONTENT_TYPES are compressed. Everything else passes through
+untouched: images and other uploads (already compressed), Server-Sent Events
+and streamed responses such as the admin exports (the first body message says
+more_body), responses that already carry a Content-Encoding, and ranges.
+
+When the client accepts an encoding, the ETag of a compressible response is
+made weak even if the body turns out too small to compress. 304s that carry
+Vary: Accept-Encoding get the same treatment, so they repeat the validator of
+the matching 200 (see utils/conditional.py).
+"""
+
+import gzip
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from utils.metrics import RESPONSE_COMPRESSION_BYTES
+
+try:
+    import brotli
+except ImportError:  # br is simply not offered
+    brotli = None
+
+# Bodies this large are compressed off the event loop (zlib and brotli release the GIL)
+THREADPOOL_MIN_SIZE = 256 * 1024
+
+
+def supported_encodings() -> list:
+    """Encodings this server can produce, most preferred first"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Best supported encoding for an Accept-Encoding header (highest q, br on
+    ties), None for identity
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == "br":
+        quality = settings.COMPRESSION_BROTLI_QUALITY if level is None else level
+        return brotli.compress(body, quality=quality)
+    level = settings.COMPRESSION_GZIP_LEVEL if level is None else level
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return (content_type in settings.COMPRESSION_CONTENT_TYPES
+            and "content-encoding" not in headers
+            and "content-range" not in headers)
+
+
+def weaken_etag(headers: MutableHeaders):
+    """Same resource, different bytes per encoding: a strong validator must not be shared"""
+    if "etag" in headers and not headers["etag"].startswith("W/"):
+        headers["ETag"] = f"W/{headers['etag']}"
+
+
+class CompressionMiddleware:
+    """Compresses eligible responses (see module docstring)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if message["status"] == 304:
+                    # No body to go by: a 304 that varies on Accept-Encoding gets the ETag its 200 would carry
+                    if encoding is not None and "accept-encoding" in headers.get("vary", "").lower():
+                        weaken_etag(headers)
+                    await send(message)
+                    return
+                if not is_compressible(headers) or message["status"] < 200 or message["status"] == 204:
+                    await send(message)
+                    return
+                # The representation depends on Accept-Encoding even when this one isn't compressed
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(message)
+                    return
+                # Weak whether or not this body ends up compressed, so 200s and 304s agree
+                weaken_etag(headers)
+                start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            held, start_message = start_message, None
+            body = message.get("body", b"")
+            if (message["type"] != "http.response.body" or message.get("more_body", False)
+                    or len(body) < settings.COMPRESSION_MIN_SIZE):
+                await send(held)
+                await send(message)
+                return
+
+            if len(body) >= THREADPOOL_MIN_SIZE:
+                compressed = await run_in_threadpool(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            RESPONSE_COMPRESSION_BYTES.labels(encoding=encoding, stage="identity").inc(len(body))
+            RESPONSE_COMPRESSION_BYTES.labels(encoding=encoding, stage="encoded").inc(len(compressed))
+
+            headers = MutableHeaders(scope=held)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(held)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
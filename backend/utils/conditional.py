@@ -0,0 +1,133 @@
+"""
+Conditional GET
+ETag / If-None-Match for user-scoped read endpoints, so an SPA re-fetching an
+unchanged resource gets an empty 304 instead of the full body
+
+Endpoints opt in with Depends(conditional_get). The ETag is a hash of the
+serialized body unless the endpoint supplies one first with
+not_modified(request, etag) (e.g. from a document version), which also lets
+it skip building the body when the client's copy is current. Versioned
+documents (bookings) use version_etag, and writes take the version a client
+saw from If-Match via the expected_version dependency. Responses get
+Vary: Authorization and Cache-Control: private, no-cache: browsers keep them
+but revalidate, shared caches don't store them. A 304 repeats the ETag and
+Vary of its 200, including what CompressionMiddleware adds.
+"""
+
+import hashlib
+import re
+from typing import Optional
+from fastapi import Header, HTTPException, Request, status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from utils.static_files import etag_matches
+
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+VERSION_ETAG_PATTERN = re.compile(r'^(?:W/)?"v(\d+)"$')
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def version_etag(version: Optional[int]) -> str:
+    """ETag of a document whose every write bumps its version (missing = 0)"""
+    return f'"v{version or 0}"'
+
+
+async def expected_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    Dependency: the version an If-Match: "v<n>" header (from version_etag)
+    expects, None when the client sent none or *
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    match = VERSION_ETAG_PATTERN.match(if_match.strip())
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='If-Match must be a single version ETag such as "v3"'
+        )
+    return int(match.group(1))
+
+
+async def conditional_get(request: Request):
+    """
+    Dependency: give this endpoint's 200 responses an ETag and answer
+    matching If-None-Match requests with 304 (see ConditionalGetMiddleware)
+    """
+    request.state.conditional_get = True
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """
+    Use etag for this response instead of a body hash. True when the client
+    already has it; the endpoint then returns Response(status_code=304).
+    """
+    request.state.etag = etag
+    return etag_matches(request.headers.get("if-none-match"), etag)
+
+
+class ConditionalGetMiddleware:
+    """Applies the ETag, validators and 304s for endpoints using conditional_get"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message: Optional[Message] = None
+
+        def route_state() -> dict:
+            return scope.get("state") or {}
+
+        def add_validators(message: Message, etag: str):
+            headers = MutableHeaders(scope=message)
+            headers["ETag"] = etag
+            headers["Cache-Control"] = CONDITIONAL_CACHE_CONTROL
+            headers.add_vary_header("Authorization")
+            if message["status"] == 304 and settings.COMPRESSION_ENABLED:
+                # The JSON 200 also varies on Accept-Encoding; a 304 has no content type for
+                # CompressionMiddleware to go by, so say so here and it weakens the ETag to match
+                headers.add_vary_header("Accept-Encoding")
+
+        async def send_conditional(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                state = route_state()
+                if not state.get("conditional_get") or message["status"] not in (200, 304):
+                    await send(message)
+                    return
+                if state.get("etag"):
+                    # Supplied by the endpoint, nothing to buffer
+                    add_validators(message, state["etag"])
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            held, start_message = start_message, None
+            if message["type"] != "http.response.body" or message.get("more_body", False):
+                # Streamed bodies can't be hashed up front
+                await send(held)
+                await send(message)
+                return
+
+            etag = body_etag(message.get("body", b""))
+            if etag_matches(if_none_match, etag):
+                held = {"type": "http.response.start", "status": 304, "headers": []}
+                message = {"type": "http.response.body", "body": b""}
+            add_validators(held, etag)
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_conditional)
@@ -0,0 +1,121 @@
+"""
+Streaming Exports
+CSV / NDJSON exports of whole collections that read a Mongo cursor in
+batches and yield encoded chunks, so memory stays flat whatever the size
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+from pymongo.database import Database
+from config import settings
+from utils.serializers import serialize_doc
+
+# Rows encoded per yielded chunk
+ROWS_PER_CHUNK = 500
+
+# Exported fields per collection, dotted paths reach into embedded documents.
+# Only these fields are read from MongoDB (password hashes never leave the server).
+EXPORT_FIELDS = {
+    "users": [
+        "_id", "email", "name", "role", "status", "phone", "address", "location.coordinates",
+        "availability", "business_type", "service_area", "commission_percentage", "created_at"
+    ],
+    "bookings": [
+        "_id", "customer_id", "customer_name", "partner_id", "partner_name", "status", "service_type",
+        "service_address", "scheduled_date", "created_at", "partner_assigned_at", "work_started_at",
+        "work_completed_at", "price", "total_price", "commission_amount", "partner_earnings",
+        "payment_status", "paid_at", "refunded_at", "customer_rating.rating", "partner_rating.rating"
+    ],
+    "transactions": [
+        "_id", "booking_id", "customer_id", "amount", "currency", "status", "service_type",
+        "payment_method", "stripe_checkout_session_id", "stripe_payment_intent_id", "stripe_refund_id",
+        "refund_amount", "refund_reason", "failure_reason", "completed_at"
+    ],
+}
+
+# Sort used for each export, backed by an index where one exists
+EXPORT_SORT = {
+    "users": [("_id", 1)],
+    "bookings": [("created_at", -1)],
+    "transactions": [("_id", 1)],
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _get_path(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def _export_cursor(db: Database, collection: str, query: dict):
+    projection = {field.split(".")[0]: 1 for field in EXPORT_FIELDS[collection]}
+    return (
+        db[collection]
+        .find(query, projection)
+        .sort(EXPORT_SORT[collection])
+        .batch_size(settings.EXPORT_BATCH_SIZE)
+    )
+
+
+def iter_csv(db: Database, collection: str, query: dict) -> Iterator[str]:
+    """Header row, then one row per document, yielded ROWS_PER_CHUNK rows at a time"""
+    fields = EXPORT_FIELDS[collection]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    rows = 0
+    with _export_cursor(db, collection, query) as cursor:
+        for doc in cursor:
+            writer.writerow([_csv_value(_get_path(doc, field)) for field in fields])
+            rows += 1
+            if rows % ROWS_PER_CHUNK == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def iter_ndjson(db: Database, collection: str, query: dict) -> Iterator[str]:
+    """One JSON object per line (only the exported fields), ROWS_PER_CHUNK lines at a time"""
+    lines: List[str] = []
+    with _export_cursor(db, collection, query) as cursor:
+        for doc in cursor:
+            lines.append(json.dumps(serialize_doc(doc), default=str))
+            if len(lines) == ROWS_PER_CHUNK:
+                yield "\n".join(lines) + "\n"
+                lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_filename(collection: str, export_format: str) -> str:
+    return f"{collection}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{export_format}"
+
+
+def iter_export(db: Database, collection: str, export_format: str, query: Optional[dict] = None) -> Iterator[str]:
+    """Encoded chunks of the export, for a StreamingResponse"""
+    if export_format == "csv":
+        return iter_csv(db, collection, query or {})
+    return iter_ndjson(db, collection, query or {})
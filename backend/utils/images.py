@@ -0,0 +1,113 @@
+"""
+Image Derivatives
+Resized, metadata-free WebP/AVIF variants of uploaded images, rendered in a
+process pool so encoding never competes with request handling for the GIL
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from PIL import Image, ImageOps
+from config import settings
+
+# Pillow save options per variant format
+FORMAT_OPTIONS = {
+    "webp": {"method": 4},
+    "avif": {"speed": 8},
+}
+
+# Browser Accept types, most preferred first
+FORMAT_MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+# ============================================================================
+# RENDERING (runs in the worker processes)
+# ============================================================================
+
+def render_variants(source_path: str, output_dir: str, widths: List[int], formats: List[str],
+                    quality: int) -> List[dict]:
+    """
+    Write {stem}_{width}w.{format} into output_dir for every width up to the
+    source width (the source width itself when it is narrower than all of
+    them). EXIF orientation is applied, then all metadata is dropped.
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    targets = sorted({width for width in widths if width < image.width} or {image.width})
+    variants = []
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image.copy()
+        resized.info = {}
+
+        for image_format in formats:
+            filename = f"{stem}_{width}w.{image_format}"
+            path = os.path.join(output_dir, filename)
+            resized.save(path, image_format.upper(), quality=quality, **FORMAT_OPTIONS.get(image_format, {}))
+            variants.append({"width": width, "format": image_format, "filename": filename, "path": path})
+    return variants
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the server process already runs Mongo monitor and watchdog threads
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS,
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_image_pool():
+    """Stop the worker processes (call from lifespan shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def create_variants(source_path: str, output_dir: str) -> List[dict]:
+    """Render variants in the pool, returns [{width, format, filename, path}]"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_image_pool(), render_variants, source_path, output_dir,
+        settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_FORMATS, settings.IMAGE_VARIANT_QUALITY
+    )
+
+
+# ============================================================================
+# SELECTION
+# ============================================================================
+
+def pick_variant(variants: Optional[List[dict]], width: Optional[int], accept: str) -> Optional[str]:
+    """
+    URL of the best variant for a display width and Accept header: the
+    narrowest one at least `width` wide (else the widest), in the most
+    preferred format the client accepts. None means serve the original.
+    """
+    accepted = [fmt for fmt, mime in FORMAT_MIME_TYPES.items() if mime in (accept or "")]
+    candidates = [v for v in variants or [] if v["format"] in accepted]
+    if not candidates:
+        return None
+
+    candidates.sort(key=lambda v: (v["width"], accepted.index(v["format"])))
+    if width:
+        wide_enough = [v for v in candidates if v["width"] >= width]
+        if wide_enough:
+            return wide_enough[0]["url"]
+    widest = candidates[-1]["width"]
+    return next(v["url"] for v in candidates if v["width"] == widest)
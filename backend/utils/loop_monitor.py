@@ -0,0 +1,176 @@
+"""
+Event Loop Watchdog
+Measures event-loop lag and captures the stack of whatever is blocking the loop
+
+A heartbeat task on the loop records when it last ran. A daemon thread checks
+that timestamp; once the loop has been silent for longer than the threshold it
+snapshots the loop thread's stack and the route of the request that was
+running. The stall is closed (and its full duration known) on the next beat.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+from config import settings
+from utils.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+from utils.middleware import match_route_template
+
+# Stalls kept in memory per worker for the diagnostics endpoint
+MAX_RECENT_STALLS = 50
+# Innermost frames kept per captured stack
+STACK_DEPTH = 25
+
+
+class LoopWatchdog:
+    """Event-loop lag monitor and blocking-call detector for one worker"""
+
+    def __init__(self, threshold_ms: float, interval_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._pending: Optional[dict] = None
+        self._task_scopes: Dict[asyncio.Task, Scope] = {}
+        self._recent = deque(maxlen=MAX_RECENT_STALLS)
+        self._routes: Dict[str, dict] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the heartbeat task and watcher thread (call from lifespan)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+
+    # ------------------------------------------------------------------
+    # Request tracking
+    # ------------------------------------------------------------------
+
+    def track(self, scope: Scope) -> Optional[asyncio.Task]:
+        task = asyncio.current_task()
+        if task is not None:
+            self._task_scopes[task] = scope
+        return task
+
+    def untrack(self, task: Optional[asyncio.Task]):
+        if task is not None:
+            self._task_scopes.pop(task, None)
+
+    # ------------------------------------------------------------------
+    # Detection
+    # ------------------------------------------------------------------
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - scheduled, 0.0)
+            self._last_beat = time.monotonic()
+            EVENT_LOOP_LAG.set(lag)
+            if lag >= self.threshold:
+                self._close_stall(lag)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval / 2):
+            silent_for = time.monotonic() - self._last_beat - self.interval
+            if silent_for < self.threshold:
+                continue
+            with self._lock:
+                if self._pending is None:
+                    self._pending = self._capture()
+
+    def _capture(self) -> dict:
+        """Snapshot the loop thread's stack and the request it is serving"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_list(traceback.extract_stack(frame)[-STACK_DEPTH:]) if frame else []
+
+        route = "background"
+        task = asyncio.current_task(self._loop)
+        scope = self._task_scopes.get(task) if task else None
+        if scope is not None:
+            route = f"{scope['method']} {match_route_template(scope)}"
+
+        return {"route": route, "stack": [line.rstrip() for line in stack]}
+
+    def _close_stall(self, lag: float):
+        with self._lock:
+            stall = self._pending or {"route": "unknown", "stack": []}
+            self._pending = None
+
+            stall["blocked_ms"] = round(lag * 1000, 1)
+            stall["at"] = time.time()
+            self._recent.append(stall)
+
+            entry = self._routes.setdefault(stall["route"], {"stalls": 0, "total_blocked_ms": 0.0, "max_blocked_ms": 0.0})
+            entry["stalls"] += 1
+            entry["total_blocked_ms"] += stall["blocked_ms"]
+            if stall["blocked_ms"] >= entry["max_blocked_ms"]:
+                entry["max_blocked_ms"] = stall["blocked_ms"]
+                entry["worst_stack"] = stall["stack"]
+
+        EVENT_LOOP_STALLS.labels(route=stall["route"]).inc()
+        print("[LOOP] " + json.dumps({
+            "route": stall["route"],
+            "blocked_ms": stall["blocked_ms"],
+            "where": stall["stack"][-1].strip().splitlines()[0] if stall["stack"] else None
+        }))
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def report(self) -> dict:
+        with self._lock:
+            routes = [{"route": route, **entry} for route, entry in self._routes.items()]
+            recent = list(self._recent)
+
+        routes.sort(key=lambda item: item["total_blocked_ms"], reverse=True)
+        return {
+            "pid": os.getpid(),
+            "threshold_ms": self.threshold * 1000,
+            "routes": routes,
+            "recent_stalls": recent[::-1]
+        }
+
+
+loop_watchdog = LoopWatchdog(settings.LOOP_LAG_THRESHOLD_MS, settings.LOOP_WATCHDOG_INTERVAL_MS)
+
+
+class LoopWatchdogMiddleware:
+    """Remembers which request each task is serving so stalls can be attributed to a route"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = loop_watchdog.track(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            loop_watchdog.untrack(task)
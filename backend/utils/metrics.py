@@ -0,0 +1,150 @@
+"""
+Prometheus Metrics
+Request, database, cache and event-loop metrics exported on /metrics
+
+When PROMETHEUS_MULTIPROC_DIR is set (see deploy.sh), every uvicorn worker
+writes its samples to that directory and /metrics aggregates all of them,
+so the numbers are the same whichever worker answers the scrape. The
+directory is created on import if it's missing.
+"""
+
+import asyncio
+import os
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS_MODE = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+if MULTIPROCESS_MODE:
+    # deploy.sh creates it under /tmp, but pm2 resurrects the workers after a reboot with it gone
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+# ============================================================================
+# HTTP METRICS
+# ============================================================================
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+RESPONSE_COMPRESSION_BYTES = Counter(
+    "http_response_compression_bytes_total",
+    "Compressed response body bytes before (identity) and after (encoded) compression, by encoding",
+    ["encoding", "stage"],
+)
+
+
+# ============================================================================
+# DATABASE METRICS
+# ============================================================================
+
+DB_COMMANDS_PER_REQUEST = Histogram(
+    "db_commands_per_request",
+    "Mongo commands issued per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Total Mongo command time per request",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections",
+    "Mongo connections by state (open, checked_out, waiting)",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total",
+    "Failed Mongo connection checkouts by reason",
+    ["reason"],
+)
+
+
+# ============================================================================
+# CACHE AND EVENT LOOP METRICS
+# ============================================================================
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache name and result (hit, miss); hit ratio = hit / (hit + miss)",
+    ["cache", "result"],
+)
+
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event-loop wakeup and when it actually ran",
+    multiprocess_mode="livemax",
+)
+
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "Times the event loop was blocked longer than LOOP_LAG_THRESHOLD_MS, by route",
+    ["route"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a cache hit or miss for the given cache name"""
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+async def sample_event_loop_lag(interval: float = 0.5):
+    """
+    Background task measuring how late the event loop wakes up from a sleep,
+    for when the loop watchdog (which also sets EVENT_LOOP_LAG) is disabled
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(loop.time() - scheduled, 0.0))
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in Prometheus text format, aggregated across workers"""
+    if MULTIPROCESS_MODE:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead():
+    """Drop this worker's live gauges from the shared multiprocess directory"""
+    if MULTIPROCESS_MODE:
+        multiprocess.mark_process_dead(os.getpid())
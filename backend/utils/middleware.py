@@ -0,0 +1,130 @@
+"""
+ASGI Middleware
+Request instrumentation shared by all routers
+"""
+
+import json
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from database.monitoring import start_request_stats, end_request_stats, record_route_stats
+from utils.metrics import (
+    REQUEST_LATENCY,
+    REQUESTS_TOTAL,
+    REQUESTS_IN_PROGRESS,
+    DB_COMMANDS_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+)
+
+
+def get_route_template(scope: Scope) -> str:
+    """
+    Get the matched route template (e.g. /api/bookings/{booking_id}) for a request.
+    Only meaningful once the router has handled the request.
+    """
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    # Mounted apps (e.g. /uploads) don't set a route, only their root_path
+    if scope.get("root_path"):
+        return scope["root_path"]
+    return "unmatched"
+
+
+def match_route_template(scope: Scope) -> str:
+    """
+    Resolve the route template of a request before the router handles it.
+    Unknown paths collapse into "unmatched" to keep label cardinality bounded.
+    """
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class PrometheusMiddleware:
+    """Records latency, in-flight count and status code per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = match_route_template(scope)
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method, route=route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(method=method, route=route).observe(time.perf_counter() - start)
+            REQUESTS_TOTAL.labels(method=method, route=route, status=str(status_code)).inc()
+            in_progress.dec()
+
+
+class QueryProfilerMiddleware:
+    """
+    Counts the Mongo commands issued by each request.
+
+    Always folds the result into the per-route summary and logs a structured
+    [QUERY] line for slow or chatty requests. In DEBUG the numbers are also
+    returned as X-DB-* response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats()
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Query-Count", str(stats.count))
+                headers.append("X-DB-Time-Ms", f"{stats.total_ms:.3f}")
+                if stats.slowest_command:
+                    headers.append("X-DB-Slowest", f"{stats.slowest_command};dur={stats.slowest_ms:.3f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            end_request_stats(token)
+            route = get_route_template(scope)
+            record_route_stats(route, stats)
+            DB_COMMANDS_PER_REQUEST.labels(route=route).observe(stats.count)
+            DB_TIME_PER_REQUEST.labels(route=route).observe(stats.total_ms / 1000)
+
+            if (settings.DEBUG
+                    or stats.slowest_ms >= settings.SLOW_QUERY_MS
+                    or stats.count >= settings.QUERY_COUNT_WARN_THRESHOLD):
+                print("[QUERY] " + json.dumps({
+                    "method": scope["method"],
+                    "route": route,
+                    "db_commands": stats.count,
+                    "db_ms": round(stats.total_ms, 3),
+                    "slowest_command": stats.slowest_command,
+                    "slowest_ms": round(stats.slowest_ms, 3)
+                }))
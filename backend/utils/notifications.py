@@ -3,10 +3,15 @@ Notification Utility Functions
 Helper functions to create and manage notifications
 """
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
 from database.mongodb import get_database
+from config import settings
 from typing import Optional, Dict
 
+# Number of individual events kept on a digest row (oldest are dropped)
+DIGEST_MAX_ITEMS = 20
+
 
 def create_notification(
     user_id: str,
@@ -14,7 +19,9 @@ def create_notification(
     description: str,
     notification_type: str,
     related_id: Optional[str] = None,
-    metadata: Optional[Dict] = None
+    metadata: Optional[Dict] = None,
+    event: Optional[str] = None,
+    coalesce: bool = False
 ) -> str:
     """
     Create a notification for a user
@@ -26,10 +33,21 @@ def create_notification(
         notification_type: Type of notification (account, booking, payment, system, partner)
         related_id: Optional related document ID (e.g., booking_id)
         metadata: Optional additional data
+        event: Optional event name (e.g., login) used for coalescing and digests
+        coalesce: Merge into an unread notification of the same event and
+            related_id created within NOTIFICATION_COALESCE_WINDOW_SECONDS
 
     Returns:
         The notification ID
     """
+    now = datetime.now(timezone.utc)
+
+    if event and settings.NOTIFICATION_DIGEST_ENABLED and event in settings.NOTIFICATION_DIGEST_EVENTS:
+        return _add_to_digest(user_id, title, description, notification_type, related_id, event, now)
+
+    if coalesce and event and settings.NOTIFICATION_COALESCE_WINDOW_SECONDS > 0:
+        return _coalesce_notification(user_id, title, description, notification_type, related_id, metadata, event, now)
+
     db = get_database()
 
     notification_doc = {
@@ -37,8 +55,12 @@ def create_notification(
         "title": title,
         "description": description,
         "type": notification_type,
+        "event": event,
         "is_read": False,
-        "created_at": datetime.now(timezone.utc),
+        "is_digest": False,
+        "count": 1,
+        "created_at": now,
+        "first_occurred_at": now,
         "read_at": None,
         "related_id": related_id,
         "metadata": metadata or {}
@@ -48,60 +70,160 @@ def create_notification(
     return str(result.inserted_id)
 
 
+def _coalesce_notification(
+    user_id: str,
+    title: str,
+    description: str,
+    notification_type: str,
+    related_id: Optional[str],
+    metadata: Optional[Dict],
+    event: str,
+    now: datetime
+) -> str:
+    """
+    Upsert a notification into the matching unread row of the current window.
+
+    The window is anchored on the first occurrence, so a steady stream of
+    events still produces a new row every NOTIFICATION_COALESCE_WINDOW_SECONDS.
+    created_at is bumped to the latest occurrence to keep the row at the top
+    of the list. Concurrent first events may each insert a row; that is fine.
+    """
+    db = get_database()
+    window_start = now - timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW_SECONDS)
+
+    notification = db.notifications.find_one_and_update(
+        {
+            "user_id": user_id,
+            "event": event,
+            "related_id": related_id,
+            "type": notification_type,
+            "is_read": False,
+            "is_digest": False,
+            "first_occurred_at": {"$gte": window_start}
+        },
+        {
+            "$set": {
+                "title": title,
+                "description": description,
+                "created_at": now,
+                "metadata": metadata or {}
+            },
+            "$inc": {"count": 1},
+            "$setOnInsert": {"first_occurred_at": now, "read_at": None}
+        },
+        projection={"_id": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return str(notification["_id"])
+
+
+def _add_to_digest(
+    user_id: str,
+    title: str,
+    description: str,
+    notification_type: str,
+    related_id: Optional[str],
+    event: str,
+    now: datetime
+) -> str:
+    """
+    Roll a low-priority event into the user's digest row for the current period.
+
+    One row per user, event and NOTIFICATION_DIGEST_INTERVAL_SECONDS period;
+    the latest DIGEST_MAX_ITEMS events are kept under metadata.items and the
+    row is marked unread again whenever a new event lands in it.
+    """
+    db = get_database()
+    interval = settings.NOTIFICATION_DIGEST_INTERVAL_SECONDS
+    period_start = datetime.fromtimestamp(int(now.timestamp()) // interval * interval, tz=timezone.utc)
+
+    notification = db.notifications.find_one_and_update(
+        {
+            "user_id": user_id,
+            "event": event,
+            "type": notification_type,
+            "is_digest": True,
+            "digest_period_start": period_start
+        },
+        {
+            "$set": {
+                "title": f"{title} (Summary)",
+                "description": description,
+                "created_at": now,
+                "is_read": False,
+                "read_at": None
+            },
+            "$inc": {"count": 1},
+            "$push": {
+                "metadata.items": {
+                    "$each": [{"description": description, "related_id": related_id, "occurred_at": now}],
+                    "$slice": -DIGEST_MAX_ITEMS
+                }
+            },
+            "$setOnInsert": {"first_occurred_at": now, "related_id": None}
+        },
+        projection={"_id": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return str(notification["_id"])
+
+
 def notify_account_created(user_id: str, user_name: str, role: str):
     """Notify user when their account is created"""
     title = "Welcome to NoSo Company!"
     description = f"Hello {user_name}! Your {role} account has been successfully created. Start exploring our services today."
-    return create_notification(user_id, title, description, "account")
+    return create_notification(user_id, title, description, "account", event="account_created")
 
 
 def notify_login(user_id: str, user_name: str):
     """Notify user on login"""
     title = "New Login Detected"
     description = f"Hello {user_name}! You just logged in. If this wasn't you, please secure your account immediately."
-    return create_notification(user_id, title, description, "account")
+    return create_notification(user_id, title, description, "account", event="login", coalesce=True)
 
 
 def notify_partner_registration(user_id: str, user_name: str):
     """Notify partner when they register"""
     title = "Partner Application Submitted"
     description = f"Hello {user_name}! Your partner application has been submitted successfully. Our admin team will review it within 24-48 hours."
-    return create_notification(user_id, title, description, "partner")
+    return create_notification(user_id, title, description, "partner", event="partner_registration")
 
 
 def notify_partner_approved(user_id: str, user_name: str):
     """Notify partner when approved"""
     title = "Partner Application Approved! 🎉"
     description = f"Congratulations {user_name}! Your partner application has been approved. You can now start accepting jobs."
-    return create_notification(user_id, title, description, "partner")
+    return create_notification(user_id, title, description, "partner", event="partner_approved")
 
 
 def notify_partner_rejected(user_id: str, user_name: str):
     """Notify partner when rejected"""
     title = "Partner Application Update"
     description = f"Hello {user_name}, unfortunately your partner application was not approved at this time. Please contact support for more information."
-    return create_notification(user_id, title, description, "partner")
+    return create_notification(user_id, title, description, "partner", event="partner_rejected")
 
 
 def notify_booking_created(user_id: str, booking_id: str, user_name: str):
     """Notify customer when booking is created"""
     title = "Booking Confirmed!"
     description = f"Hello {user_name}! Your booking has been confirmed. We'll notify you once a partner is assigned."
-    return create_notification(user_id, title, description, "booking", related_id=booking_id)
+    return create_notification(user_id, title, description, "booking", related_id=booking_id, event="booking_created")
 
 
 def notify_booking_assigned(user_id: str, booking_id: str, partner_name: str):
     """Notify customer when partner is assigned to booking"""
     title = "Partner Assigned to Your Booking"
     description = f"Great news! {partner_name} has been assigned to your booking. They will contact you soon."
-    return create_notification(user_id, title, description, "booking", related_id=booking_id)
+    return create_notification(user_id, title, description, "booking", related_id=booking_id, event="booking_assigned")
 
 
 def notify_partner_new_booking(partner_id: str, booking_id: str, customer_name: str):
     """Notify partner when assigned a new booking"""
     title = "New Booking Assigned!"
     description = f"You have been assigned a new booking from {customer_name}. Check your dashboard for details."
-    return create_notification(partner_id, title, description, "booking", related_id=booking_id)
+    return create_notification(partner_id, title, description, "booking", related_id=booking_id, event="partner_new_booking")
 
 
 def notify_booking_status_change(user_id: str, booking_id: str, status: str):
@@ -114,21 +236,21 @@ def notify_booking_status_change(user_id: str, booking_id: str, status: str):
 
     title = "Booking Status Updated"
     description = status_messages.get(status, f"Your booking status has been updated to {status}.")
-    return create_notification(user_id, title, description, "booking", related_id=booking_id)
+    return create_notification(user_id, title, description, "booking", related_id=booking_id, event="booking_status_change", coalesce=True)
 
 
 def notify_payment_received(user_id: str, booking_id: str, amount: float):
     """Notify user when payment is received"""
     title = "Payment Received"
     description = f"We've received your payment of ${amount:.2f}. Thank you for your business!"
-    return create_notification(user_id, title, description, "payment", related_id=booking_id)
+    return create_notification(user_id, title, description, "payment", related_id=booking_id, event="payment_received")
 
 
 def notify_partner_payment(partner_id: str, booking_id: str, earnings: float):
     """Notify partner of their earnings"""
     title = "Payment Processed"
     description = f"You've earned ${earnings:.2f} from your completed booking. Funds will be transferred shortly."
-    return create_notification(partner_id, title, description, "payment", related_id=booking_id)
+    return create_notification(partner_id, title, description, "payment", related_id=booking_id, event="partner_payment")
 
 
 def mark_notification_read(notification_id: str) -> bool:
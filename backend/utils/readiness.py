@@ -0,0 +1,96 @@
+"""
+Readiness Probe
+Dependency checks behind /ready, cached briefly so load-balancer probes stay cheap
+"""
+
+import asyncio
+import time
+import pymongo
+from anyio import to_thread
+from config import settings
+from database.mongodb import get_mongo_client
+from database.monitoring import pool_monitor
+from utils.metrics import record_cache_lookup
+
+_cached_result: dict = {}
+_cached_at = 0.0
+_probe_lock = asyncio.Lock()
+
+
+def _ping_mongo() -> float:
+    """Ping MongoDB (server selection included) within the probe timeout, returns latency in ms"""
+    start = time.perf_counter()
+    with pymongo.timeout(settings.READINESS_PING_TIMEOUT_MS / 1000):
+        get_mongo_client().admin.command("ping")
+    return (time.perf_counter() - start) * 1000
+
+
+async def _check_mongo() -> dict:
+    if get_mongo_client() is None:
+        return {"ok": False, "error": "not connected"}
+    try:
+        # Runs on the default executor, not the request threadpool we are measuring below
+        latency_ms = await asyncio.wait_for(
+            asyncio.to_thread(_ping_mongo),
+            timeout=settings.READINESS_PING_TIMEOUT_MS / 1000 + 0.5
+        )
+        return {"ok": True, "latency_ms": round(latency_ms, 2)}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {str(e)[:200]}"}
+
+
+def _check_pool() -> dict:
+    stats = pool_monitor.snapshot()
+    client = get_mongo_client()
+    max_pool_size = client.options.pool_options.max_pool_size if client else None
+    saturation = round(stats["checked_out"] / max_pool_size, 3) if max_pool_size else None
+    return {
+        "ok": stats["waiting"] <= settings.READINESS_MAX_POOL_WAITERS,
+        "checked_out": stats["checked_out"],
+        "open": stats["open"],
+        "waiting": stats["waiting"],
+        "max_pool_size": max_pool_size,
+        "saturation": saturation
+    }
+
+
+def _check_threadpool() -> dict:
+    """Backlog of sync endpoints/dependencies queued for a worker thread"""
+    limiter = to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return {
+        "ok": statistics.tasks_waiting <= settings.READINESS_MAX_THREADPOOL_BACKLOG,
+        "busy": statistics.borrowed_tokens,
+        "size": statistics.total_tokens,
+        "backlog": statistics.tasks_waiting
+    }
+
+
+async def check_readiness() -> dict:
+    """
+    Run all readiness checks, reusing the previous result for READINESS_CACHE_SECONDS.
+    Concurrent probes while a check is running share its result.
+    """
+    global _cached_result, _cached_at
+
+    if _cached_result and time.monotonic() - _cached_at < settings.READINESS_CACHE_SECONDS:
+        record_cache_lookup("readiness", hit=True)
+        return _cached_result
+
+    async with _probe_lock:
+        if _cached_result and time.monotonic() - _cached_at < settings.READINESS_CACHE_SECONDS:
+            record_cache_lookup("readiness", hit=True)
+            return _cached_result
+        record_cache_lookup("readiness", hit=False)
+
+        checks = {
+            "mongo": await _check_mongo(),
+            "mongo_pool": _check_pool(),
+            "threadpool": _check_threadpool()
+        }
+        _cached_result = {
+            "status": "ready" if all(check["ok"] for check in checks.values()) else "unavailable",
+            "checks": checks
+        }
+        _cached_at = time.monotonic()
+        return _cached_result
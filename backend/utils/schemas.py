@@ -200,6 +200,27 @@ class CategoryResponse(BaseModel):
 # SERVICE SCHEMAS
 # ============================================================================
 
+class ImageVariant(BaseModel):
+    """Resized copy of an uploaded image (see utils/images.py)"""
+    width: int
+    format: str
+    url: str
+
+
+class DirectUploadRequest(BaseModel):
+    """Ask for a presigned direct-to-storage upload of a client-hashed file"""
+    filename: str
+    content_type: str
+    size: int = Field(..., gt=0)
+    sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$")
+
+
+class DirectUploadComplete(BaseModel):
+    """Attach a directly uploaded (or already stored) file"""
+    filename: str
+    sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$")
+
+
 class ServiceCreate(BaseModel):
     """Schema for creating a new service"""
     title: str = Field(..., min_length=1, max_length=200)
@@ -232,6 +253,7 @@ class ServiceResponse(BaseModel):
     category_name: Optional[str] = None
     tags: List[str]
     image: Optional[str] = None
+    image_variants: Optional[List[ImageVariant]] = None
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -420,6 +442,7 @@ class BookingResponse(BaseModel):
     partner_assigned_at: Optional[datetime] = None
     work_started_at: Optional[datetime] = None
     work_completed_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
 
     # Pricing and commission
     total_price: Optional[float] = None  # Made optional
@@ -442,6 +465,11 @@ class BookingResponse(BaseModel):
     # Work images
     before_cleaning_image: Optional[str] = None
     after_cleaning_image: Optional[str] = None
+    before_cleaning_image_variants: Optional[List[ImageVariant]] = None
+    after_cleaning_image_variants: Optional[List[ImageVariant]] = None
+
+    # Bumped by every write; send as If-Match: "v<version>" to update only this version
+    version: int = 0
 
     class Config:
         from_attributes = True
@@ -453,6 +481,12 @@ class AssignBookingRequest(BaseModel):
     partner_id: str
 
 
+class BookingBulkTransition(BaseModel):
+    """Move many bookings to one status (admin)"""
+    booking_ids: List[str] = Field(..., min_length=1, max_length=500)
+    status: BookingStatus
+
+
 class BookingRating(BaseModel):
     """Booking rating schema (legacy - use RatingCreate)"""
     rating: float = Field(..., ge=0, le=5)
@@ -560,6 +594,9 @@ class NotificationResponse(BaseModel):
     read_at: Optional[datetime] = None
     related_id: Optional[str] = None
     metadata: Optional[dict] = None
+    event: Optional[str] = None
+    count: int = 1
+    is_digest: bool = False
 
     class Config:
         populate_by_name = True
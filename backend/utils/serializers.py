@@ -1,6 +1,7 @@
 from datetime import datetime
 from bson import ObjectId
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Type, Union
+from pydantic import BaseModel
 
 
 def serialize_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
@@ -34,3 +35,8 @@ def serialize_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
 def serialize_list(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Convert list of MongoDB documents to JSON-serializable list"""
     return [serialize_doc(doc) for doc in docs]
+
+
+def projection_for(model: Type[BaseModel]) -> Dict[str, int]:
+    """MongoDB projection containing only the fields a response model exposes"""
+    return {field.alias or name: 1 for name, field in model.model_fields.items()}
@@ -0,0 +1,78 @@
+"""
+Upload Serving
+StaticFiles for /uploads with strong ETags, cache headers, If-None-Match and
+optional X-Accel-Redirect so the reverse proxy sends the bytes instead. Range,
+If-Range, HEAD and pathsend come from Starlette's FileResponse.
+
+With UPLOAD_ACCEL_REDIRECT enabled the response carries
+X-Accel-Redirect: <UPLOAD_ACCEL_PREFIX>/uploads/... (path relative to the
+backend directory) and no body. Nginx: an `internal` location aliasing the
+backend directory. Caddy: see the commented /uploads block in caddy.conf.
+"""
+
+import mimetypes
+import os
+from email.utils import formatdate
+from typing import Optional
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+from config import settings
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, so W/ prefixes are ignored)"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    strong = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == strong for tag in header.split(","))
+
+
+class UploadFiles(StaticFiles):
+    """
+    StaticFiles with upload-friendly responses. immutable=True is for
+    content-addressed directories: the file name is the content hash, so it
+    doubles as the ETag and responses may be cached forever.
+    """
+
+    def __init__(self, *args, immutable: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+
+    def _etag(self, full_path: str, stat_result: os.stat_result) -> str:
+        if self.immutable:
+            return f'"{os.path.splitext(os.path.basename(full_path))[0]}"'
+        return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        etag = self._etag(full_path, stat_result)
+
+        headers = {
+            "etag": etag,
+            "cache-control": IMMUTABLE_CACHE_CONTROL if self.immutable
+            else f"public, max-age={settings.UPLOAD_CACHE_MAX_AGE_SECONDS}",
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        }
+        if etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        if settings.UPLOAD_ACCEL_REDIRECT:
+            # The proxy re-checks conditionals/ranges and sends the file itself
+            relative = os.path.relpath(full_path).replace(os.sep, "/")
+            headers["x-accel-redirect"] = f"{settings.UPLOAD_ACCEL_PREFIX.rstrip('/')}/{relative}"
+            headers["accept-ranges"] = "bytes"
+            return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+        # Ranges (If-Range checked against our ETag), HEAD and pathsend are handled there
+        return FileResponse(full_path, status_code=status_code, headers=headers,
+                            media_type=media_type, stat_result=stat_result)
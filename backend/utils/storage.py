@@ -0,0 +1,204 @@
+"""
+Blob Storage Backends
+Where the blob store (utils/blobs.py) keeps its files: the local filesystem
+(served from /uploads/blobs) or any S3-compatible object store (AWS S3, MinIO,
+benchmarks/fake_s3.py), so several app nodes can share uploads
+
+Keys are relative paths such as "ab/cd/<sha256>.jpg". Methods are blocking,
+call the ones that move file contents through run_in_threadpool.
+"""
+
+import base64
+import glob
+import os
+import shutil
+from typing import Optional
+from config import settings
+
+# Multipart transfers above this size, in parts of this size
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class DirectUploadUnsupported(Exception):
+    """The configured backend cannot accept uploads that bypass the API"""
+
+
+# ============================================================================
+# FILESYSTEM
+# ============================================================================
+
+class FilesystemStorage:
+    """Files under a local directory, served by the app's /uploads/blobs mount"""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Path readable in place, None when the file must be downloaded first"""
+        return self._path(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def head(self, key: str) -> Optional[dict]:
+        """{size, sha256 (hex, if the backend verified it)} or None when missing"""
+        try:
+            return {"size": os.path.getsize(self._path(key)), "sha256": None}
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, key: str, source_path: str, content_type: Optional[str] = None):
+        """Move a local file (on the same filesystem) into place atomically"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def download(self, key: str, destination: str):
+        shutil.copyfile(self._path(key), destination)
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_prefix(self, prefix: str) -> int:
+        paths = glob.glob(glob.escape(self._path(prefix)) + "*")
+        for path in paths:
+            os.unlink(path)
+        return len(paths)
+
+    def presigned_upload(self, key: str, content_type: str, sha256: str) -> dict:
+        raise DirectUploadUnsupported("Direct uploads need STORAGE_BACKEND=s3")
+
+
+# ============================================================================
+# S3-COMPATIBLE
+# ============================================================================
+
+class S3Storage:
+    """Objects in an S3-compatible bucket, served from S3_PUBLIC_URL (bucket website or CDN)"""
+
+    def __init__(self):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 needs boto3: install the s3 extra (uv sync --extra s3)")
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = settings.S3_BUCKET
+        self.prefix = settings.S3_KEY_PREFIX
+        self.base_url = settings.S3_PUBLIC_URL.rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            config=Config(
+                signature_version="s3v4",
+                # MinIO and most stand-ins want bucket-in-path URLs
+                s3={"addressing_style": "path" if settings.S3_ENDPOINT_URL else "auto"},
+                # Checksums only where we ask for them (SHA-256 on direct uploads)
+                request_checksum_calculation="when_required",
+                response_checksum_validation="when_required",
+            ),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=MULTIPART_CHUNK_SIZE,
+        )
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{self._object_key(key)}"
+
+    def local_path(self, key: str) -> Optional[str]:
+        return None
+
+    def head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key), ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        checksum = response.get("ChecksumSHA256")
+        return {
+            "size": response["ContentLength"],
+            # Only a whole-object checksum identifies the content (multipart ones end in -N)
+            "sha256": base64.b64decode(checksum).hex() if checksum and "-" not in checksum else None
+        }
+
+    def exists(self, key: str) -> bool:
+        return self.head(key) is not None
+
+    def put_file(self, key: str, source_path: str, content_type: Optional[str] = None):
+        """Upload a local file (multipart above MULTIPART_CHUNK_SIZE), then remove it"""
+        extra = {"ContentType": content_type} if content_type else {}
+        if settings.S3_IMMUTABLE_CACHE_CONTROL:
+            extra["CacheControl"] = "public, max-age=31536000, immutable"
+        self.client.upload_file(source_path, self.bucket, self._object_key(key),
+                                ExtraArgs=extra, Config=self.transfer_config)
+        os.unlink(source_path)
+
+    def download(self, key: str, destination: str):
+        self.client.download_file(self.bucket, self._object_key(key), destination, Config=self.transfer_config)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(prefix)):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+                deleted += len(objects)
+        return deleted
+
+    def presigned_upload(self, key: str, content_type: str, sha256: str) -> dict:
+        """
+        Presigned PUT the client sends the bytes to. The SHA-256 header is
+        signed, so the store rejects any content other than the declared blob.
+        """
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        params = {"Bucket": self.bucket, "Key": self._object_key(key),
+                  "ContentType": content_type, "ChecksumSHA256": checksum}
+        if settings.S3_IMMUTABLE_CACHE_CONTROL:
+            params["CacheControl"] = "public, max-age=31536000, immutable"
+        url = self.client.generate_presigned_url(
+            "put_object", Params=params, ExpiresIn=settings.S3_PRESIGN_EXPIRES_SECONDS
+        )
+        headers = {"Content-Type": content_type, "x-amz-checksum-sha256": checksum}
+        if "CacheControl" in params:
+            headers["Cache-Control"] = params["CacheControl"]
+        return {"method": "PUT", "url": url, "headers": headers,
+                "expires_in": settings.S3_PRESIGN_EXPIRES_SECONDS}
+
+
+_storage = None
+
+
+def get_storage():
+    """The configured backend (STORAGE_BACKEND), created on first use"""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "s3":
+            _storage = S3Storage()
+        else:
+            _storage = FilesystemStorage(settings.BLOB_FOLDER, "/uploads/blobs")
+    return _storage
@@ -0,0 +1,105 @@
+"""
+Upload Storage
+Streams UploadFile contents to disk in fixed-size chunks on a worker thread,
+enforcing the size limit as bytes arrive and renaming into place only once
+the whole file has been written
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from config import settings
+
+# Bytes copied per read/write
+CHUNK_SIZE = 1024 * 1024
+
+# mkstemp creates files 0600; stored files get the mode open() would give them,
+# so a file server running as another user (X-Accel-Redirect, Caddy) can read them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size is {max_size // (1024 * 1024)}MB."
+    )
+
+
+def _stream_to_temp(source: BinaryIO, directory: str, max_size: int) -> Tuple[str, int, str]:
+    """Copy source into a temp file in directory, returns (temp path, size, sha256 hex)"""
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    os.fchmod(fd, FILE_MODE)
+    # One reusable buffer per copy instead of a new bytes object per chunk
+    buffer = memoryview(bytearray(CHUNK_SIZE))
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while True:
+                read = source.readinto(buffer)
+                if not read:
+                    break
+                written += read
+                if written > max_size:
+                    raise _too_large(max_size)
+                digest.update(buffer[:read])
+                target.write(buffer[:read])
+    except BaseException:
+        discard_temp(temp_path)
+        raise
+    return temp_path, written, digest.hexdigest()
+
+
+def discard_temp(temp_path: str):
+    try:
+        os.unlink(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def _copy_to_path(source: BinaryIO, destination: str, max_size: int) -> int:
+    """Copy source into a temp file next to destination, then atomically rename it"""
+    temp_path, written, _ = _stream_to_temp(source, os.path.dirname(destination) or ".", max_size)
+    try:
+        os.replace(temp_path, destination)
+    except BaseException:
+        discard_temp(temp_path)
+        raise
+    return written
+
+
+async def _prepare(upload: UploadFile, max_size: Optional[int]) -> int:
+    max_size = max_size or settings.MAX_FILE_SIZE
+
+    # Starlette records the size of spooled parts, reject those before copying anything
+    if upload.size is not None and upload.size > max_size:
+        raise _too_large(max_size)
+
+    await upload.seek(0)
+    return max_size
+
+
+async def save_upload(upload: UploadFile, destination: str, max_size: Optional[int] = None) -> int:
+    """
+    Stream an upload to destination without holding it in memory.
+    Raises 413 when it exceeds max_size (default settings.MAX_FILE_SIZE),
+    a partially written file is never left at destination. Returns bytes written.
+    """
+    max_size = await _prepare(upload, max_size)
+    return await run_in_threadpool(_copy_to_path, upload.file, destination, max_size)
+
+
+async def stage_upload(upload: UploadFile, directory: str, max_size: Optional[int] = None) -> Tuple[str, int, str]:
+    """
+    Stream an upload to a temp file in directory for the caller to rename or
+    discard_temp(). Same limits as save_upload. Returns (temp path, size, sha256 hex).
+    """
+    max_size = await _prepare(upload, max_size)
+    return await run_in_threadpool(_stream_to_temp, upload.file, directory, max_size)
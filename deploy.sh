@@ -24,6 +24,8 @@ BACKEND_DIR="$PROJECT_DIR/backend"
 BACKEND_MODULE="app:app"
 BACKEND_PORT=8080
 BACKEND_WORKERS=2
+# Shared Prometheus metrics directory for all workers (wiped on every restart)
+BACKEND_METRICS_DIR="/tmp/$BACKEND_NAME-metrics"
 
 # Frontend Configuration
 FRONTEND_DIR="$PROJECT_DIR/frontend"
@@ -168,7 +170,13 @@ if ! command -v uv &> /dev/null; then
     export PATH="$HOME/.local/bin:$PATH"
 fi
 
-uv sync --frozen || { echo "[ERROR] Backend dependency installation failed"; exit 1; }
+# Optional extras the configured backend needs (boto3 for S3 blob storage)
+BACKEND_EXTRAS=""
+if grep -q "^STORAGE_BACKEND=s3" "$BACKEND_DIR/.env" 2>/dev/null; then
+    BACKEND_EXTRAS="--extra s3"
+fi
+
+uv sync --frozen $BACKEND_EXTRAS || { echo "[ERROR] Backend dependency installation failed"; exit 1; }
 echo "[OK] Backend dependencies installed"
 
 # =============================================================================
@@ -306,6 +314,11 @@ if pm2 list | grep -q "$BACKEND_NAME"; then
     pm2 delete "$BACKEND_NAME" 2>/dev/null || true
 fi
 
+echo "  Resetting Prometheus multiprocess metrics directory..."
+rm -rf "$BACKEND_METRICS_DIR"
+mkdir -p "$BACKEND_METRICS_DIR"
+export PROMETHEUS_MULTIPROC_DIR="$BACKEND_METRICS_DIR"
+
 echo "  Starting backend process with uv..."
 pm2 start "$HOME/.local/bin/uv run uvicorn $BACKEND_MODULE --host 0.0.0.0 --port $BACKEND_PORT --workers $BACKEND_WORKERS" \
     --name "$BACKEND_NAME" --cwd "$BACKEND_DIR"
@@ -322,7 +335,7 @@ echo "============================================="
 
 MAX_RETRIES=30
 RETRY_COUNT=0
-HEALTH_URL="http://localhost:$BACKEND_PORT/health"
+HEALTH_URL="http://localhost:$BACKEND_PORT/ready"
 
 while [ $RETRY_COUNT -lt $MAX_RETRIES ]; do
     if curl -s -o /dev/null -w "%{http_code}" "$HEALTH_URL" | grep -q "200"; then
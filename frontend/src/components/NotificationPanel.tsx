@@ -23,6 +23,8 @@ interface Notification {
     created_at: string;
     read_at?: string;
     related_id?: string;
+    count?: number;
+    is_digest?: boolean;
 }
 
 interface NotificationPanelProps {
@@ -285,6 +287,11 @@ const NotificationPanel: React.FC<NotificationPanelProps> = ({ isOpen, onClose }
                                         <div className="flex items-start justify-between gap-4 mb-1">
                                             <h4 className={`font-bold text-base ${!notification.is_read ? 'text-slate-900' : 'text-slate-700'}`}>
                                                 {notification.title}
+                                                {(notification.count ?? 1) > 1 && (
+                                                    <span className="ml-2 text-xs font-semibold text-slate-400">
+                                                        ×{notification.count}
+                                                    </span>
+                                                )}
                                             </h4>
                                             <div className="flex items-center gap-3">
                                                 <span className="text-xs text-slate-400 whitespace-nowrap">
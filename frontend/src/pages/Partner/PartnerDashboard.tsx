@@ -25,6 +25,12 @@ import { useNavigate } from 'react-router-dom';
 import NotificationPanel from '../../components/NotificationPanel';
 import { PhoneInput } from '../../components/PhoneInput';
 
+// Status changes the backend allows a partner to make, by current status (TRANSITIONS in services/booking_service.py)
+const PARTNER_TRANSITIONS: Record<string, string[]> = {
+    assigned: ['in_progress', 'cancelled'],
+    in_progress: ['completed'],
+};
+
 interface BookingService {
     service_id: string;
     service_title: string;
@@ -197,12 +203,12 @@ const PartnerDashboard: React.FC = () => {
             });
 
             await fetchBookings(); // Refresh to get updated stats
-        } catch (error) {
+        } catch (error: any) {
             console.error('Failed to update status:', error);
             setAlertModal({
                 isOpen: true,
                 title: 'Update Failed',
-                message: 'Failed to update status. Please try again.',
+                message: error.response?.data?.detail || 'Failed to update status. Please try again.',
                 type: 'error'
             });
         } finally {
@@ -773,7 +779,8 @@ const PartnerDashboard: React.FC = () => {
                                 ].map((status) => {
                                     const canUpdate = (!status.requiresBefore || selectedBooking.before_cleaning_image) &&
                                         (!status.requiresAfter || selectedBooking.after_cleaning_image);
-                                    const isDisabled = updatingStatus || !canUpdate;
+                                    const isAllowed = (PARTNER_TRANSITIONS[selectedBooking.status] || []).includes(status.value);
+                                    const isDisabled = updatingStatus || !canUpdate || !isAllowed;
 
                                     return (
                                         <button
@@ -791,7 +798,7 @@ const PartnerDashboard: React.FC = () => {
                                                 <div className="flex-1">
                                                     <p className="font-bold text-slate-900">{status.label}</p>
                                                     <p className="text-xs text-slate-500">{status.desc}</p>
-                                                    {!canUpdate && (
+                                                    {isAllowed && !canUpdate && (
                                                         <p className="text-xs text-amber-600 mt-1 flex items-center gap-1">
                                                             <AlertCircle className="w-3 h-3" />
                                                             {!selectedBooking.before_cleaning_image && status.requiresBefore && 'Before picture required'}